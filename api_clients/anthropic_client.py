@@ -8,7 +8,18 @@ from httpx import HTTPError, TimeoutException
 from utils.logger import log_api_error, log_connection_error, log_timeout_error, logger
 # PyQt6 removed - using CustomTkinter GUI now
 from gui.prompts import get_system_prompt
-from .base_client import DEFAULT_TIMEOUT, QUICK_TIMEOUT, CONNECTION_TIMEOUT, DEFAULT_RETRIES, APITimeoutError
+from .base_client import DEFAULT_TIMEOUT, QUICK_TIMEOUT, CONNECTION_TIMEOUT, DEFAULT_RETRIES, APITimeoutError, ErrorResult, warm_connection
+from .engine import add_shutdown_hook, get_engine
+from .progress import progress_event_hooks
+
+_ANTHROPIC_CLIENT_CACHE = {}
+_ANTHROPIC_HTTP_CACHE = {}
+ANTHROPIC_API_BASE = "https://api.anthropic.com/v1"
+_HTTP2_AVAILABLE = True
+try:
+    import h2  # type: ignore
+except Exception:
+    _HTTP2_AVAILABLE = False
 
 def show_connection_error():
     """Log connection error - GUI now handled by main application"""
@@ -22,54 +33,107 @@ def handle_api_error(e):
         return True
     return False
 
-def correct_text_anthropic(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None):
+def _get_anthropic_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """Zwraca cache'owanego klienta Anthropic z HTTP/2 i połączeniami keep-alive.
+
+    Klient jest asynchroniczny i związany z pętlą silnika (api_clients.engine),
+    więc kolejne poprawki i akcje z menu nie robią ponownie handshake'u TCP+TLS.
+    """
+    client = _ANTHROPIC_CLIENT_CACHE.get(api_key)
+    if client is not None:
+        return client
+
+    # Przy własnym transporcie http2/limits muszą być ustawione na transporcie
+    transport = httpx.AsyncHTTPTransport(
+        http2=_HTTP2_AVAILABLE,
+        retries=DEFAULT_RETRIES,
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30.0),
+    )
+    http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            connect=CONNECTION_TIMEOUT,  # 5s na połączenie
+            read=DEFAULT_TIMEOUT,        # 15s na odczyt
+            write=CONNECTION_TIMEOUT,    # 5s na zapis
+            pool=CONNECTION_TIMEOUT      # 5s na pool
+        ),
+        transport=transport,
+        event_hooks=progress_event_hooks(),
+    )
+    client = anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client)
+    _ANTHROPIC_CLIENT_CACHE[api_key] = client
+    _ANTHROPIC_HTTP_CACHE[api_key] = http_client
+    return client
+
+
+async def prewarm_connection(api_key, model=None):
+    """Otwiera połączenie do Anthropic w puli cache'owanego klienta (prewarm po hotkeyu)."""
+    _get_anthropic_client(api_key)
+    await warm_connection(_ANTHROPIC_HTTP_CACHE[api_key], ANTHROPIC_API_BASE)
+
+
+async def aclose_clients():
+    """Zamyka cache'owanych klientów Anthropic (wołane przy zamykaniu silnika)."""
+    clients = list(_ANTHROPIC_CLIENT_CACHE.values())
+    _ANTHROPIC_CLIENT_CACHE.clear()
+    _ANTHROPIC_HTTP_CACHE.clear()
+    for client in clients:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"Nie udało się zamknąć klienta Anthropic: {e}")
+
+
+add_shutdown_hook(aclose_clients)
+
+
+def invalidate_client(api_key=None):
+    """Usuwa klienta z cache (np. po zmianie klucza w ustawieniach) albo wszystkich.
+
+    Usunięci klienci są zamykani na pętli silnika po STALE_CLIENT_GRACE.
+    """
+    keys = list(_ANTHROPIC_CLIENT_CACHE) if api_key is None else [api_key]
+    for key in keys:
+        client = _ANTHROPIC_CLIENT_CACHE.pop(key, None)
+        _ANTHROPIC_HTTP_CACHE.pop(key, None)
+        if client is not None:
+            get_engine().close_stale(client.close)
+            logger.info("Anthropic: usunięto klienta z cache")
+
+async def correct_text_anthropic_async(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None):
+    """Poprawia tekst używając Anthropic API (korutyna dla silnika asyncio)."""
     # Nie nadpisuj przekazanego system_prompt – jeśli pusty, wybierz wg stylu
     if not system_prompt:
         style = "prompt" if "prompt" in instruction_prompt.lower() else "normal"
         system_prompt = get_system_prompt(style)
-    """Poprawia tekst używając Anthropic API."""
     if not api_key:
         logger.warning("Próba użycia Anthropic API bez klucza.") # Logowanie ostrzeżenia
-        return "Błąd: Klucz API Anthropic nie został podany."
+        return ErrorResult("Błąd: Klucz API Anthropic nie został podany.")
     if not model:
         logger.warning("Próba użycia Anthropic API bez podania modelu.") # Logowanie ostrzeżenia
-        return "Błąd: Model Anthropic nie został określony."
+        return ErrorResult("Błąd: Model Anthropic nie został określony.")
     if not text_to_correct:
         logger.warning("Próba użycia Anthropic API bez tekstu do poprawy.") # Logowanie ostrzeżenia
-        return "Błąd: Brak tekstu do poprawy."
+        return ErrorResult("Błąd: Brak tekstu do poprawy.")
 
     logger.info(f"Wysyłanie zapytania do Anthropic API (model: {model}). Tekst: {text_to_correct[:50]}...") # Logowanie rozpoczęcia zapytania
 
     try:
-        # Konfiguracja klienta z ulepszonymi timeoutami
-        client = anthropic.Anthropic(
-            api_key=api_key,
-            http_client=httpx.Client(
-                timeout=httpx.Timeout(
-                    connect=CONNECTION_TIMEOUT,  # 5s na połączenie
-                    read=DEFAULT_TIMEOUT,        # 15s na odczyt
-                    write=CONNECTION_TIMEOUT,    # 5s na zapis
-                    pool=CONNECTION_TIMEOUT      # 5s na pool
-                ),
-                transport=httpx.HTTPTransport(retries=DEFAULT_RETRIES)
-            )
-        )
+        client = _get_anthropic_client(api_key)
 
         user_message_content = f"{instruction_prompt}\n\n---\n{text_to_correct}\n---"
 
         # Streaming jeśli jest callback
         if callable(on_chunk):
-            stream = client.messages.stream(
+            collected = []
+            async with client.messages.stream(
                 model=model,
                 max_tokens=2048,
                 system=system_prompt,
                 messages=[
                     {"role": "user", "content": user_message_content}
                 ]
-            )
-            collected = []
-            with stream as events:
-                for event in events:
+            ) as events:
+                async for event in events:
                     try:
                         if getattr(event, 'type', None) == 'content_block_delta':
                             delta = getattr(event.delta, 'text', '') or ''
@@ -86,7 +150,7 @@ def correct_text_anthropic(api_key, model, text_to_correct, instruction_prompt,
                     self.content = [type('B', (), { 'type': 'text', 'text': text })()]
             response = _Resp(''.join(collected))
         else:
-            response = client.messages.create(
+            response = await client.messages.create(
                 model=model,
                 max_tokens=2048,
                 system=system_prompt,
@@ -108,18 +172,18 @@ def correct_text_anthropic(api_key, model, text_to_correct, instruction_prompt,
             else:
                 error_msg = "Nie otrzymano bloku tekstowego w odpowiedzi"
                 log_api_error("Anthropic", error_msg) # Używamy log_api_error
-                return f"Błąd: {error_msg} od Anthropic API."
+                return ErrorResult(f"Błąd: {error_msg} od Anthropic API.")
         else:
             error_msg = "Nie otrzymano poprawnej odpowiedzi (brak contentu lub niepoprawny format)"
             log_api_error("Anthropic", error_msg) # Używamy log_api_error
-            return f"Błąd: {error_msg} od Anthropic API."
+            return ErrorResult(f"Błąd: {error_msg} od Anthropic API.")
 
     except (httpx.TimeoutException, httpx.ReadTimeout, httpx.ConnectTimeout) as e:
         logger.error(f"Timeout Anthropic API: {e}", exc_info=True)
-        return f"Błąd: Anthropic API nie odpowiada (timeout {DEFAULT_TIMEOUT}s). Spróbuj ponownie."
+        return ErrorResult(f"Błąd: Anthropic API nie odpowiada (timeout {DEFAULT_TIMEOUT}s). Spróbuj ponownie.")
     except (HTTPError, TimeoutException, anthropic.APIConnectionError) as e:
         if handle_api_error(e):
-            return "Błąd połączenia z API. Sprawdź komunikat błędu."
+            return ErrorResult("Błąd połączenia z API. Sprawdź komunikat błędu.")
         error_content = "Brak danych błędu"
         try:
             if hasattr(e, 'response'):
@@ -128,23 +192,33 @@ def correct_text_anthropic(api_key, model, text_to_correct, instruction_prompt,
             if hasattr(e, 'response'):
                 error_content = e.response.text
         log_api_error("Anthropic", e, getattr(e, 'response', None))
-        return f"Błąd Anthropic (HTTP {getattr(e, 'response', None) and e.response.status_code or 'N/A'}): {error_content}"
+        return ErrorResult(f"Błąd Anthropic (HTTP {getattr(e, 'response', None) and e.response.status_code or 'N/A'}): {error_content}")
     
     except anthropic.RateLimitError as e:
         log_api_error("Anthropic", e) # Używamy log_api_error
-        return f"Błąd Anthropic (limit zapytań): {str(e)}"
+        return ErrorResult(f"Błąd Anthropic (limit zapytań): {str(e)}")
     
     except anthropic.AuthenticationError as e:
         log_api_error("Anthropic", e) # Używamy log_api_error
-        return f"Błąd Anthropic (autentykacja): Nieprawidłowy klucz API"
+        return ErrorResult(f"Błąd Anthropic (autentykacja): Nieprawidłowy klucz API")
     
     except anthropic.APIStatusError as e:
         log_api_error("Anthropic", e, getattr(e, 'response', None)) # Używamy log_api_error z odpowiedzią
-        return f"Błąd Anthropic (status API {getattr(e, 'status_code', 'N/A')}): {str(e)}"
+        return ErrorResult(f"Błąd Anthropic (status API {getattr(e, 'status_code', 'N/A')}): {str(e)}")
     
     except Exception as e:
         log_api_error("Anthropic", e) # Używamy log_api_error dla nieoczekiwanych błędów
-        return f"Błąd Anthropic (nieoczekiwany): {str(e)}"
+        return ErrorResult(f"Błąd Anthropic (nieoczekiwany): {str(e)}")
+
+def correct_text_anthropic(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None, cancel_event=None):
+    """Poprawia tekst używając Anthropic API (synchroniczny wrapper na silnik asyncio).
+
+    Ustawienie ``cancel_event`` zamyka strumień od razu i zwraca "❌ Anulowano".
+    """
+    return get_engine().run_sync(
+        correct_text_anthropic_async(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=on_chunk),
+        cancel_event=cancel_event,
+    )
 
 if __name__ == '__main__':
     # --- Modyfikacja sys.path dla testowania bezpośredniego ---
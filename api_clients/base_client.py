@@ -20,4 +20,42 @@ DEEPSEEK_TIMEOUT = 35   # sekundy - specjalny timeout dla DeepSeek
 
 # Konfiguracja retry
 DEFAULT_RETRIES = 2   # zmniejszone z 3 na 2
-QUICK_RETRIES = 1     # dla szybkich prób 
\ No newline at end of file
+QUICK_RETRIES = 1     # dla szybkich prób 
+
+class ErrorResult(str):
+    """Komunikat błędu zwracany przez correct_text_* zamiast poprawionego tekstu.
+
+    To nadal ``str`` (stare punkty wejścia wyświetlają go bez zmian), ale
+    silnik, dzielenie na fragmenty i GUI rozpoznają błąd po typie, a nie po
+    treści – poprawka zaczynająca się od słowa "Błąd" jest zwykłym wynikiem.
+    Operacje na napisie (``strip``, f-string) zwracają zwykły ``str``, więc
+    komunikat pochodny trzeba ponownie opakować.
+    """
+
+    __slots__ = ()
+
+
+class PartialResult(str):
+    """Niepełny tekst ze strumienia przerwanego w trakcie odpowiedzi.
+
+    Wyświetlany jak zwykły wynik (lepsze to niż nic), ale nie trafia do cache
+    odpowiedzi – ponowne zapytanie ma szansę dostać całość. Tak jak przy
+    :class:`ErrorResult` operacje na napisie gubią typ i trzeba go odtworzyć.
+    """
+
+    __slots__ = ()
+
+
+def is_error_result(text):
+    """Czy wynik correct_text_* jest błędem (:class:`ErrorResult`) albo jest pusty."""
+    return not text or isinstance(text, ErrorResult)
+
+
+async def warm_connection(http_client, url):
+    """Otwiera połączenie w puli ``httpx.AsyncClient`` lekkim zapytaniem HEAD.
+
+    Status odpowiedzi nie ma znaczenia (zwykle 401/404) – chodzi o to, żeby
+    właściwe zapytanie poszło już po gotowym połączeniu TCP+TLS(+HTTP/2).
+    """
+    response = await http_client.head(url)
+    await response.aclose()
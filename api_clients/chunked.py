@@ -0,0 +1,101 @@
+"""Równoległa korekta długich tekstów podzielonych na fragmenty.
+
+Fragmenty (:mod:`utils.text_chunker`) jednego providera lecą równolegle, z
+limitem jednoczesnych zapytań. Do UI trafiają w kolejności dokumentu: fragment
+"czołowy" streamuje na żywo, kolejne są buforowane i wypuszczane, gdy wszystkie
+wcześniejsze się zakończą. Czas całości ogranicza więc najwolniejszy fragment,
+a nie suma wszystkich.
+"""
+
+import asyncio
+from typing import Callable, List, Optional, Sequence
+
+from utils.logger import logger
+from utils.text_chunker import TextChunk, join_chunks
+
+from .base_client import ErrorResult, PartialResult, is_error_result
+
+DEFAULT_CHUNK_CONCURRENCY = 4
+
+
+async def correct_text_chunked(
+    func: Callable,
+    api_key: str,
+    model: str,
+    chunks: Sequence[TextChunk],
+    instruction_prompt: str,
+    system_prompt: str,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    concurrency: int = DEFAULT_CHUNK_CONCURRENCY,
+    **options,
+) -> str:
+    """Poprawia fragmenty równolegle funkcją ``func`` i skleja je w kolejności.
+
+    Jeśli któryś fragment zwróci błąd (:class:`ErrorResult` albo pusty wynik),
+    pozostałe są anulowane, a wynikiem jest ``ErrorResult`` z numerem fragmentu.
+    Niepełny fragment (:class:`PartialResult`) czyni niepełnym cały wynik.
+    """
+    total = len(chunks)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    buffers: List[List[str]] = [[] for _ in range(total)]
+    finished = [False] * total
+    head = 0
+
+    def flush() -> None:
+        # Wypuść wszystko, co jest gotowe od początku dokumentu
+        nonlocal head
+        while head < total:
+            if buffers[head]:
+                on_chunk("".join(buffers[head]))
+                buffers[head].clear()
+            if not finished[head]:
+                return
+            if head < total - 1 and chunks[head].separator:
+                on_chunk(chunks[head].separator)
+            head += 1
+
+    def make_on_chunk(index: int):
+        def chunk_callback(delta: str) -> None:
+            if delta:
+                buffers[index].append(delta)
+                flush()
+        return chunk_callback
+
+    async def run_chunk(index: int):
+        async with semaphore:
+            result = await func(
+                api_key,
+                model,
+                chunks[index].body,
+                instruction_prompt,
+                system_prompt,
+                on_chunk=make_on_chunk(index) if on_chunk is not None else None,
+                **options,
+            )
+        if isinstance(result, PartialResult):
+            result = PartialResult(result.strip())
+        elif not is_error_result(result):
+            result = result.strip()
+        finished[index] = True
+        if on_chunk is not None:
+            flush()
+        return index, result
+
+    logger.info(f"Tryb długiego tekstu: {total} fragmentów, równolegle maks. {concurrency}")
+    tasks = [asyncio.ensure_future(run_chunk(index)) for index in range(total)]
+    try:
+        bodies = [""] * total
+        partial = False
+        for future in asyncio.as_completed(tasks):
+            index, result = await future
+            if is_error_result(result):
+                return ErrorResult(f"{result} (fragment {index + 1}/{total})")
+            partial = partial or isinstance(result, PartialResult)
+            bodies[index] = result
+        joined = join_chunks(chunks, bodies).strip()
+        return PartialResult(joined) if partial else joined
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
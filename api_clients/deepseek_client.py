@@ -7,7 +7,9 @@ from httpx import HTTPError, TimeoutException
 from utils.logger import log_api_error, log_connection_error, log_timeout_error, logger
 # PyQt6 removed - using CustomTkinter GUI now
 from gui.prompts import get_system_prompt
-from .base_client import DEFAULT_TIMEOUT, QUICK_TIMEOUT, CONNECTION_TIMEOUT, DEFAULT_RETRIES, APITimeoutError, DEEPSEEK_TIMEOUT
+from .base_client import DEFAULT_TIMEOUT, QUICK_TIMEOUT, CONNECTION_TIMEOUT, DEFAULT_RETRIES, APITimeoutError, DEEPSEEK_TIMEOUT, ErrorResult, warm_connection
+from .engine import add_shutdown_hook, get_engine
+from .progress import progress_event_hooks
 
 _DEEPSEEK_CLIENT_CACHE = None
 _HTTP2_AVAILABLE = True
@@ -17,11 +19,11 @@ except Exception:
     _HTTP2_AVAILABLE = False
 
 def _get_http_client():
-    """Reużywalny httpx.Client z HTTP/2 i keep-alive dla DeepSeek."""
+    """Reużywalny httpx.AsyncClient z HTTP/2 i keep-alive dla DeepSeek (pętla silnika)."""
     global _DEEPSEEK_CLIENT_CACHE
     if _DEEPSEEK_CLIENT_CACHE is not None:
         return _DEEPSEEK_CLIENT_CACHE
-    _DEEPSEEK_CLIENT_CACHE = httpx.Client(
+    _DEEPSEEK_CLIENT_CACHE = httpx.AsyncClient(
         http2=_HTTP2_AVAILABLE,
         timeout=httpx.Timeout(
             connect=CONNECTION_TIMEOUT,
@@ -30,11 +32,38 @@ def _get_http_client():
             pool=CONNECTION_TIMEOUT,
         ),
         limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30.0),
+        event_hooks=progress_event_hooks(),
     )
     return _DEEPSEEK_CLIENT_CACHE
 
+async def aclose_clients():
+    """Zamyka cache'owanego klienta DeepSeek (wołane przy zamykaniu silnika)."""
+    global _DEEPSEEK_CLIENT_CACHE
+    client, _DEEPSEEK_CLIENT_CACHE = _DEEPSEEK_CLIENT_CACHE, None
+    if client is not None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Nie udało się zamknąć klienta DeepSeek: {e}")
+
+add_shutdown_hook(aclose_clients)
+
+
+def invalidate_client(api_key=None):
+    """Po zmianie klucza zamyka wspólną pulę połączeń (klucz idzie w nagłówku
+    każdego zapytania, więc nowy klient powstanie przy następnym użyciu)."""
+    global _DEEPSEEK_CLIENT_CACHE
+    client, _DEEPSEEK_CLIENT_CACHE = _DEEPSEEK_CLIENT_CACHE, None
+    if client is not None:
+        get_engine().close_stale(client.aclose)
+        logger.info("DeepSeek: zamknięto pulę połączeń po zmianie klucza")
+
 DEEPSEEK_API_ENDPOINT = "https://api.deepseek.com/chat/completions" # Standardowy endpoint
 
+async def prewarm_connection(api_key=None, model=None):
+    """Otwiera połączenie do DeepSeek w puli współdzielonego klienta (prewarm po hotkeyu)."""
+    await warm_connection(_get_http_client(), "https://api.deepseek.com/")
+
 def show_connection_error():
     """Log connection error - GUI now handled by main application"""
     logger.error("Connection error - cannot connect to API server")
@@ -47,21 +76,21 @@ def handle_api_error(e):
         return True
     return False
 
-def correct_text_deepseek(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None):
+async def correct_text_deepseek_async(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None):
+    """Poprawia tekst używając DeepSeek API poprzez bezpośrednie zapytanie HTTP (korutyna)."""
     # Nie nadpisuj przekazanego system_prompt – jeśli pusty, wybierz wg stylu
     if not system_prompt:
         style = "prompt" if "prompt" in instruction_prompt.lower() else "normal"
         system_prompt = get_system_prompt(style)
-    """Poprawia tekst używając DeepSeek API poprzez bezpośrednie zapytanie HTTP."""
     if not api_key:
         logger.error("Brak klucza API DeepSeek")
-        return "Błąd: Klucz API DeepSeek nie został podany."
+        return ErrorResult("Błąd: Klucz API DeepSeek nie został podany.")
     if not model:
         logger.error("Brak modelu DeepSeek")
-        return "Błąd: Model DeepSeek nie został określony."
+        return ErrorResult("Błąd: Model DeepSeek nie został określony.")
     if not text_to_correct:
         logger.error("Brak tekstu do poprawy")
-        return "Błąd: Brak tekstu do poprawy."
+        return ErrorResult("Błąd: Brak tekstu do poprawy.")
 
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -89,15 +118,14 @@ def correct_text_deepseek(api_key, model, text_to_correct, instruction_prompt, s
             payload["stream"] = True
             collected_text = []
 
-            with client.stream("POST", DEEPSEEK_API_ENDPOINT, headers=headers, json=payload) as response:
+            async with client.stream("POST", DEEPSEEK_API_ENDPOINT, headers=headers, json=payload) as response:
                 response.raise_for_status()
-                for line in response.iter_lines():
+                async for line in response.aiter_lines():
                     if line.startswith("data: "):
                         data_str = line[6:]  # Remove "data: "
                         if data_str.strip() == "[DONE]":
                             break
                         try:
-                            import json
                             chunk_data = json.loads(data_str)
                             if chunk_data.get("choices") and len(chunk_data["choices"]) > 0:
                                 delta = chunk_data["choices"][0].get("delta", {})
@@ -116,10 +144,10 @@ def correct_text_deepseek(api_key, model, text_to_correct, instruction_prompt, s
                 return corrected_text
             else:
                 logger.warning("DeepSeek streaming nie zwróciło treści")
-                return "Błąd: Nie otrzymano treści ze streaming DeepSeek API."
+                return ErrorResult("Błąd: Nie otrzymano treści ze streaming DeepSeek API.")
 
         # Fallback do non-streaming
-        response = client.post(DEEPSEEK_API_ENDPOINT, headers=headers, json=payload)
+        response = await client.post(DEEPSEEK_API_ENDPOINT, headers=headers, json=payload)
         response.raise_for_status()
 
         response_data = response.json()
@@ -132,18 +160,18 @@ def correct_text_deepseek(api_key, model, text_to_correct, instruction_prompt, s
             else:
                 error_msg = "Brak treści w odpowiedzi API"
                 logger.error(f"{error_msg}. Response: {response_data}")
-                return f"Błąd DeepSeek: {error_msg}"
+                return ErrorResult(f"Błąd DeepSeek: {error_msg}")
         else:
             error_detail = response_data.get("error", {}).get("message", "Brak szczegółów błędu")
             logger.error(f"Brak 'choices' w odpowiedzi API. Error: {error_detail}")
-            return f"Błąd DeepSeek: Brak 'choices' w odpowiedzi API. Szczegóły: {error_detail}"
+            return ErrorResult(f"Błąd DeepSeek: Brak 'choices' w odpowiedzi API. Szczegóły: {error_detail}")
 
     except (httpx.TimeoutException, httpx.ReadTimeout, httpx.ConnectTimeout) as e:
         logger.error(f"Timeout DeepSeek API: {e}", exc_info=True)
-        return f"Błąd: DeepSeek API nie odpowiada (timeout {DEEPSEEK_TIMEOUT}s). Spróbuj ponownie."
+        return ErrorResult(f"Błąd: DeepSeek API nie odpowiada (timeout {DEEPSEEK_TIMEOUT}s). Spróbuj ponownie.")
     except (HTTPError, TimeoutException, httpx.ConnectError) as e:
         if handle_api_error(e):
-            return "Błąd połączenia z API. Sprawdź komunikat błędu."
+            return ErrorResult("Błąd połączenia z API. Sprawdź komunikat błędu.")
         error_content = "Brak danych błędu"
         try:
             if hasattr(e, 'response'):
@@ -152,11 +180,21 @@ def correct_text_deepseek(api_key, model, text_to_correct, instruction_prompt, s
             if hasattr(e, 'response'):
                 error_content = e.response.text
         log_api_error("DeepSeek", e, getattr(e, 'response', None))
-        return f"Błąd DeepSeek (HTTP {getattr(e, 'response', None) and e.response.status_code or 'N/A'}): {error_content}"
+        return ErrorResult(f"Błąd DeepSeek (HTTP {getattr(e, 'response', None) and e.response.status_code or 'N/A'}): {error_content}")
     
     except Exception as e:
         log_connection_error("DeepSeek", e)
-        return f"Błąd DeepSeek (nieoczekiwany): {str(e)}"
+        return ErrorResult(f"Błąd DeepSeek (nieoczekiwany): {str(e)}")
+
+def correct_text_deepseek(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None, cancel_event=None):
+    """Poprawia tekst używając DeepSeek API (synchroniczny wrapper na silnik asyncio).
+
+    Ustawienie ``cancel_event`` zamyka strumień od razu i zwraca "❌ Anulowano".
+    """
+    return get_engine().run_sync(
+        correct_text_deepseek_async(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=on_chunk),
+        cancel_event=cancel_event,
+    )
 
 if __name__ == '__main__':
     current_script_path = os.path.abspath(__file__)
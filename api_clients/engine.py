@@ -0,0 +1,590 @@
+"""Wspólny silnik transportowy asyncio dla wszystkich providerów.
+
+Zamiast dwóch wątków na każde zapytanie (wątek providera + wątek ``run_api``
+z pętlą odpytującą) wszystkie zapytania sesji działają jako korutyny na jednej,
+długo żyjącej pętli asyncio uruchomionej w wątku w tle. Orkiestrator (GUI)
+zgłasza sesję przez :meth:`CorrectionEngine.submit` i dostaje z powrotem
+strumień zdarzeń :class:`EngineEvent` (fragmenty tekstu, wynik, błąd,
+anulowanie). Anulowanie to zwykłe ``Task.cancel()`` – strumień HTTP zostaje
+zamknięty od razu, bez czekania aż serwer skończy generować odpowiedź.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.latency import get_latency_stats
+from utils.logger import logger
+from utils.response_cache import get_response_cache
+
+from utils.text_chunker import TextChunk
+
+from .base_client import ErrorResult, PartialResult, is_error_result
+from .chunked import DEFAULT_CHUNK_CONCURRENCY, correct_text_chunked
+from .progress import RequestProgress, set_current_progress
+
+AsyncCorrector = Callable[..., Awaitable[str]]
+
+# Prewarm tego samego providera częściej nie ma sensu – połączenie keep-alive
+# i tak żyje ~30 s w puli.
+PREWARM_MIN_INTERVAL = 10.0
+PREWARM_TIMEOUT = 5.0
+
+# Hedging: jeśli strumień nie dał pierwszego fragmentu po p95 TTFT danego
+# providera/modelu, wysyłamy drugie identyczne zapytanie; wygrywa to, które
+# pierwsze zacznie streamować. Budżet: każde zapytanie dokłada HEDGE_BUDGET_RATIO
+# żetonu (maks. HEDGE_BUDGET_BURST), hedge zużywa cały żeton.
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 5
+HEDGE_DEFAULT_DELAY = 8.0
+HEDGE_MIN_DELAY = 1.0
+HEDGE_BUDGET_RATIO = 0.1
+HEDGE_BUDGET_BURST = 3.0
+
+# Odtwarzanie trafienia z cache jako strumienia: ile słów na fragment
+CACHE_REPLAY_WORDS = 8
+_REPLAY_TOKEN = re.compile(r"\s*\S+\s*")
+
+# run_sync: co ile wątek wywołujący sprawdza cancel_event (górna granica
+# opóźnienia między ustawieniem zdarzenia a zamknięciem strumienia)
+CANCEL_POLL_INTERVAL = 0.05
+CANCELLED_RESULT = ErrorResult("❌ Anulowano")
+
+# Klient zastąpiony po zmianie klucza API jest zamykany dopiero po tym czasie,
+# żeby trwający na nim strumień mógł się dokończyć
+STALE_CLIENT_GRACE = 30.0
+
+
+@dataclass
+class ProviderRequest:
+    """Pojedyncze zapytanie do providera w ramach sesji."""
+
+    index: int
+    name: str
+    func: AsyncCorrector
+    api_key: str
+    model: str
+    text: str
+    instruction_prompt: str
+    system_prompt: str
+    stream: bool = True
+    # Klucz cache odpowiedzi (utils.response_cache); None = bez cache
+    cache_key: Optional[str] = None
+    # Dodatkowe argumenty nazwane dla funkcji providera (np. ai_settings dla OpenAI)
+    options: Dict[str, Any] = field(default_factory=dict)
+    # Czy wolno wysłać zapasowe zapytanie (hedge), gdy strumień się ociąga
+    hedge: bool = False
+    # Tryb długiego tekstu: fragmenty poprawiane równolegle i sklejane w kolejności
+    chunks: Optional[List[TextChunk]] = None
+    chunk_concurrency: int = DEFAULT_CHUNK_CONCURRENCY
+
+
+@dataclass(frozen=True)
+class EngineEvent:
+    """Zdarzenie publikowane przez silnik dla orkiestratora.
+
+    ``kind`` przyjmuje wartości: ``"chunk"`` (fragment strumienia),
+    ``"result"`` (pełny wynik), ``"error"`` (wyjątek) i ``"cancelled"``.
+    """
+
+    session_id: int
+    index: int
+    kind: str
+    data: str = ""
+    elapsed: float = 0.0
+
+
+EventCallback = Callable[[EngineEvent], None]
+ShutdownHook = Callable[[], Awaitable[None]]
+
+# Korutyny wołane na pętli silnika tuż przed jej zamknięciem (np. zamykanie
+# cache'owanych klientów HTTP, które są związane z tą pętlą).
+_shutdown_hooks: List[ShutdownHook] = []
+
+
+def add_shutdown_hook(hook: ShutdownHook) -> None:
+    """Rejestruje korutynę wołaną przy zamykaniu pętli silnika."""
+    if hook not in _shutdown_hooks:
+        _shutdown_hooks.append(hook)
+
+
+class SessionHandle:
+    """Uchwyt do sesji zgłoszonej do silnika – pozwala ją anulować."""
+
+    def __init__(self, engine: "CorrectionEngine", session_id: int):
+        self._engine = engine
+        self.session_id = session_id
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._active: set = set()
+        self._progress: Dict[int, RequestProgress] = {}
+
+    def is_active(self, index: Optional[int] = None) -> bool:
+        """Zwraca True, jeśli zapytanie (lub dowolne zapytanie sesji) wciąż trwa."""
+        if index is None:
+            return bool(self._active)
+        return index in self._active
+
+    def progress(self, index: int) -> Optional[RequestProgress]:
+        """Postęp zapytania (faza, odebrane tokeny) – do odczytu z wątku UI."""
+        return self._progress.get(index)
+
+    def cancel(self, index: Optional[int] = None) -> None:
+        """Anuluje jedno zapytanie albo całą sesję (nieblokujące)."""
+        self._engine._call_soon(self._cancel_on_loop, index)
+
+    def _cancel_on_loop(self, index: Optional[int]) -> None:
+        targets = [index] if index is not None else list(self._tasks)
+        for idx in targets:
+            task = self._tasks.get(idx)
+            if task is not None and not task.done():
+                task.cancel()
+
+
+class HedgeBudget:
+    """Budżet zapytań zapasowych, żeby hedging nie podwajał obciążenia.
+
+    Używany wyłącznie z wątku pętli silnika, więc bez blokad.
+    """
+
+    def __init__(self, ratio: float = HEDGE_BUDGET_RATIO, burst: float = HEDGE_BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+
+    def on_request(self) -> None:
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+def _latency_key(request: ProviderRequest) -> str:
+    return f"{request.name}/{request.model}"
+
+
+class CorrectionEngine:
+    """Jedna pętla asyncio w tle obsługująca wszystkie zapytania do API."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._last_prewarm: Dict[str, float] = {}
+        self._hedge_budget = HedgeBudget()
+
+    # ------------------------------------------------------------------ pętla
+    def start(self) -> None:
+        """Uruchamia wątek z pętlą asyncio (idempotentne)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(
+                target=self._run_loop, name="CorrectionEngine", daemon=True
+            )
+            self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        logger.info("Correction engine loop started")
+        try:
+            loop.run_forever()
+        finally:
+            try:
+                pending = asyncio.all_tasks(loop)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                for hook in list(_shutdown_hooks):
+                    try:
+                        loop.run_until_complete(hook())
+                    except Exception:
+                        logger.debug("Engine shutdown hook failed", exc_info=True)
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+                self._loop = None
+                logger.info("Correction engine loop stopped")
+
+    def _call_soon(self, callback, *args) -> None:
+        self.start()
+        self._loop.call_soon_threadsafe(callback, *args)
+
+    def in_engine_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    # ---------------------------------------------------------------- sesje
+    def submit(
+        self,
+        session_id: int,
+        requests: List[ProviderRequest],
+        on_event: EventCallback,
+    ) -> SessionHandle:
+        """Zgłasza sesję; zdarzenia trafiają do ``on_event`` z wątku silnika."""
+        handle = SessionHandle(self, session_id)
+        handle._active.update(request.index for request in requests)
+        self._call_soon(self._start_session, handle, requests, on_event)
+        return handle
+
+    def _start_session(
+        self,
+        handle: SessionHandle,
+        requests: List[ProviderRequest],
+        on_event: EventCallback,
+    ) -> None:
+        for request in requests:
+            task = asyncio.ensure_future(self._run_request(handle, request, on_event))
+            task.add_done_callback(
+                lambda t, r=request: self._on_task_done(handle, r, on_event, t)
+            )
+            handle._tasks[request.index] = task
+
+    @staticmethod
+    def _on_task_done(handle, request, on_event, task) -> None:
+        # Zadanie anulowane zanim zdążyło wystartować nie wyemituje zdarzenia samo.
+        if request.index in handle._active and task.cancelled():
+            try:
+                on_event(EngineEvent(handle.session_id, request.index, "cancelled"))
+            except Exception:
+                logger.debug("Engine event callback raised", exc_info=True)
+        handle._active.discard(request.index)
+
+    async def _run_request(
+        self,
+        handle: SessionHandle,
+        request: ProviderRequest,
+        on_event: EventCallback,
+    ) -> None:
+        session_id = handle.session_id
+        start_time = time.perf_counter()
+        progress = RequestProgress(expected_chars=len(request.text))
+        handle._progress[request.index] = progress
+        # Widoczne dla hooków klientów HTTP w tym zadaniu i zadaniach potomnych
+        set_current_progress(progress)
+
+        def emit(kind: str, data: str = "") -> None:
+            try:
+                on_event(
+                    EngineEvent(
+                        session_id,
+                        request.index,
+                        kind,
+                        data,
+                        time.perf_counter() - start_time,
+                    )
+                )
+            except Exception:
+                logger.debug("Engine event callback raised", exc_info=True)
+
+        def on_chunk(delta: str) -> None:
+            progress.on_chunk(delta)
+            emit("chunk", delta)
+
+        try:
+            cached = await self._cache_get(request)
+            if cached is not None:
+                logger.info(f"API {request.name}: odpowiedź z cache ({len(cached)} znaków)")
+                if request.stream:
+                    await self._replay_cached(cached, on_chunk)
+                result = cached
+            else:
+                result = await self._call_provider(request, on_chunk)
+                get_latency_stats().record(request.name, "total", time.perf_counter() - start_time)
+        except asyncio.CancelledError:
+            logger.info(f"API {request.name} anulowane (sesja {session_id})")
+            progress.finish()
+            handle._active.discard(request.index)
+            emit("cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"API {request.name} error: {e}", exc_info=True)
+            progress.finish()
+            emit("error", str(e))
+        else:
+            progress.finish()
+            if cached is None:
+                if progress.connected_at is not None:
+                    get_latency_stats().record(request.name, "connect", progress.connected_at - progress.started)
+                logger.info(f"API {request.name}: {progress.describe()}")
+            emit("result", result or "")
+            handle._active.discard(request.index)
+            if cached is None:
+                await self._cache_put(request, result)
+        handle._active.discard(request.index)
+
+    @staticmethod
+    async def _invoke(request: ProviderRequest, on_chunk) -> str:
+        if request.chunks and len(request.chunks) > 1:
+            return await correct_text_chunked(
+                request.func,
+                request.api_key,
+                request.model,
+                request.chunks,
+                request.instruction_prompt,
+                request.system_prompt,
+                on_chunk=on_chunk,
+                concurrency=request.chunk_concurrency,
+                **request.options,
+            )
+        return await request.func(
+            request.api_key,
+            request.model,
+            request.text,
+            request.instruction_prompt,
+            request.system_prompt,
+            on_chunk=on_chunk,
+            **request.options,
+        )
+
+    def _hedge_delay(self, request: ProviderRequest) -> float:
+        """Próg hedgingu: p95 TTFT z historii providera/modelu (lub wartość domyślna)."""
+        stats = get_latency_stats()
+        key = _latency_key(request)
+        if stats.count(key, "ttft") < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, stats.percentile(key, "ttft", HEDGE_PERCENTILE))
+
+    async def _call_provider(self, request: ProviderRequest, emit_chunk) -> str:
+        """Woła providera; przy ``request.hedge`` może dorzucić zapytanie zapasowe.
+
+        Każda próba dostaje własny callback fragmentów. Pierwsza, która zacznie
+        streamować, zostaje zwycięzcą – pozostałe są anulowane (zamykając swoje
+        strumienie HTTP), a ich fragmenty nigdy nie trafiają do UI.
+        """
+        if not request.stream:
+            return await self._invoke(request, None)
+
+        self._hedge_budget.on_request()
+        attempts: Dict[int, asyncio.Task] = {}
+        winner: Optional[int] = None
+
+        def make_on_chunk(attempt: int, started: float):
+            def on_chunk(delta: str) -> None:
+                nonlocal winner
+                if not delta:
+                    return
+                if winner is None:
+                    winner = attempt
+                    get_latency_stats().record(_latency_key(request), "ttft", time.perf_counter() - started)
+                    for other, task in attempts.items():
+                        if other != attempt and not task.done():
+                            logger.info(f"Hedge {request.name}: wygrała próba {attempt}, zamykam próbę {other}")
+                            task.cancel()
+                elif winner != attempt:
+                    return
+                emit_chunk(delta)
+            return on_chunk
+
+        def start_attempt(attempt: int) -> asyncio.Task:
+            task = asyncio.ensure_future(self._invoke(request, make_on_chunk(attempt, time.perf_counter())))
+            attempts[attempt] = task
+            return task
+
+        primary = start_attempt(0)
+        try:
+            if request.hedge:
+                delay = self._hedge_delay(request)
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done and winner is None:
+                    if self._hedge_budget.try_acquire():
+                        logger.info(
+                            f"Hedge {request.name}: brak pierwszego fragmentu po {delay:.1f}s – wysyłam zapytanie zapasowe"
+                        )
+                        get_latency_stats().record(_latency_key(request), "hedge", delay)
+                        start_attempt(1)
+                    else:
+                        logger.info(f"Hedge {request.name}: budżet wyczerpany – czekam na pierwsze zapytanie")
+
+            pending = set(attempts.values())
+            fallback: Optional[str] = None
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    attempt = next(a for a, t in attempts.items() if t is task)
+                    if task.cancelled() or (winner is not None and attempt != winner):
+                        continue
+                    if task.exception() is not None:
+                        error = task.exception()
+                        if winner == attempt:
+                            raise error
+                        continue
+                    result = task.result()
+                    if winner == attempt or not is_error_result(result):
+                        return result
+                    # Błąd bez strumienia – poczekaj, czy druga próba da coś lepszego
+                    fallback = result
+            if fallback is not None:
+                return fallback
+            if error is not None:
+                raise error
+            raise RuntimeError(f"Wszystkie próby {request.name} zostały anulowane")
+        finally:
+            for task in attempts.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*attempts.values(), return_exceptions=True)
+
+    @staticmethod
+    async def _cache_get(request: ProviderRequest) -> Optional[str]:
+        if request.cache_key is None:
+            return None
+        try:
+            return await asyncio.to_thread(get_response_cache().get, request.cache_key)
+        except Exception:
+            logger.debug("Response cache get failed", exc_info=True)
+            return None
+
+    @staticmethod
+    async def _cache_put(request: ProviderRequest, result: str) -> None:
+        if request.cache_key is None or is_error_result(result) or isinstance(result, PartialResult):
+            return
+        try:
+            await asyncio.to_thread(get_response_cache().put, request.cache_key, result)
+        except Exception:
+            logger.debug("Response cache put failed", exc_info=True)
+
+    @staticmethod
+    async def _replay_cached(text: str, on_chunk) -> None:
+        """Podaje zapisany wynik fragmentami, żeby UI szło tą samą ścieżką co strumień."""
+        tokens = _REPLAY_TOKEN.findall(text)
+        for start in range(0, len(tokens), CACHE_REPLAY_WORDS):
+            on_chunk("".join(tokens[start:start + CACHE_REPLAY_WORDS]))
+            await asyncio.sleep(0)
+
+    # ------------------------------------------------------ klienci HTTP
+    def close_stale(self, closer: Callable[[], Awaitable[None]], delay: Optional[float] = None) -> None:
+        """Zamyka zastąpionego klienta na pętli silnika po ``delay`` s (dowolny wątek).
+
+        Gdy pętla nie działa, klient nigdy nie był na niej używany – nie ma czego
+        zamykać. Przy zamykaniu silnika czekanie jest przerywane, a klient i tak
+        zamknięty.
+        """
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+        grace = STALE_CLIENT_GRACE if delay is None else delay
+        loop.call_soon_threadsafe(lambda: asyncio.ensure_future(self._close_later(closer, grace)))
+
+    @staticmethod
+    async def _close_later(closer: Callable[[], Awaitable[None]], delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            try:
+                await closer()
+            except Exception as e:
+                logger.debug(f"Zamykanie starego klienta nieudane: {e}")
+
+    # -------------------------------------------------------------- prewarm
+    def prewarm(self, name: str, warmer: Callable[[], Awaitable[None]]) -> None:
+        """Nawiązuje połączenie z providerem w tle (TCP+TLS, preface HTTP/2).
+
+        Nieblokujące i odporne na błędy – wynik jest ignorowany, liczy się tylko
+        otwarte połączenie w puli klienta. Wywołania częstsze niż
+        ``PREWARM_MIN_INTERVAL`` dla tego samego providera są pomijane.
+        """
+        now = time.monotonic()
+        last = self._last_prewarm.get(name)
+        if last is not None and now - last < PREWARM_MIN_INTERVAL:
+            return
+        self._last_prewarm[name] = now
+        self._call_soon(self._start_prewarm, name, warmer)
+
+    def _start_prewarm(self, name: str, warmer: Callable[[], Awaitable[None]]) -> None:
+        asyncio.ensure_future(self._run_prewarm(name, warmer))
+
+    async def _run_prewarm(self, name: str, warmer: Callable[[], Awaitable[None]]) -> None:
+        start_time = time.perf_counter()
+        try:
+            await asyncio.wait_for(warmer(), PREWARM_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Prewarm {name} nieudany: {e}")
+            return
+        elapsed = time.perf_counter() - start_time
+        get_latency_stats().record(name, "prewarm", elapsed)
+        logger.info(f"Prewarm {name}: połączenie gotowe w {elapsed * 1000:.0f} ms")
+
+    def run_sync(
+        self,
+        coro: Awaitable[str],
+        timeout: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> str:
+        """Wykonuje korutynę na pętli silnika i blokuje do wyniku.
+
+        Używane przez synchroniczne wrappery ``correct_text_*``. Ustawienie
+        ``cancel_event`` (z dowolnego wątku) anuluje zadanie na pętli – klient
+        zamyka strumień HTTP w ``async with``/``finally`` – a wrapper zwraca
+        :data:`CANCELLED_RESULT` najpóźniej po :data:`CANCEL_POLL_INTERVAL`.
+        """
+        if self.in_engine_thread():
+            raise RuntimeError("run_sync nie może być wołane z wątku silnika")
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            if cancel_event is None:
+                return future.result(timeout)
+            done = threading.Event()
+            future.add_done_callback(lambda _future: done.set())
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            while not done.wait(CANCEL_POLL_INTERVAL):
+                if cancel_event.is_set():
+                    future.cancel()
+                    return CANCELLED_RESULT
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError("run_sync: przekroczono limit czasu")
+            if future.cancelled():
+                return CANCELLED_RESULT
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Zatrzymuje pętlę, anulując trwające zapytania."""
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_engine: Optional[CorrectionEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> CorrectionEngine:
+    """Singleton silnika transportowego."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = CorrectionEngine()
+    return _engine
+
+
+def shutdown_engine(timeout: float = 2.0) -> None:
+    """Zamyka globalny silnik (przy wyjściu z aplikacji)."""
+    global _engine
+    with _engine_lock:
+        engine = _engine
+        _engine = None
+    if engine is not None:
+        engine.shutdown(timeout)
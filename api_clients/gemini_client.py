@@ -2,15 +2,18 @@
 
 The implementation focuses on a single transport – ``google-genai`` – which is the
 library Google now documents for the Gemini API. Streaming is handled through
-``client.models.generate_content_stream``; incremental text chunks are forwarded to
-our UI callback, and we honor cancellation via ``threading.Event`` so the UI can
-interrupt long generations without waiting for the back end to finish.
+``client.aio.models.generate_content_stream`` on the shared engine loop
+(:mod:`api_clients.engine`); incremental text chunks are forwarded to our UI
+callback, and cancelling the engine task (or setting the legacy ``threading.Event``)
+interrupts long generations without waiting for the back end to finish.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+import asyncio
 import threading
 
 from google import genai
@@ -25,6 +28,9 @@ APIError = getattr(genai_errors, "APIError", Exception)
 
 from gui.prompts import get_system_prompt
 from utils.logger import log_api_error, log_connection_error, logger
+from .base_client import ErrorResult
+from .engine import add_shutdown_hook, get_engine
+from .progress import report_connected
 
 ChunkCallback = Callable[[str], None]
 
@@ -78,10 +84,87 @@ class _StreamingState:
         return self.snapshot
 
 
+_CLIENT_CACHE: Dict[str, genai.Client] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
 def _build_client(api_key: str) -> genai.Client:
     return genai.Client(api_key=api_key)
 
 
+def _get_client(api_key: str) -> genai.Client:
+    """Return the cached ``genai.Client`` for ``api_key`` (one transport per key)."""
+
+    with _CLIENT_CACHE_LOCK:
+        client = _CLIENT_CACHE.get(api_key)
+        if client is None:
+            client = _build_client(api_key)
+            _CLIENT_CACHE[api_key] = client
+        return client
+
+
+def invalidate_client(api_key: Optional[str] = None) -> None:
+    """Drop cached clients – a single key (e.g. after it changed in settings) or all.
+
+    Evicted clients are closed on the engine loop after ``STALE_CLIENT_GRACE``.
+    """
+
+    with _CLIENT_CACHE_LOCK:
+        if api_key is None:
+            stale = list(_CLIENT_CACHE.values())
+            _CLIENT_CACHE.clear()
+        else:
+            client = _CLIENT_CACHE.pop(api_key, None)
+            stale = [client] if client is not None else []
+    for client in stale:
+        # The grace period lets an in-flight stream on the old client finish
+        closer = getattr(getattr(client, "aio", None), "aclose", None)
+        if callable(closer):
+            get_engine().close_stale(closer)
+    if stale:
+        logger.info("Gemini: usunięto %s klient(ów) z cache", len(stale))
+
+
+async def aclose_clients() -> None:
+    """Close cached clients' async transports (engine shutdown hook)."""
+
+    with _CLIENT_CACHE_LOCK:
+        clients = list(_CLIENT_CACHE.values())
+        _CLIENT_CACHE.clear()
+    for client in clients:
+        closer = getattr(getattr(client, "aio", None), "aclose", None)
+        if callable(closer):
+            try:
+                await closer()
+            except Exception:  # pragma: no cover - best effort
+                logger.debug("Closing Gemini client raised", exc_info=True)
+
+
+add_shutdown_hook(aclose_clients)
+
+
+async def prewarm_connection(api_key: str, model: Optional[str] = None) -> None:
+    """Open the SDK client's connection ahead of the real request (hotkey prewarm).
+
+    The genai transport is internal to the SDK, so the cheapest way to get a
+    live connection into its pool is a metadata lookup of the configured model.
+    """
+
+    client = _get_client(api_key)
+    await client.aio.models.get(model=model or "gemini-2.5-flash")
+
+
+@lru_cache(maxsize=16)
+def _get_generation_config(system_instruction: str, style: str) -> types.GenerateContentConfig:
+    """Cached generation config keyed by (system_instruction, style).
+
+    ``style`` is part of the key so prompt/normal configs never share an entry even
+    when a custom system prompt is passed for both.
+    """
+
+    return _build_generation_config(system_instruction)
+
+
 def _build_generation_config(system_instruction: str) -> types.GenerateContentConfig:
     return types.GenerateContentConfig(
         system_instruction=system_instruction,
@@ -100,16 +183,18 @@ def _build_generation_config(system_instruction: str) -> types.GenerateContentCo
     )
 
 
-def _close_stream(response: object) -> None:
-    closer = getattr(response, "close", None)
+async def _close_stream(response: object) -> None:
+    closer = getattr(response, "aclose", None) or getattr(response, "close", None)
     if callable(closer):
         try:
-            closer()
+            result = closer()
+            if asyncio.iscoroutine(result):
+                await result
         except Exception:  # pragma: no cover - best effort
             logger.debug("Closing Gemini stream raised", exc_info=True)
 
 
-def correct_text_gemini(
+async def correct_text_gemini_async(
     api_key: str,
     model: str,
     text_to_correct: str,
@@ -118,23 +203,23 @@ def correct_text_gemini(
     on_chunk: Optional[ChunkCallback] = None,
     cancel_event: Optional[threading.Event] = None,
 ) -> str:
-    """Correct text with Gemini using streaming only."""
+    """Correct text with Gemini using streaming only (coroutine for the engine loop)."""
 
     style = "prompt" if "prompt" in instruction_prompt.lower() else "normal"
     system_instruction = system_prompt or get_system_prompt(style)
 
     if not api_key:
         logger.warning("Próba użycia Google Gemini API bez klucza.")
-        return "Błąd: Klucz API Google Gemini nie został podany."
+        return ErrorResult("Błąd: Klucz API Google Gemini nie został podany.")
     if not model:
         logger.warning("Próba użycia Google Gemini API bez podania modelu.")
-        return "Błąd: Model Google Gemini nie został określony."
+        return ErrorResult("Błąd: Model Google Gemini nie został określony.")
     if not text_to_correct:
         logger.warning("Próba użycia Google Gemini API bez tekstu do poprawy.")
-        return "Błąd: Brak tekstu do poprawy."
+        return ErrorResult("Błąd: Brak tekstu do poprawy.")
 
     if cancel_event and cancel_event.is_set():
-        return "❌ Anulowano"
+        return ErrorResult("❌ Anulowano")
 
     logger.info(
         "Wysyłanie zapytania do Google Gemini API (model: %s). Tekst: %s...",
@@ -142,11 +227,12 @@ def correct_text_gemini(
         text_to_correct[:50],
     )
 
-    client = _build_client(api_key)
+    client = _get_client(api_key)
     state = _StreamingState()
+    stream = None
 
     try:
-        stream = client.models.generate_content_stream(
+        stream = await client.aio.models.generate_content_stream(
             model=model,
             contents=[
                 types.UserContent(
@@ -156,13 +242,14 @@ def correct_text_gemini(
                     ]
                 )
             ],
-            config=_build_generation_config(system_instruction),
+            config=_get_generation_config(system_instruction, style),
         )
+        # No httpx hooks through the SDK – the streamed response has arrived by now
+        report_connected()
 
-        for chunk in stream:
+        async for chunk in stream:
             if cancel_event and cancel_event.is_set():
-                _close_stream(stream)
-                return state.text or "❌ Anulowano"
+                return state.text or ErrorResult("❌ Anulowano")
 
             chunk_text = getattr(chunk, "text", None)
             if not chunk_text:
@@ -179,15 +266,47 @@ def correct_text_gemini(
         final_text = state.text
         if not final_text:
             logger.warning("Gemini nie zwrócił treści w odpowiedzi.")
-            return "Błąd: Gemini nie zwrócił treści w odpowiedzi."
+            return ErrorResult("Błąd: Gemini nie zwrócił treści w odpowiedzi.")
         return final_text.strip()
 
     except ClientError as err:
         log_api_error("Gemini", err)
-        return f"Błąd Gemini (HTTP {getattr(err, 'code', '??')}): {err}"
+        return ErrorResult(f"Błąd Gemini (HTTP {getattr(err, 'code', '??')}): {err}")
     except APIError as err:
         log_connection_error("Gemini", err)
-        return f"Błąd Gemini (połączenie): {err}"
+        return ErrorResult(f"Błąd Gemini (połączenie): {err}")
     except Exception as err:  # pragma: no cover - catch-all for SDK regressions
         log_connection_error("Gemini", err)
-        return f"Błąd Gemini (nieoczekiwany): {err}"
+        return ErrorResult(f"Błąd Gemini (nieoczekiwany): {err}")
+    finally:
+        # Cancellation (Task.cancel) lands here as well – close the HTTP stream at once.
+        if stream is not None:
+            await _close_stream(stream)
+
+
+def correct_text_gemini(
+    api_key: str,
+    model: str,
+    text_to_correct: str,
+    instruction_prompt: str,
+    system_prompt: str,
+    on_chunk: Optional[ChunkCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> str:
+    """Correct text with Gemini – blocking wrapper around the engine coroutine.
+
+    Setting ``cancel_event`` cancels the engine task, which closes the HTTP stream.
+    """
+
+    return get_engine().run_sync(
+        correct_text_gemini_async(
+            api_key,
+            model,
+            text_to_correct,
+            instruction_prompt,
+            system_prompt,
+            on_chunk=on_chunk,
+            cancel_event=cancel_event,
+        ),
+        cancel_event=cancel_event,
+    )
@@ -0,0 +1,165 @@
+"""Zapamiętane możliwości modeli OpenAI (wariant nazwy, endpoint, kształt payloadu).
+
+Dla modeli gpt-5/o1 klient próbuje kolejnych wariantów nazwy modelu, najpierw
+``responses.stream``, potem ``responses.create`` z parametrami reasoning/verbosity
+("rich") i bez nich ("simple"). Gdy któraś ścieżka zadziała, zapisujemy ją tutaj
+(w pliku JSON w katalogu cache), a kolejne wywołania idą nią od razu. Ponowne
+sondowanie następuje tylko wtedy, gdy zapamiętana ścieżka zwróci błąd.
+
+Zapamiętujemy tylko warianty będące aliasami wybranego modelu (np.
+``gpt-5-mini-2025-08-07`` dla ``gpt-5-mini``). Zastępczy inny model (np.
+``gpt-4o-mini``) może jednorazowo uratować zapytanie, ale nie może na stałe
+zastąpić modelu wybranego przez użytkownika.
+
+Klucz to (odcisk klucza API, model) – sam klucz API nie trafia na dysk. Plik
+jest zapisywany poza pętlą asyncio (w puli wątków), żeby nie blokować silnika.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+from utils.logger import logger
+from utils.paths import get_cache_dir_path
+
+CAPABILITIES_FILE_NAME = "openai_capabilities.json"
+
+_capabilities: Optional[Dict[str, dict]] = None
+_lock = threading.Lock()
+# Zapisy mogą kończyć się w innej kolejności niż zlecono - starszy nie nadpisuje nowszego
+_write_lock = threading.Lock()
+_save_seq = 0
+_written_seq = 0
+
+_ALIAS_SUFFIX = re.compile(r"-(\d{4}-\d{2}-\d{2}|preview|latest)")
+# Odpowiedzi API mówiące, że stream dla modelu/konta nie jest dostępny (a nie chwilowy błąd)
+_STREAM_UNSUPPORTED_STATUS = (400, 403, 422)
+_STREAM_UNSUPPORTED = re.compile(
+    r"stream.{0,80}(unsupported|not supported|not allowed|does not support|not available)"
+    r"|(unsupported|not supported|not allowed|does not support).{0,80}stream"
+    r"|verified to stream",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def is_model_alias(model: str, variant: str) -> bool:
+    """Czy ``variant`` to ten sam model (data wydania, preview, latest)."""
+    if variant == model:
+        return True
+    return variant.startswith(model) and bool(_ALIAS_SUFFIX.fullmatch(variant[len(model):]))
+
+
+def is_stream_unsupported(error: BaseException) -> bool:
+    """Czy błąd ``responses.stream`` oznacza trwały brak streamingu dla modelu.
+
+    Tylko odrzucenie zapytania przez API (400/403/422) z komunikatem o
+    streamingu. Timeouty, zerwane połączenia, 429 i 5xx są chwilowe – po nich
+    stream jest próbowany znowu przy następnym zapytaniu.
+    """
+    if getattr(error, "status_code", None) not in _STREAM_UNSUPPORTED_STATUS:
+        return False
+    return bool(_STREAM_UNSUPPORTED.search(str(error)))
+
+
+def _key_fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_key(api_key: str, model: str) -> str:
+    return f"{_key_fingerprint(api_key)}|{model}"
+
+
+def _file_path() -> str:
+    return os.path.join(get_cache_dir_path(), CAPABILITIES_FILE_NAME)
+
+
+def _load() -> Dict[str, dict]:
+    global _capabilities
+    if _capabilities is None:
+        try:
+            with open(_file_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            _capabilities = data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            _capabilities = {}
+        except Exception as e:
+            logger.warning(f"Nie udało się wczytać cache możliwości OpenAI: {e}")
+            _capabilities = {}
+    return _capabilities
+
+
+def _write(content: str, seq: int) -> None:
+    global _written_seq
+    with _write_lock:
+        if seq <= _written_seq:
+            return
+        path = _file_path()
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            _written_seq = seq
+        except Exception as e:
+            logger.warning(f"Nie udało się zapisać cache możliwości OpenAI: {e}")
+
+
+def _save() -> None:
+    """Zapisuje migawkę (wołane pod ``_lock``); na pętli asyncio - w puli wątków."""
+    global _save_seq
+    _save_seq += 1
+    content = json.dumps(_capabilities, indent=2, sort_keys=True)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _write(content, _save_seq)
+        return
+    loop.run_in_executor(None, _write, content, _save_seq)
+
+
+def get_capability(api_key: str, model: str) -> Optional[dict]:
+    """Zwraca zapamiętaną ścieżkę dla (klucz, model) albo None.
+
+    Słownik ma pola: ``variant`` (nazwa modelu wysyłana do API), ``endpoint``
+    (``"responses"``), ``payload`` (``"rich"``/``"simple"``/None) i ``stream``
+    (True/False/None – czy ``responses.stream`` działa; None = nie sprawdzano,
+    False tylko po błędzie z :func:`is_stream_unsupported`).
+    """
+    with _lock:
+        entry = _load().get(_entry_key(api_key, model))
+        return dict(entry) if entry else None
+
+
+def record_capability(api_key: str, model: str, **fields) -> None:
+    """Zapisuje (lub uzupełnia) działającą ścieżkę; pola None nie nadpisują starych.
+
+    Wariant, który nie jest aliasem ``model``, nie jest zapamiętywany.
+    """
+    variant = fields.get("variant")
+    if variant is not None and not is_model_alias(model, variant):
+        logger.warning(f"OpenAI: {model} obsłużony zastępczo przez {variant} - nie zapamiętuję")
+        return
+    with _lock:
+        capabilities = _load()
+        key = _entry_key(api_key, model)
+        entry = dict(capabilities.get(key) or {})
+        updated = dict(entry)
+        updated.update({name: value for name, value in fields.items() if value is not None})
+        if updated == entry:
+            return
+        capabilities[key] = updated
+        logger.info(f"OpenAI: zapamiętano ścieżkę dla {model}: {updated}")
+        _save()
+
+
+def forget_capability(api_key: str, model: str) -> None:
+    """Usuwa zapamiętaną ścieżkę (np. gdy przestała działać i sondowanie też zawiodło)."""
+    with _lock:
+        capabilities = _load()
+        if capabilities.pop(_entry_key(api_key, model), None) is not None:
+            logger.info(f"OpenAI: usunięto zapamiętaną ścieżkę dla {model}")
+            _save()
@@ -1,4 +1,5 @@
 # from .base_client import APIConnectionError, APIResponseError, DEFAULT_TIMEOUT # Zakomentowano - nieużywane w tym pliku
+import asyncio
 import time # Dla symulacji opóźnienia
 import openai
 import os
@@ -9,14 +10,23 @@ import httpx
 from httpx import HTTPError, TimeoutException
 # PyQt6 removed - using CustomTkinter GUI now
 from gui.prompts import get_system_prompt
-from .base_client import DEFAULT_TIMEOUT, QUICK_TIMEOUT, CONNECTION_TIMEOUT, DEFAULT_RETRIES, APITimeoutError
+from .base_client import DEFAULT_TIMEOUT, QUICK_TIMEOUT, CONNECTION_TIMEOUT, DEFAULT_RETRIES, APITimeoutError, ErrorResult, PartialResult, warm_connection
+from .engine import add_shutdown_hook, get_engine
+from .progress import progress_event_hooks
+from .openai_capabilities import (
+    forget_capability,
+    get_capability,
+    is_model_alias,
+    is_stream_unsupported,
+    record_capability,
+)
 
 # Importujemy logger z odpowiedniego miejsca w strukturze projektu
 # Zakładamy, że api_clients jest na tym samym poziomie co utils
 # więc potrzebujemy .utils.logger
 try:
     from utils.logger import logger
-    from utils.config_manager import get_config_value
+    from utils.config_manager import get_config_snapshot
 except ImportError:
     # Fallback logger w przypadku problemów z importem (np. bezpośrednie uruchamianie)
     import logging
@@ -48,6 +58,8 @@ def handle_api_error(e):
     return False
 
 _OPENAI_CLIENT_CACHE = {}
+_OPENAI_HTTP_CACHE = {}
+OPENAI_API_BASE = "https://api.openai.com/v1"
 _HTTP2_AVAILABLE = True
 try:
     import h2  # type: ignore
@@ -55,13 +67,16 @@ except Exception:
     _HTTP2_AVAILABLE = False
 
 
-def _get_openai_client(api_key: str) -> openai.OpenAI:
-    """Zwraca cache'owanego klienta OpenAI z HTTP/2 i połączeniami keep-alive."""
+def _get_openai_client(api_key: str) -> openai.AsyncOpenAI:
+    """Zwraca cache'owanego klienta OpenAI z HTTP/2 i połączeniami keep-alive.
+
+    Klient jest asynchroniczny i związany z pętlą silnika (api_clients.engine).
+    """
     client = _OPENAI_CLIENT_CACHE.get(api_key)
     if client is not None:
         return client
 
-    http_client = httpx.Client(
+    http_client = httpx.AsyncClient(
         http2=_HTTP2_AVAILABLE,
         timeout=httpx.Timeout(
             connect=CONNECTION_TIMEOUT,
@@ -70,9 +85,10 @@ def _get_openai_client(api_key: str) -> openai.OpenAI:
             pool=CONNECTION_TIMEOUT,
         ),
         limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30.0),
+        event_hooks=progress_event_hooks(),
     )
 
-    client = openai.OpenAI(
+    client = openai.AsyncOpenAI(
         api_key=api_key,
         timeout=httpx.Timeout(
             connect=CONNECTION_TIMEOUT,
@@ -84,22 +100,160 @@ def _get_openai_client(api_key: str) -> openai.OpenAI:
         http_client=http_client,
     )
     _OPENAI_CLIENT_CACHE[api_key] = client
+    _OPENAI_HTTP_CACHE[api_key] = http_client
     return client
 
 
-def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None):
-    """Poprawia tekst używając OpenAI API."""
-    
-        
+async def prewarm_connection(api_key, model=None):
+    """Otwiera połączenie do OpenAI w puli cache'owanego klienta (prewarm po hotkeyu)."""
+    _get_openai_client(api_key)
+    await warm_connection(_OPENAI_HTTP_CACHE[api_key], OPENAI_API_BASE)
+
+
+async def aclose_clients():
+    """Zamyka cache'owanych klientów OpenAI (wołane przy zamykaniu silnika)."""
+    clients = list(_OPENAI_CLIENT_CACHE.values())
+    _OPENAI_CLIENT_CACHE.clear()
+    _OPENAI_HTTP_CACHE.clear()
+    for client in clients:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"Nie udało się zamknąć klienta OpenAI: {e}")
+
+
+add_shutdown_hook(aclose_clients)
+
+
+def invalidate_client(api_key=None):
+    """Usuwa klienta z cache (np. po zmianie klucza w ustawieniach) albo wszystkich.
+
+    Usunięci klienci są zamykani na pętli silnika po STALE_CLIENT_GRACE.
+    """
+    keys = list(_OPENAI_CLIENT_CACHE) if api_key is None else [api_key]
+    for key in keys:
+        client = _OPENAI_CLIENT_CACHE.pop(key, None)
+        _OPENAI_HTTP_CACHE.pop(key, None)
+        if client is not None:
+            get_engine().close_stale(client.close)
+            logger.info("OpenAI: usunięto klienta z cache")
+
+
+def _model_variants(model):
+    """Zwraca listę wariantów nazwy modelu próbowanych w Responses API."""
+    if model == "gpt-5-mini":
+        return ["gpt-5-mini", "gpt-5-mini-2025-08-07", "gpt-5-mini-preview", "o1-mini", "gpt-4o-mini"]
+    if model == "gpt-5":
+        return ["gpt-5", "gpt-5-2025-08-07", "gpt-5-preview", "o1-preview", "gpt-4o"]
+    if model == "o1-mini":
+        return ["o1-mini", "gpt-4o-mini"]
+    return [model]
+
+
+async def _stream_chat_completion(client, model, messages, on_chunk):
+    """Streamuje Chat Completions i zwraca złożony tekst.
+
+    Jeśli strumień urwie się w trakcie, zwraca to, co dotarło, jako
+    :class:`PartialResult`.
+    """
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        stream=True,
+        max_tokens=2000
+    )
+    collected = []
+    try:
+        async for chunk in stream:
+            try:
+                delta = chunk.choices[0].delta.content or ''
+            except Exception:
+                delta = ''
+            if delta:
+                collected.append(delta)
+                try:
+                    on_chunk(delta)
+                except Exception:
+                    pass
+    except Exception as e:
+        logger.warning(f"OpenAI stream interrupted: {e}")
+        return PartialResult(("".join(collected)).strip())
+    finally:
+        await _close_stream(stream)
+    return ("".join(collected)).strip()
+
+
+async def _close_stream(stream):
+    closer = getattr(stream, "close", None)
+    if callable(closer):
+        try:
+            result = closer()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:
+            logger.debug("Closing OpenAI stream raised", exc_info=True)
+
+
+def _clean_output(corrected_text):
+    """Czyści odpowiedź modelu z separatorów i nagłówków stylu."""
+    logger.info("✅ Otrzymano poprawną odpowiedź od OpenAI API.")
+    logger.info(f"🔍 DEBUG: Original response (100 chars): '{corrected_text[:100]}...'")
+
+    # Czyszczenie odpowiedzi - bardziej ostrożne
+    original_text = corrected_text
+    corrected_text = corrected_text.strip()
+    logger.info(f"🔍 DEBUG: Po strip: {len(corrected_text)} chars")
+
+    # Usuń wszystkie wystąpienia --- z początku i końca (ale zachowaj treść)
+    while corrected_text.startswith("---"):
+        corrected_text = corrected_text[3:].strip()
+        logger.info(f"🔍 DEBUG: Po usuwaniu --- z początku: {len(corrected_text)} chars")
+    while corrected_text.endswith("---"):
+        corrected_text = corrected_text[:-3].strip()
+        logger.info(f"🔍 DEBUG: Po usuwaniu --- z końca: {len(corrected_text)} chars")
+
+    # Dodatkowe czyszczenie - usuń linie zawierające same ---
+    lines_before = corrected_text.splitlines()
+    lines = [line for line in lines_before if line.strip() != "---"]
+    logger.info(f"🔍 DEBUG: Linie przed: {len(lines_before)}, po usunięciu ---: {len(lines)}")
+    corrected_text = "\n".join(lines).strip()
+
+    # Usuń puste linie na początku i końcu (ale zostaw niepuste)
+    lines = [line for line in corrected_text.splitlines() if line.strip()]
+    logger.info(f"🔍 DEBUG: Po usunięciu pustych linii: {len(lines)} linii")
+
+    # Usuń pierwszą linię jeśli to nazwa stylu
+    style_names = ["normal", "professional", "translate_en", "translate_pl", "change_meaning", "summary"]
+    if lines and any(style in lines[0].lower() for style in style_names):
+        logger.info(f"🔍 DEBUG: Usuwam pierwszą linię (style): '{lines[0]}'")
+        lines = lines[1:]
+
+    final_result = "\n".join(lines).strip()
+    logger.info(f"🔍 DEBUG: Final result: {len(final_result)} chars: '{final_result[:100]}...'")
+
+    # Jeśli po czyszczeniu nic nie zostało, zwróć original
+    if not final_result and original_text:
+        logger.warning("❌ Czyszczenie usunęło całą treść! Zwracam oryginalną odpowiedź")
+        return original_text.strip()
+
+    return final_result
+
+
+async def correct_text_openai_async(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None, ai_settings=None):
+    """Poprawia tekst używając OpenAI API (korutyna dla silnika asyncio).
+
+    ``ai_settings`` (ReasoningEffort/Verbosity) przekazuje wywołujący; gdy brak,
+    brane są ze snapshotu konfiguracji w pamięci (bez czytania pliku).
+    """
     if not api_key:
         logger.warning("Próba użycia OpenAI API bez klucza.") # Logowanie ostrzeżenia
-        return "Błąd: Klucz API OpenAI nie został podany."
+        return ErrorResult("Błąd: Klucz API OpenAI nie został podany.")
     if not model:
         logger.warning("Próba użycia OpenAI API bez podania modelu.") # Logowanie ostrzeżenia
-        return "Błąd: Model OpenAI nie został określony."
+        return ErrorResult("Błąd: Model OpenAI nie został określony.")
     if not text_to_correct:
         logger.warning("Próba użycia OpenAI API bez tekstu do poprawy.") # Logowanie ostrzeżenia
-        return "Błąd: Brak tekstu do poprawy."
+        return ErrorResult("Błąd: Brak tekstu do poprawy.")
 
     logger.info(f"Wysyłanie zapytania do OpenAI API (model: {model}). Tekst: {text_to_correct[:50]}...") # Logowanie rozpoczęcia zapytania
 
@@ -112,72 +266,71 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
             current_system_prompt = get_system_prompt("prompt" if "prompt" in instruction_prompt.lower() else "normal")
         else:
             current_system_prompt = system_prompt
-        
+
         # Przygotowanie wiadomości dla Chat Completions API
         messages = [
             {"role": "system", "content": current_system_prompt},
             {"role": "user", "content": f"{instruction_prompt}\n\n---\n{text_to_correct}\n---"}
         ]
+        responses_input = f"{current_system_prompt}\n\n{instruction_prompt}\n\n---\n{text_to_correct}\n---"
 
-        # Wysłanie zapytania do API z timeout
         response = None
-        
+        corrected_text = ""
+
         logger.info(f"🔍 DEBUG: Rozpoczynam korekcję dla modelu: {model}")
 
         # GPT-5 i o1 modele WYMAGAJĄ Responses API (nie działają z Chat Completions)
         # gpt-4o-mini używa Chat Completions API
         use_responses_api = any(model.lower().startswith(prefix) for prefix in ["gpt-5", "o1"])
-        
+
         logger.info(f"🔍 DEBUG: Model: {model}, use_responses_api: {use_responses_api}")
-        
+
         try:
             if use_responses_api:
                 # Responses API dla nowszych modeli z reasoning controls
-                # Pobierz ustawienia z config.ini lub użyj domyślnych
-                try:
-                    import configparser
-                    from utils.config_manager import get_config_path
-                    config = configparser.ConfigParser()
-                    config.read(get_config_path())
-                    reasoning_effort = get_config_value(config, "AI_SETTINGS", "ReasoningEffort", "high")
-                    verbosity = get_config_value(config, "AI_SETTINGS", "Verbosity", "medium")
-                except:
-                    # Fallback values jeśli problem z konfiguracją
-                    reasoning_effort = "high"
-                    verbosity = "medium"
-                
+                # Ustawienia z argumentu lub snapshotu konfiguracji, inaczej domyślne
+                if ai_settings is None:
+                    try:
+                        ai_settings = get_config_snapshot().ai_settings
+                    except Exception:
+                        ai_settings = {}
+                reasoning_effort = ai_settings.get("ReasoningEffort") or "high"
+                verbosity = ai_settings.get("Verbosity") or "medium"
+
                 logger.info(f"OpenAI Responses API: model={model}, reasoning_effort={reasoning_effort}, verbosity={verbosity}")
-                
+
                 # Sprawdź czy SDK ma responses API
                 if not hasattr(client, 'responses'):
                     logger.warning(f"SDK brak responses API - fallback do chat completions dla {model}")
                     raise AttributeError("No responses API in SDK")
                 # PRAWIDŁOWA składnia Responses API z dokumentacji OpenAI 2025
                 # Test różnych formatów nazwy modelu
-                model_variants = [model]
-                if model == "gpt-5-mini":
-                    model_variants = ["gpt-5-mini", "gpt-5-mini-2025-08-07", "gpt-5-mini-preview", "o1-mini", "gpt-4o-mini"]
-                elif model == "gpt-5":
-                    model_variants = ["gpt-5", "gpt-5-2025-08-07", "gpt-5-preview", "o1-preview", "gpt-4o"]
-                elif model == "o1-mini":
-                    model_variants = ["o1-mini", "gpt-4o-mini"]
-                
-                response = None
+                model_variants = _model_variants(model)
                 last_error = None
-                corrected_text = ""
+
+                # Zapamiętana działająca ścieżka idzie pierwsza; reszta to sondowanie na wypadek błędu
+                capability = get_capability(api_key, model) or {}
+                # Starsze wpisy mogły zapamiętać zastępczy inny model - takie ignorujemy
+                if capability.get("variant") and not is_model_alias(model, capability["variant"]):
+                    capability = {}
+                known_variant = capability.get("variant")
+                if known_variant in model_variants:
+                    model_variants = [known_variant] + [v for v in model_variants if v != known_variant]
+                    logger.info(f"OpenAI: używam zapamiętanej ścieżki dla {model}: {capability}")
+                stream_ok = None
+                stream_unsupported = False
 
                 # 1) Jeśli chcemy stream i SDK/plan wspiera Responses.stream – spróbuj najpierw STREAM (simple payload)
-                if callable(on_chunk):
+                if callable(on_chunk) and capability.get("stream") is not False:
                     for variant in model_variants:
                         try:
-                            stream_ctx = client.responses.stream(
+                            collected = []
+                            async with client.responses.stream(
                                 model=variant,
-                                input=f"{current_system_prompt}\n\n{instruction_prompt}\n\n---\n{text_to_correct}\n---",
+                                input=responses_input,
                                 max_output_tokens=2000,
-                            )
-                            collected = []
-                            with stream_ctx as stream:
-                                for event in stream:
+                            ) as stream:
+                                async for event in stream:
                                     if getattr(event, 'type', '') == 'response.output_text.delta':
                                         delta_text = getattr(event, 'delta', '') or ''
                                         if delta_text:
@@ -187,7 +340,7 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
                                             except Exception:
                                                 pass
                                 try:
-                                    final = stream.get_final_response()
+                                    final = await stream.get_final_response()
                                 except Exception:
                                     final = None
                             if final is not None and hasattr(final, 'output_text') and final.output_text:
@@ -195,17 +348,18 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
                             else:
                                 corrected_text = ("".join(collected)).strip()
                             logger.info(f"✅ OpenAI Responses STREAM ok (variant={variant}), len={len(corrected_text)}")
+                            stream_ok = True
+                            record_capability(api_key, model, variant=variant, endpoint="responses", stream=True)
                             break
                         except Exception as e_stream:
                             logger.warning(f"Responses.stream failed for {variant}: {e_stream}")
                             last_error = e_stream
                             corrected_text = ""
+                            stream_unsupported = stream_unsupported or is_stream_unsupported(e_stream)
                             continue
-                    # Jeśli stream się udał – pomiń create()
-                    if corrected_text:
-                        # Przejdź do sekcji końcowego przetworzenia odpowiedzi poniżej
-                        pass
-                    else:
+                    if not corrected_text:
+                        # Chwilowy błąd nie wyłącza streamingu na stałe - zapamiętujemy tylko odmowę API
+                        stream_ok = False if stream_unsupported else None
                         logger.info("Responses stream niedostępny/nieudany – fallback do create()")
 
                 # 2) Non-stream create() z próbą rich→simple payload
@@ -216,17 +370,19 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
                         attempt_payloads = [
                         {
                             "model": variant,
-                            "input": f"{current_system_prompt}\n\n{instruction_prompt}\n\n---\n{text_to_correct}\n---",
+                            "input": responses_input,
                             "reasoning": {"effort": reasoning_effort},
                             "text": {"verbosity": verbosity},
                             "max_output_tokens": 2000,
                         },
                         {
                             "model": variant,
-                            "input": f"{current_system_prompt}\n\n{instruction_prompt}\n\n---\n{text_to_correct}\n---",
+                            "input": responses_input,
                             "max_output_tokens": 2000,
                         },
                         ]
+                        if variant == known_variant and capability.get("payload") == "simple":
+                            attempt_payloads.reverse()
 
                         for payload in attempt_payloads:
                             try:
@@ -234,8 +390,13 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
                                 if last_error and ("unsupported_parameter" in str(last_error).lower() or "Unsupported parameter" in str(last_error)):
                                     if "reasoning" in payload or "text" in payload:
                                         continue
-                                response = client.responses.create(**payload)
-                                logger.info(f"✅ Sukces z modelem: {variant} (payload: {'simple' if 'reasoning' not in payload else 'rich'})")
+                                response = await client.responses.create(**payload)
+                                payload_shape = 'simple' if 'reasoning' not in payload else 'rich'
+                                logger.info(f"✅ Sukces z modelem: {variant} (payload: {payload_shape})")
+                                record_capability(
+                                    api_key, model,
+                                    variant=variant, endpoint="responses", payload=payload_shape, stream=stream_ok,
+                                )
                                 break
                             except Exception as e2:
                                 logger.warning(f"Variant {variant} attempt failed: {e2}")
@@ -244,14 +405,13 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
                                 continue
                         if response is not None:
                             break
-                
+
                 if not corrected_text:
                     if response is None:
+                        forget_capability(api_key, model)
                         raise last_error or Exception("All model variants failed")
                     # Responses API: preferuj output_text jeśli dostępny, bez sklejania duplikatów
                     logger.info(f"Responses API response type: {type(response)}")
-                    logger.info(f"Response hasattr output: {hasattr(response, 'output')}")
-                    logger.info(f"Response hasattr content: {hasattr(response, 'content')}")
 
                     # PRAWIDŁOWE parsowanie Responses API - JEDEN źródło tekstu
                     # Sprawdź wszystkie możliwe atrybuty i użyj TYLKO PIERWSZEGO znalezionego
@@ -273,31 +433,9 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
             else:
                 logger.info(f"🔍 DEBUG: Używam Chat Completions API dla modelu: {model}")
                 if callable(on_chunk):
-                    # Streaming delta
-                    stream = client.chat.completions.create(
-                        model=model,
-                        messages=messages,
-                        stream=True,
-                        max_tokens=2000
-                    )
-                    collected = []
-                    try:
-                        for chunk in stream:
-                            try:
-                                delta = chunk.choices[0].delta.content or ''
-                            except Exception:
-                                delta = ''
-                            if delta:
-                                collected.append(delta)
-                                try:
-                                    on_chunk(delta)
-                                except Exception:
-                                    pass
-                    except Exception as e:
-                        logger.warning(f"OpenAI stream interrupted: {e}")
-                    corrected_text = ("".join(collected)).strip()
+                    corrected_text = await _stream_chat_completion(client, model, messages, on_chunk)
                 else:
-                    response = client.chat.completions.create(
+                    response = await client.chat.completions.create(
                         model=model,
                         messages=messages,
                         max_tokens=2000
@@ -316,42 +454,21 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
                 logger.error(f"GPT-5 model {model} failed with Responses API: {type(e).__name__}: {e}")
                 # Możliwe przyczyny: błędna nazwa modelu, brak dostępu, stary SDK
                 if "404" in str(e) or "not found" in str(e).lower():
-                    return f"Błąd: Model {model} nie został znaleziony. Możliwe nazwy: gpt-5-mini, gpt-5-nano, gpt-5. Sprawdź dostęp do GPT-5 models w OpenAI account."
+                    return ErrorResult(f"Błąd: Model {model} nie został znaleziony. Możliwe nazwy: gpt-5-mini, gpt-5-nano, gpt-5. Sprawdź dostęp do GPT-5 models w OpenAI account.")
                 elif "authentication" in str(e).lower():
-                    return f"Błąd: Brak autoryzacji dla {model}. Sprawdź klucz API i dostęp do GPT-5 models."
+                    return ErrorResult(f"Błąd: Brak autoryzacji dla {model}. Sprawdź klucz API i dostęp do GPT-5 models.")
                 else:
-                    return f"Błąd GPT-5 Responses API: {e}. Sprawdź SDK version: pip install openai --upgrade"
-            
+                    return ErrorResult(f"Błąd GPT-5 Responses API: {e}. Sprawdź SDK version: pip install openai --upgrade")
+
             # Fallback: SDK nie ma responses API, model nie wspiera parametrów reasoning, lub inne błędy API
             logger.warning(f"Responses API fallback dla {model}: {type(e).__name__}: {e}")
-            
+
             # Próbuj standardowe Chat Completions API (tylko dla nie-GPT-5 modeli)
             try:
                 if callable(on_chunk):
-                    stream = client.chat.completions.create(
-                        model=model,
-                        messages=messages,
-                        stream=True,
-                        max_tokens=2000
-                    )
-                    collected = []
-                    try:
-                        for chunk in stream:
-                            try:
-                                delta = chunk.choices[0].delta.content or ''
-                            except Exception:
-                                delta = ''
-                            if delta:
-                                collected.append(delta)
-                                try:
-                                    on_chunk(delta)
-                                except Exception:
-                                    pass
-                    except Exception as e:
-                        logger.warning(f"OpenAI stream (fallback) interrupted: {e}")
-                    corrected_text = ("".join(collected)).strip()
+                    corrected_text = await _stream_chat_completion(client, model, messages, on_chunk)
                 else:
-                    response = client.chat.completions.create(
+                    response = await client.chat.completions.create(
                         model=model,
                         messages=messages,
                         max_tokens=2000
@@ -363,81 +480,54 @@ def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, sys
                 # Sprawdź typowe literówki w nazwie modelu
                 if "gtp-5" in model.lower():
                     suggested_model = model.replace("gtp-5", "gpt-5")
-                    return f"Błąd: Model {model} niedostępny. Czy chodziło o '{suggested_model}'? Popraw nazwę modelu w ustawieniach."
-                return f"Błąd: Model {model} niedostępny. Sprawdź nazwę modelu lub spróbuj gpt-4o-mini."
+                    return ErrorResult(f"Błąd: Model {model} niedostępny. Czy chodziło o '{suggested_model}'? Popraw nazwę modelu w ustawieniach.")
+                return ErrorResult(f"Błąd: Model {model} niedostępny. Sprawdź nazwę modelu lub spróbuj gpt-4o-mini.")
 
         # Przetworzenie odpowiedzi
         logger.info(f"🔍 DEBUG: corrected_text długość: {len(corrected_text) if corrected_text else 'None'}")
-        logger.info(f"🔍 DEBUG: corrected_text content (50 chars): {corrected_text[:50] if corrected_text else 'EMPTY'}")
-        
+
         if corrected_text:
-            logger.info("✅ Otrzymano poprawną odpowiedź od OpenAI API.")
-            logger.info(f"🔍 DEBUG: Original response (100 chars): '{corrected_text[:100]}...'")
-            
-            # Czyszczenie odpowiedzi - bardziej ostrożne
-            original_text = corrected_text
-            corrected_text = corrected_text.strip()
-            logger.info(f"🔍 DEBUG: Po strip: {len(corrected_text)} chars")
-            
-            # Usuń wszystkie wystąpienia --- z początku i końca (ale zachowaj treść)
-            while corrected_text.startswith("---"):
-                corrected_text = corrected_text[3:].strip()
-                logger.info(f"🔍 DEBUG: Po usuwaniu --- z początku: {len(corrected_text)} chars")
-            while corrected_text.endswith("---"):
-                corrected_text = corrected_text[:-3].strip()
-                logger.info(f"🔍 DEBUG: Po usuwaniu --- z końca: {len(corrected_text)} chars")
-            
-            # Dodatkowe czyszczenie - usuń linie zawierające same ---
-            lines_before = corrected_text.splitlines()
-            lines = [line for line in lines_before if line.strip() != "---"]
-            logger.info(f"🔍 DEBUG: Linie przed: {len(lines_before)}, po usunięciu ---: {len(lines)}")
-            corrected_text = "\n".join(lines).strip()
-            
-            # Usuń puste linie na początku i końcu (ale zostaw niepuste)
-            lines = [line for line in corrected_text.splitlines() if line.strip()]
-            logger.info(f"🔍 DEBUG: Po usunięciu pustych linii: {len(lines)} linii")
-            
-            # Usuń pierwszą linię jeśli to nazwa stylu
-            style_names = ["normal", "professional", "translate_en", "translate_pl", "change_meaning", "summary"]
-            if lines and any(style in lines[0].lower() for style in style_names):
-                logger.info(f"🔍 DEBUG: Usuwam pierwszą linię (style): '{lines[0]}'")
-                lines = lines[1:]
-            
-            final_result = "\n".join(lines).strip()
-            logger.info(f"🔍 DEBUG: Final result: {len(final_result)} chars: '{final_result[:100]}...'")
-            
-            # Proste przekazanie bez deduplikacji - pozwolę Responses API zwrócić co chce
-            
-            # Jeśli po czyszczeniu nic nie zostało, zwróć original
-            if not final_result and original_text:
-                logger.warning(f"❌ Czyszczenie usunęło całą treść! Zwracam oryginalną odpowiedź")
-                return original_text.strip()
-            
-            return final_result
+            if isinstance(corrected_text, PartialResult):
+                return PartialResult(_clean_output(corrected_text))
+            return _clean_output(corrected_text)
         else:
             logger.warning("Otrzymano odpowiedź od OpenAI, ale treść jest pusta.")
-            return "Błąd: Nie otrzymano poprawnej odpowiedzi od OpenAI API (brak treści w wiadomości)."
+            return ErrorResult("Błąd: Nie otrzymano poprawnej odpowiedzi od OpenAI API (brak treści w wiadomości).")
 
     except (httpx.TimeoutException, httpx.ReadTimeout, httpx.ConnectTimeout) as e:
         logger.error(f"Timeout OpenAI API: {e}", exc_info=True)
-        return f"Błąd: OpenAI API nie odpowiada (timeout {DEFAULT_TIMEOUT}s). Spróbuj ponownie."
+        return ErrorResult(f"Błąd: OpenAI API nie odpowiada (timeout {DEFAULT_TIMEOUT}s). Spróbuj ponownie.")
     except (HTTPError, TimeoutException, openai.APIConnectionError) as e:
         if handle_api_error(e):
-            return "Błąd połączenia z API. Sprawdź komunikat błędu."
+            return ErrorResult("Błąd połączenia z API. Sprawdź komunikat błędu.")
         logger.error(f"Błąd połączenia z OpenAI API: {e}", exc_info=True) # Logowanie błędu
-        return f"Błąd połączenia z OpenAI API: {e}"
+        return ErrorResult(f"Błąd połączenia z OpenAI API: {e}")
     except openai.RateLimitError as e:
         logger.warning(f"Przekroczono limit zapytań do OpenAI API: {e}") # Logowanie ostrzeżenia
-        return f"Błąd OpenAI (limit zapytań): {e}"
+        return ErrorResult(f"Błąd OpenAI (limit zapytań): {e}")
     except openai.AuthenticationError as e:
         logger.error(f"Błąd autentykacji OpenAI API (prawdopodobnie zły klucz): {e}", exc_info=True) # Logowanie błędu
-        return f"Błąd OpenAI (autentykacja - zły klucz?): {e}"
+        return ErrorResult(f"Błąd OpenAI (autentykacja - zły klucz?): {e}")
     except openai.APIStatusError as e:
         logger.error(f"Ogólny błąd statusu OpenAI API: {e} (Status: {e.status_code}, Response: {e.response})", exc_info=True) # Logowanie błędu z dodatkowymi informacjami
-        return f"Błąd OpenAI (status API {e.status_code}): {e.response}"
+        return ErrorResult(f"Błąd OpenAI (status API {e.status_code}): {e.response}")
     except Exception as e:
         logger.error(f"Nieoczekiwany błąd podczas komunikacji z OpenAI: {e}", exc_info=True) # Logowanie błędu
-        return f"Błąd OpenAI (nieoczekiwany): {e}"
+        return ErrorResult(f"Błąd OpenAI (nieoczekiwany): {e}")
+
+
+def correct_text_openai(api_key, model, text_to_correct, instruction_prompt, system_prompt, on_chunk=None, ai_settings=None, cancel_event=None):
+    """Poprawia tekst używając OpenAI API (synchroniczny wrapper na silnik asyncio).
+
+    Ustawienie ``cancel_event`` zamyka strumień od razu i zwraca "❌ Anulowano".
+    """
+    return get_engine().run_sync(
+        correct_text_openai_async(
+            api_key, model, text_to_correct, instruction_prompt, system_prompt,
+            on_chunk=on_chunk, ai_settings=ai_settings,
+        ),
+        cancel_event=cancel_event,
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,184 @@
+"""Klient dla dodatkowych endpointów zgodnych z OpenAI Chat Completions.
+
+Używany przez providerów zdefiniowanych w config.ini sekcjami
+``[PROVIDER:Nazwa]`` (np. lokalny serwer inferencji w LAN: vLLM, llama.cpp,
+Ollama, LM Studio). Klucz API jest opcjonalny – serwery lokalne zwykle go nie
+wymagają.
+"""
+
+import json
+
+import httpx
+
+from gui.prompts import get_system_prompt
+from utils.logger import log_api_error, log_connection_error, logger
+
+from .base_client import CONNECTION_TIMEOUT, DEFAULT_TIMEOUT, ErrorResult, warm_connection
+from .engine import add_shutdown_hook, get_engine
+from .progress import progress_event_hooks
+
+_HTTP2_AVAILABLE = True
+try:
+    import h2  # type: ignore
+except Exception:
+    _HTTP2_AVAILABLE = False
+
+# Osobny klient (pula połączeń) dla każdej pary (base_url, timeout)
+_CLIENT_CACHE = {}
+
+
+def _get_http_client(base_url, timeout=None):
+    """Reużywalny httpx.AsyncClient dla danego endpointu (pętla silnika)."""
+    read_timeout = float(timeout or DEFAULT_TIMEOUT)
+    cache_key = (base_url, read_timeout)
+    client = _CLIENT_CACHE.get(cache_key)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            http2=_HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(
+                connect=CONNECTION_TIMEOUT,
+                read=read_timeout,
+                write=CONNECTION_TIMEOUT,
+                pool=CONNECTION_TIMEOUT,
+            ),
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30.0),
+            event_hooks=progress_event_hooks(),
+        )
+        _CLIENT_CACHE[cache_key] = client
+    return client
+
+
+async def aclose_clients():
+    """Zamyka cache'owanych klientów (wołane przy zamykaniu silnika)."""
+    clients = list(_CLIENT_CACHE.values())
+    _CLIENT_CACHE.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Nie udało się zamknąć klienta endpointu OpenAI-compatible: {e}")
+
+add_shutdown_hook(aclose_clients)
+
+
+def _headers(api_key):
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    return headers
+
+
+async def prewarm_connection(api_key=None, model=None, base_url=None, timeout=None, provider_name=None):
+    """Otwiera połączenie do endpointu w puli współdzielonego klienta."""
+    if base_url:
+        await warm_connection(_get_http_client(base_url, timeout), "/models")
+
+
+async def correct_text_openai_compatible_async(
+    api_key,
+    model,
+    text_to_correct,
+    instruction_prompt,
+    system_prompt,
+    on_chunk=None,
+    base_url=None,
+    timeout=None,
+    provider_name="OpenAI-compatible",
+):
+    """Poprawia tekst przez endpoint ``{base_url}/chat/completions`` (korutyna)."""
+    if not system_prompt:
+        style = "prompt" if "prompt" in instruction_prompt.lower() else "normal"
+        system_prompt = get_system_prompt(style)
+    if not base_url:
+        return ErrorResult(f"Błąd: Brak adresu BaseUrl dla {provider_name}.")
+    if not model:
+        return ErrorResult(f"Błąd: Model {provider_name} nie został określony.")
+    if not text_to_correct:
+        return ErrorResult("Błąd: Brak tekstu do poprawy.")
+
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"{instruction_prompt}\n\n---\n{text_to_correct}\n---"},
+        ],
+        "temperature": 0.7,
+    }
+    headers = _headers(api_key)
+    client = _get_http_client(base_url, timeout)
+
+    try:
+        if callable(on_chunk):
+            payload["stream"] = True
+            collected_text = []
+            async with client.stream("POST", "/chat/completions", headers=headers, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data_str = line[6:]
+                    if data_str.strip() == "[DONE]":
+                        break
+                    try:
+                        choices = json.loads(data_str).get("choices") or []
+                    except json.JSONDecodeError:
+                        continue
+                    content = choices[0].get("delta", {}).get("content") if choices else None
+                    if content:
+                        collected_text.append(content)
+                        try:
+                            on_chunk(content)
+                        except Exception:
+                            pass
+
+            corrected_text = "".join(collected_text).strip()
+            if corrected_text:
+                return corrected_text
+            logger.warning(f"{provider_name}: streaming nie zwrócił treści")
+            return ErrorResult(f"Błąd: Nie otrzymano treści ze streaming {provider_name}.")
+
+        response = await client.post("/chat/completions", headers=headers, json=payload)
+        response.raise_for_status()
+        choices = response.json().get("choices") or []
+        content = (choices[0].get("message") or {}).get("content") if choices else None
+        if content:
+            return content.strip()
+        return ErrorResult(f"Błąd {provider_name}: Brak treści w odpowiedzi API")
+
+    except httpx.TimeoutException as e:
+        logger.error(f"Timeout {provider_name}: {e}")
+        return ErrorResult(f"Błąd: {provider_name} nie odpowiada (timeout). Spróbuj ponownie.")
+    except httpx.HTTPStatusError as e:
+        log_api_error(provider_name, e, e.response)
+        try:
+            detail = e.response.text[:300]
+        except httpx.ResponseNotRead:  # odpowiedź strumieniowa
+            detail = e.response.reason_phrase
+        return ErrorResult(f"Błąd {provider_name} (HTTP {e.response.status_code}): {detail}")
+    except Exception as e:
+        log_connection_error(provider_name, e)
+        return ErrorResult(f"Błąd {provider_name} (nieoczekiwany): {str(e)}")
+
+
+def correct_text_openai_compatible(
+    api_key,
+    model,
+    text_to_correct,
+    instruction_prompt,
+    system_prompt,
+    on_chunk=None,
+    base_url=None,
+    timeout=None,
+    provider_name="OpenAI-compatible",
+    cancel_event=None,
+):
+    """Synchroniczny wrapper na silnik asyncio; ``cancel_event`` zamyka strumień od razu."""
+    return get_engine().run_sync(
+        correct_text_openai_compatible_async(
+            api_key, model, text_to_correct, instruction_prompt, system_prompt,
+            on_chunk=on_chunk, base_url=base_url, timeout=timeout, provider_name=provider_name,
+        ),
+        cancel_event=cancel_event,
+    )
+
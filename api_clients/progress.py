@@ -0,0 +1,128 @@
+"""Postęp pojedynczego zapytania do providera, raportowany przez warstwę API.
+
+Fazy: ``connecting`` (zapytanie wysłane) -> ``connected`` (przyszły nagłówki
+odpowiedzi) -> ``streaming`` (pierwszy token; dalej liczba odebranych znaków
+względem oczekiwanej długości odpowiedzi) -> ``done``.
+
+Silnik ustawia bieżący :class:`RequestProgress` w zmiennej kontekstowej zadania,
+a klienci httpx zgłaszają nawiązanie połączenia hookiem z
+:func:`progress_event_hooks` – bez przekazywania obiektu przez sygnatury
+funkcji ``correct_text_*``. UI tylko odczytuje stan w swoim tickerze.
+"""
+
+import math
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from utils.text_chunker import CHARS_PER_TOKEN
+
+PHASE_CONNECTING = "connecting"
+PHASE_CONNECTED = "connected"
+PHASE_STREAMING = "streaming"
+PHASE_DONE = "done"
+
+# Udział faz w pasku postępu; reszta (do 95%) to odebrane tokeny
+CONNECTING_FRACTION = 0.05
+CONNECTED_FRACTION = 0.15
+STREAMING_MAX_FRACTION = 0.95
+
+
+class RequestProgress:
+    """Stan zapytania. Zapisywany w wątku silnika, czytany z wątku UI."""
+
+    def __init__(self, expected_chars: int):
+        self.expected_chars = max(1, expected_chars)
+        self.phase = PHASE_CONNECTING
+        self.started = time.perf_counter()
+        self.connected_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.received_chars = 0
+
+    def mark_connected(self) -> None:
+        if self.connected_at is None:
+            self.connected_at = time.perf_counter()
+        if self.phase == PHASE_CONNECTING:
+            self.phase = PHASE_CONNECTED
+
+    def on_chunk(self, delta: str) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        if self.phase != PHASE_DONE:
+            self.phase = PHASE_STREAMING
+        self.received_chars += len(delta)
+
+    def finish(self) -> None:
+        self.finished_at = time.perf_counter()
+        self.phase = PHASE_DONE
+
+    @property
+    def received_tokens(self) -> int:
+        return math.ceil(self.received_chars / CHARS_PER_TOKEN)
+
+    @property
+    def expected_tokens(self) -> int:
+        return math.ceil(self.expected_chars / CHARS_PER_TOKEN)
+
+    def fraction(self) -> float:
+        """Szacowany postęp 0..1 do paska w UI."""
+        if self.phase == PHASE_DONE:
+            return 1.0
+        if self.phase == PHASE_STREAMING:
+            ratio = min(1.0, self.received_chars / self.expected_chars)
+            return CONNECTED_FRACTION + (STREAMING_MAX_FRACTION - CONNECTED_FRACTION) * ratio
+        if self.phase == PHASE_CONNECTED:
+            return CONNECTED_FRACTION
+        return CONNECTING_FRACTION
+
+    def estimated_remaining(self) -> Optional[float]:
+        """Szacowany czas (s) do końca odpowiedzi z dotychczasowego tempa strumienia.
+
+        None, gdy nie przyszedł jeszcze żaden token (brak tempa do ekstrapolacji).
+        """
+        if self.phase == PHASE_DONE:
+            return 0.0
+        if self.first_token_at is None or self.received_chars <= 0:
+            return None
+        streaming_time = time.perf_counter() - self.first_token_at
+        if streaming_time <= 0:
+            return None
+        rate = self.received_chars / streaming_time
+        return max(0.0, (self.expected_chars - self.received_chars) / rate)
+
+    def describe(self) -> str:
+        """Krótki opis czasów faz do logów."""
+        def since_start(moment: Optional[float]) -> str:
+            return f"{(moment - self.started) * 1000:.0f} ms" if moment is not None else "-"
+
+        return (
+            f"połączenie {since_start(self.connected_at)}, "
+            f"pierwszy token {since_start(self.first_token_at)}, "
+            f"koniec {since_start(self.finished_at)}, "
+            f"~{self.received_tokens}/{self.expected_tokens} tokenów"
+        )
+
+
+_current_progress: ContextVar[Optional[RequestProgress]] = ContextVar("request_progress", default=None)
+
+
+def set_current_progress(progress: Optional[RequestProgress]) -> None:
+    """Ustawia postęp dla bieżącego zadania asyncio (i zadań przez nie tworzonych)."""
+    _current_progress.set(progress)
+
+
+def report_connected() -> None:
+    """Zgłasza nawiązanie połączenia dla bieżącego zapytania (no-op poza silnikiem)."""
+    progress = _current_progress.get()
+    if progress is not None:
+        progress.mark_connected()
+
+
+async def _on_httpx_response(response) -> None:
+    report_connected()
+
+
+def progress_event_hooks() -> dict:
+    """``event_hooks`` dla ``httpx.AsyncClient`` zgłaszające fazę ``connected``."""
+    return {"response": [_on_httpx_response]}
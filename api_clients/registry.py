@@ -0,0 +1,245 @@
+"""Rejestr providerów API – źródło listy paneli w UI.
+
+Każdy provider deklaruje korutynę korekty (streaming przez ``on_chunk``),
+funkcję pobierającą listę modeli, domyślny model, kolor panelu i możliwości
+(np. czy obsługuje AI_SETTINGS). Wbudowani są OpenAI, Anthropic, Gemini i
+DeepSeek; dodatkowe endpointy zgodne z OpenAI dochodzą z sekcji
+``[PROVIDER:Nazwa]`` w config.ini, np.::
+
+    [PROVIDER:LAN]
+    BaseUrl = http://192.168.1.50:8000/v1
+    Model = qwen2.5-14b-instruct
+    Color = #0f766e
+
+Providerów (także wbudowanych) wyłącza się bez zmian w kodzie ustawieniem
+``DisabledProviders = DeepSeek, Gemini`` w sekcji [SETTINGS] albo
+``Enabled = 0`` w sekcji dodatkowego providera.
+
+Moduły klientów (a z nimi SDK openai/anthropic/google-genai) są importowane
+dopiero przy pierwszym wywołaniu (:class:`LazyCall`) albo przez
+:func:`preload_providers` w tle – tylko dla włączonych providerów z kluczem.
+"""
+
+import functools
+import sys
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from utils import config_manager
+from utils.logger import logger
+from utils.model_fetcher import FALLBACK_MODELS, fetch_models_for_provider, fetch_openai_compatible_models
+
+
+# Kolory paneli dla dodatkowych providerów bez własnego ``Color``
+EXTRA_PROVIDER_COLORS = ("#0f766e", "#be185d", "#4d7c0f", "#0369a1", "#b45309", "#6d28d9")
+
+
+# Importy wewnątrz funkcji (nie importlib), żeby PyInstaller nadal widział moduły
+def _openai_client():
+    from . import openai_client
+    return openai_client
+
+
+def _anthropic_client():
+    from . import anthropic_client
+    return anthropic_client
+
+
+def _gemini_client():
+    from . import gemini_client
+    return gemini_client
+
+
+def _deepseek_client():
+    from . import deepseek_client
+    return deepseek_client
+
+
+def _openai_compatible_client():
+    from . import openai_compatible_client
+    return openai_compatible_client
+
+
+class LazyCall:
+    """Funkcja modułu klienta importowanego przy pierwszym wywołaniu."""
+
+    __slots__ = ("loader", "attr")
+
+    def __init__(self, loader: Callable[[], object], attr: str):
+        self.loader = loader
+        self.attr = attr
+
+    def __call__(self, *args, **kwargs):
+        return getattr(self.loader(), self.attr)(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyCall({self.loader.__name__.lstrip('_')}.{self.attr})"
+
+
+def _invalidate_client(module: str) -> Callable[[str], None]:
+    """Hook zmiany klucza: zamyka klienta starego klucza, jeśli moduł klienta
+    jest już załadowany (niezaładowany nie ma jeszcze żadnych klientów)."""
+    def invalidate(old_key: str) -> None:
+        client_module = sys.modules.get(f"{__package__}.{module}")
+        if client_module is not None:
+            client_module.invalidate_client(old_key)
+
+    invalidate.__name__ = f"invalidate_{module}"
+    return invalidate
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """Opis providera: jak go wołać i jak pokazać w UI."""
+
+    name: str
+    correct: Callable[..., Awaitable[str]]
+    list_models: Callable[[str], Awaitable[List[str]]]
+    default_model: str
+    fallback_models: Tuple[str, ...] = ()
+    prewarm: Optional[Callable[..., Awaitable[None]]] = None
+    color: str = EXTRA_PROVIDER_COLORS[0]
+    key_placeholder: str = ""
+    requires_key: bool = True
+    supports_ai_settings: bool = False
+    # Stałe argumenty nazwane dla ``correct``/``prewarm`` (np. base_url)
+    options: Mapping[str, object] = field(default_factory=lambda: MappingProxyType({}))
+    # Wołane ze starym kluczem, gdy użytkownik zmieni klucz API
+    on_key_changed: Optional[Callable[[str], None]] = None
+    # Import modułu klienta (preload w tle przed pierwszym zapytaniem)
+    load: Optional[Callable[[], object]] = None
+
+    def is_configured(self, api_key: str) -> bool:
+        """Czy provider ma wszystko, czego potrzebuje do zapytania."""
+        return bool(api_key) or not self.requires_key
+
+
+_BUILTIN: Dict[str, ProviderSpec] = {}
+
+
+def register_provider(spec: ProviderSpec) -> None:
+    """Dodaje (lub podmienia) wbudowanego providera; kolejność rejestracji = kolejność paneli."""
+    _BUILTIN[spec.name] = spec
+
+
+def _builtin(name, loader, correct, prewarm, color, key_placeholder, **kwargs) -> ProviderSpec:
+    return ProviderSpec(
+        name=name,
+        correct=LazyCall(loader, correct),
+        list_models=functools.partial(fetch_models_for_provider, name),
+        default_model=config_manager.DEFAULT_MODELS[name],
+        fallback_models=tuple(FALLBACK_MODELS.get(name, ())),
+        prewarm=LazyCall(loader, prewarm),
+        color=color,
+        key_placeholder=key_placeholder,
+        load=loader,
+        **kwargs,
+    )
+
+
+register_provider(_builtin(
+    "OpenAI", _openai_client, "correct_text_openai_async", "prewarm_connection",
+    "#10a37f", "sk-...", supports_ai_settings=True, on_key_changed=_invalidate_client("openai_client"),
+))
+register_provider(_builtin(
+    "Anthropic", _anthropic_client, "correct_text_anthropic_async", "prewarm_connection",
+    "#d97706", "sk-ant-...", on_key_changed=_invalidate_client("anthropic_client"),
+))
+register_provider(_builtin(
+    "Gemini", _gemini_client, "correct_text_gemini_async", "prewarm_connection",
+    "#4285f4", "AIza...", on_key_changed=_invalidate_client("gemini_client"),
+))
+register_provider(_builtin(
+    "DeepSeek", _deepseek_client, "correct_text_deepseek_async", "prewarm_connection",
+    "#7c3aed", "sk-...", on_key_changed=_invalidate_client("deepseek_client"),
+))
+
+
+def _is_enabled(value) -> bool:
+    return str(value).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _extra_provider(name: str, options: Mapping[str, str], position: int) -> Optional[ProviderSpec]:
+    """Buduje providera zgodnego z OpenAI z opcji sekcji [PROVIDER:Nazwa]."""
+    base_url = (options.get("baseurl") or "").strip()
+    if not base_url:
+        logger.warning(f"Provider {name}: brak BaseUrl w sekcji [PROVIDER:{name}] - pominięto")
+        return None
+    fallback = tuple(m.strip() for m in (options.get("models") or "").split(",") if m.strip())
+    default_model = (options.get("model") or "").strip() or (fallback[0] if fallback else "")
+    call_options = {"base_url": base_url, "provider_name": name}
+    try:
+        if options.get("timeout"):
+            call_options["timeout"] = float(options["timeout"])
+    except ValueError:
+        logger.warning(f"Provider {name}: nieprawidłowy Timeout={options['timeout']!r} - użyto domyślnego")
+    requires_key = _is_enabled(options.get("requireskey", "0"))
+    return ProviderSpec(
+        name=name,
+        correct=LazyCall(_openai_compatible_client, "correct_text_openai_compatible_async"),
+        list_models=functools.partial(
+            fetch_models_for_provider,
+            name,
+            lister=functools.partial(fetch_openai_compatible_models, base_url),
+            fallback=list(fallback or (default_model,)),
+            requires_key=requires_key,
+        ),
+        default_model=default_model,
+        fallback_models=fallback,
+        prewarm=LazyCall(_openai_compatible_client, "prewarm_connection"),
+        color=(options.get("color") or "").strip() or EXTRA_PROVIDER_COLORS[position % len(EXTRA_PROVIDER_COLORS)],
+        key_placeholder="(opcjonalny)" if not requires_key else "",
+        requires_key=requires_key,
+        options=MappingProxyType(call_options),
+        load=_openai_compatible_client,
+    )
+
+
+def get_providers(snapshot=None, include_disabled: bool = False) -> List[ProviderSpec]:
+    """Lista providerów w kolejności paneli: wbudowani, potem dodatkowi z config.ini."""
+    if snapshot is None:
+        snapshot = config_manager.get_config_snapshot()
+    disabled = {
+        name.strip().lower()
+        for name in str(snapshot.settings.get("DisabledProviders", "")).split(",")
+        if name.strip()
+    }
+
+    providers = list(_BUILTIN.values())
+    for position, (name, options) in enumerate(snapshot.providers.items()):
+        if not include_disabled and not _is_enabled(options.get("enabled", "1")):
+            continue
+        spec = _extra_provider(name, options, position)
+        if spec is not None:
+            providers.append(spec)
+
+    if include_disabled:
+        return providers
+    return [spec for spec in providers if spec.name.lower() not in disabled]
+
+
+def get_provider(name: str, snapshot=None) -> Optional[ProviderSpec]:
+    """Provider o danej nazwie (również wyłączony) albo None."""
+    for spec in get_providers(snapshot, include_disabled=True):
+        if spec.name == name:
+            return spec
+    return None
+
+
+def preload_providers(providers: List[ProviderSpec], api_keys: Mapping[str, str]) -> List[str]:
+    """Importuje moduły klientów włączonych i skonfigurowanych providerów.
+
+    Wołane w tle po starcie, żeby pierwsze zapytanie nie czekało na import SDK.
+    Zwraca nazwy załadowanych providerów.
+    """
+    loaded = []
+    for spec in providers:
+        if spec.load is None or not spec.is_configured(api_keys.get(spec.name, "")):
+            continue
+        try:
+            spec.load()
+            loaded.append(spec.name)
+        except Exception as e:
+            logger.warning(f"Provider {spec.name}: import klienta nie powiódł się: {e}")
+    return loaded
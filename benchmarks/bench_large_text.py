@@ -0,0 +1,113 @@
+"""Benchmark czasu do interaktywności przy wstawianiu długich tekstów (wymaga ekranu).
+
+Dla każdego rozmiaru mierzy blokujący ``insert`` + tagowanie różnic (jak dla
+krótkich tekstów) oraz ścieżkę :mod:`gui.large_text` (kawałki + leniwe tagi).
+Na końcu wypisuje najmniejszy zmierzony rozmiar, przy którym blokująca
+ścieżka przekracza ``--budget-ms`` – to wartość dla
+:data:`gui.large_text.LARGE_TEXT_THRESHOLD`::
+
+    python benchmarks/bench_large_text.py
+    python benchmarks/bench_large_text.py --budget-ms 50 5000 10000 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui.large_text import LARGE_TEXT_THRESHOLD, ChunkedTextInserter, LazyTagger  # noqa: E402
+
+DEFAULT_SIZES = (5_000, 10_000, 20_000, 50_000, 100_000, 1_000_000)
+# Blokada pętli UI odczuwalna jako "zacięcie" okna
+DEFAULT_BUDGET_MS = 100.0
+
+Span = Tuple[int, int]
+WORDS = ("Ala ma kota, a kot ma Alę. Zażółć gęślą jaźń! " * 4).split(" ")
+
+
+def make_text(size: int) -> Tuple[str, List[Span]]:
+    """Tekst ~``size`` znaków z liniami po 12 wyrazów; co 7. wyraz jest "zmianą"."""
+    parts, spans, length, i = [], [], 0, 0
+    while length < size:
+        word = WORDS[i % len(WORDS)] + (" " if i % 12 else "\n")
+        if i % 7 == 0:
+            spans.append((length, length + len(word.rstrip())))
+        parts.append(word)
+        length += len(word)
+        i += 1
+    return "".join(parts), spans
+
+
+def measure(root, size: int) -> Tuple[float, float, float, float]:
+    """(blokująco, do interakcji, maks. krok, całość) w sekundach."""
+    import tkinter as tk
+
+    text, spans = make_text(size)
+
+    widget = tk.Text(root, wrap="word")
+    widget.pack(fill="both", expand=True)
+    root.update()
+    start = time.perf_counter()
+    widget.insert("1.0", text)
+    for s, e in spans:
+        widget.tag_add("diff", f"1.0+{s}c", f"1.0+{e}c")
+    root.update_idletasks()
+    blocking = time.perf_counter() - start
+    widget.destroy()
+
+    widget = tk.Text(root, wrap="word")
+    widget.pack(fill="both", expand=True)
+    root.update()
+    interactive = {}
+    jobs = {}
+    start = time.perf_counter()
+    # Pierwsze zdarzenie obsłużone po starcie = moment, gdy UI znów reaguje
+    root.after(0, lambda: interactive.setdefault("at", time.perf_counter()))
+
+    def tag_when_done():
+        jobs["tagger"] = LazyTagger(widget, text, spans, "diff").start()
+
+    inserter = ChunkedTextInserter(widget, text, on_done=tag_when_done, final_state=None).start()
+    while not ("tagger" in jobs and jobs["tagger"].done):
+        root.update()
+    total = time.perf_counter() - start
+    max_step = max(inserter.max_step, jobs["tagger"].max_step)
+    widget.destroy()
+    return blocking, interactive["at"] - start, max_step, total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Czas do interaktywności dla długich tekstów")
+    parser.add_argument("sizes", nargs="*", type=int, default=list(DEFAULT_SIZES), help="rozmiary tekstu (znaki)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="dopuszczalna blokada UI przy wstawianiu blokującym")
+    args = parser.parse_args()
+
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.geometry("800x600")
+    print(f"{'znaki':>10} | {'blokująco':>10} | {'do interakcji':>13} | {'maks. krok':>10} | {'całość':>8}")
+    over_budget = []
+    for size in sorted(args.sizes):
+        blocking, interactive, max_step, total = measure(root, size)
+        if blocking * 1000 > args.budget_ms:
+            over_budget.append(size)
+        print(
+            f"{size:>10} | {blocking * 1000:>7.0f} ms | {interactive * 1000:>10.0f} ms | "
+            f"{max_step * 1000:>7.1f} ms | {total * 1000:>5.0f} ms"
+        )
+    root.destroy()
+
+    if over_budget:
+        print(f"Blokujący insert przekracza {args.budget_ms:.0f} ms od {over_budget[0]} znaków "
+              f"(LARGE_TEXT_THRESHOLD = {LARGE_TEXT_THRESHOLD})")
+    else:
+        print(f"Żaden rozmiar nie przekracza {args.budget_ms:.0f} ms (LARGE_TEXT_THRESHOLD = {LARGE_TEXT_THRESHOLD})")
+
+
+if __name__ == "__main__":
+    main()
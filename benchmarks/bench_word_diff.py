@@ -0,0 +1,69 @@
+"""Benchmark diffu wyrazów na długich, powtarzalnych tekstach.
+
+Porównuje :class:`utils.word_diff.WordMatcher` z ``difflib.SequenceMatcher``
+(z ``autojunk`` i bez) na tekstach przypominających listy, tabele i logi::
+
+    python benchmarks/bench_word_diff.py
+"""
+
+import difflib
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.word_diff import WordMatcher  # noqa: E402
+
+
+def main() -> None:
+    rng = random.Random(11)
+    vocabulary = [f"słowo{n}" for n in range(400)] + ["-", "|", "1.", "2.", "ERROR", "INFO", "i", "w", "na"]
+
+    def make_text(words: int) -> List[str]:
+        # Powtarzalne wiersze jak w listach, tabelach i logach
+        rows = [[rng.choice(vocabulary) for _ in range(8)] for _ in range(40)]
+        text: List[str] = []
+        while len(text) < words:
+            text.extend(rng.choice(rows))
+        return text[:words]
+
+    def mutate(tokens: List[str], ratio: float) -> List[str]:
+        out = list(tokens)
+        for _ in range(int(len(out) * ratio)):
+            position = rng.randrange(len(out))
+            action = rng.random()
+            if action < 0.4:
+                out[position] = rng.choice(vocabulary)
+            elif action < 0.7:
+                out.insert(position, rng.choice(vocabulary))
+            else:
+                del out[position]
+        return out
+
+    print(f"{'wyrazy':>8} {'word_diff':>12} {'difflib':>12} {'difflib(autojunk=False)':>24}")
+    for words in (1_000, 10_000, 50_000):
+        a = make_text(words)
+        b = mutate(a, 0.03)
+
+        start = time.perf_counter()
+        WordMatcher(a, b).get_opcodes()
+        ours_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        difflib.SequenceMatcher(None, a, b).get_opcodes()
+        difflib_time = time.perf_counter() - start
+
+        if words <= 10_000:
+            start = time.perf_counter()
+            difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+            strict = f"{(time.perf_counter() - start) * 1000:>21.0f} ms"
+        else:
+            strict = f"{'(pominięto)':>24}"
+        print(f"{words:>8} {ours_time * 1000:>9.0f} ms {difflib_time * 1000:>9.0f} ms {strict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Renderowanie bardzo długich tekstów w polach tekstowych bez blokowania pętli Tk.
+
+Jedno ``insert`` 100k+ znaków (plus tagowanie różnic) blokuje pętlę zdarzeń na
+sekundy. Powyżej :data:`LARGE_TEXT_THRESHOLD`:
+
+- :class:`ChunkedTextInserter` wstawia tekst kawałkami w kolejnych
+  callbackach ``after`` – pierwszy kawałek jest widoczny od razu, a między
+  kawałkami UI obsługuje zdarzenia,
+- :class:`LazyTagger` taguje najpierw zakresy w widocznym obszarze, a resztę
+  partiami w kolejnych callbackach.
+
+Używamy ``after(1)`` zamiast ``after_idle`` – kod UI woła ``update_idletasks``,
+które wykonałoby wszystkie kawałki naraz.
+
+Benchmark czasu do interaktywności (wymaga ekranu)::
+
+    python benchmarks/bench_large_text.py
+"""
+
+import bisect
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Od jakiej długości tekstu wstawiamy kawałkami i tagujemy leniwie. Ma to być
+# najmniejszy rozmiar, przy którym blokujący insert+tagowanie przekracza
+# 100 ms – benchmarks/bench_large_text.py wypisuje go dla danej maszyny.
+# Poniżej 2 * INSERT_SLICE_CHARS wstawianie kawałkami i tak mieści się w 1-2
+# krokach, więc niższy próg nic nie daje.
+LARGE_TEXT_THRESHOLD = 20000
+# Znaków na jeden callback wstawiania i zakresów na jeden callback tagowania
+INSERT_SLICE_CHARS = 8000
+TAG_BATCH_SPANS = 300
+STEP_DELAY_MS = 1
+
+Span = Tuple[int, int]
+
+
+def is_large_text(text: str, threshold: int = LARGE_TEXT_THRESHOLD) -> bool:
+    return len(text) >= threshold
+
+
+class _LineIndex:
+    """Zamiana offsetu znakowego na indeks Tk ``linia.kolumna`` (bez ``1.0+Nc``,
+    które Tk liczy liniowo od początku tekstu)."""
+
+    def __init__(self, text: str):
+        self._length = len(text)
+        self._starts = [0]
+        position = text.find("\n")
+        while position != -1:
+            self._starts.append(position + 1)
+            position = text.find("\n", position + 1)
+
+    def index(self, offset: int) -> str:
+        line = bisect.bisect_right(self._starts, offset) - 1
+        return f"{line + 1}.{offset - self._starts[line]}"
+
+    def line_start(self, line: int) -> int:
+        """Offset początku linii (numeracja Tk od 1); poza zakresem = długość tekstu."""
+        if line - 1 < len(self._starts):
+            return self._starts[max(0, line - 1)]
+        return self._length
+
+
+class _SteppedJob:
+    """Wspólna obsługa kroków w ``after`` z pomiarem najdłuższego kroku."""
+
+    def __init__(self, widget):
+        self._widget = widget
+        self._job = None
+        self.cancelled = False
+        self.done = False
+        self.steps = 0
+        self.max_step = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def _schedule(self) -> None:
+        self._job = self._widget.after(STEP_DELAY_MS, self._run_step)
+
+    def _run_step(self) -> None:
+        self._job = None
+        if self.cancelled:
+            return
+        step_start = time.perf_counter()
+        try:
+            more = self._step()
+        except Exception:
+            # Widget zniszczony w trakcie (np. zamknięte okno) - przerwij po cichu
+            self.cancelled = True
+            return
+        self.steps += 1
+        self.max_step = max(self.max_step, time.perf_counter() - step_start)
+        if more:
+            self._schedule()
+        else:
+            self.done = True
+            self.finished_at = time.perf_counter()
+            self._finish()
+
+    def _step(self) -> bool:
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        pass
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        if self._job is not None:
+            try:
+                self._widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+
+class ChunkedTextInserter(_SteppedJob):
+    """Zastępuje treść widgetu tekstem wstawianym kawałkami.
+
+    Pierwszy kawałek jest wstawiany synchronicznie w :meth:`start`, reszta w
+    kolejnych callbackach. ``on_done`` jest wołane w wątku UI po ostatnim.
+    """
+
+    def __init__(self, widget, text: str, on_done: Optional[Callable[[], None]] = None,
+                 slice_chars: int = INSERT_SLICE_CHARS, final_state: Optional[str] = "disabled"):
+        super().__init__(widget)
+        self._text = text
+        self._on_done = on_done
+        self._slice = max(1, slice_chars)
+        self._final_state = final_state
+        self._position = 0
+
+    def start(self) -> "ChunkedTextInserter":
+        self.started_at = time.perf_counter()
+        self._widget.configure(state="normal")
+        self._widget.delete("1.0", "end")
+        self._run_step()
+        return self
+
+    def _next_cut(self) -> int:
+        cut = min(len(self._text), self._position + self._slice)
+        if cut < len(self._text):
+            # Tnij na białym znaku, żeby nie dzielić wyrazu między kawałki
+            space = self._text.rfind(" ", self._position, cut)
+            if space > self._position:
+                cut = space + 1
+        return cut
+
+    def _step(self) -> bool:
+        cut = self._next_cut()
+        self._widget.configure(state="normal")
+        self._widget.insert("end", self._text[self._position:cut])
+        self._position = cut
+        if self._final_state is not None:
+            self._widget.configure(state=self._final_state)
+        return self._position < len(self._text)
+
+    def _finish(self) -> None:
+        if self._on_done is not None:
+            self._on_done()
+
+
+class LazyTagger(_SteppedJob):
+    """Nakłada tag na zakresy: najpierw widoczne, resztę partiami w tle."""
+
+    def __init__(self, widget, text: str, spans: Sequence[Span], tag: str,
+                 batch: int = TAG_BATCH_SPANS):
+        super().__init__(widget)
+        self._lines = _LineIndex(text)
+        self._spans: List[Span] = list(spans)
+        self._tag = tag
+        self._batch = max(1, batch)
+
+    def _visible_range(self) -> Span:
+        height = self._widget.winfo_height()
+        first = int(str(self._widget.index("@0,0")).split(".")[0])
+        last = int(str(self._widget.index(f"@0,{max(0, height)}")).split(".")[0])
+        return self._lines.line_start(first), self._lines.line_start(last + 1)
+
+    def start(self) -> "LazyTagger":
+        self.started_at = time.perf_counter()
+        try:
+            low, high = self._visible_range()
+        except Exception:
+            low = high = 0
+        visible = [span for span in self._spans if span[1] > low and span[0] < high]
+        if visible:
+            self._apply(visible)
+            self._spans = [span for span in self._spans if not (span[1] > low and span[0] < high)]
+        self._spans.reverse()  # pop() z końca = kolejność od początku tekstu
+        if self._spans:
+            self._schedule()
+        else:
+            self.done = True
+            self.finished_at = time.perf_counter()
+        return self
+
+    def _apply(self, spans: Sequence[Span]) -> None:
+        for start, end in spans:
+            self._widget.tag_add(self._tag, self._lines.index(start), self._lines.index(end))
+
+    def _step(self) -> bool:
+        batch = [self._spans.pop() for _ in range(min(self._batch, len(self._spans)))]
+        self._apply(batch)
+        return bool(self._spans)
+
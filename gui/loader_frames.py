@@ -0,0 +1,192 @@
+"""Wspólny cache klatek animacji ładowania (``loader.gif``) dla wszystkich paneli.
+
+Każdy panel pokazuje ten sam GIF w tym samym rozmiarze, więc klatki
+(skomponowane na tło panelu i przeskalowane LANCZOS) liczymy raz:
+
+- w pamięci procesu: klucz ``(ścieżka, rozmiar, kolor tła)`` -> lista
+  ``PhotoImage`` współdzielona przez panele (tworzona w wątku UI),
+- na dysku: gotowe klatki jako jeden pasek PNG w ``cache/loader_frames`` –
+  kolejne uruchomienia i zmiany DPI tylko wczytują pasek, bez dekodowania
+  GIF-a i skalowania. Nazwa pliku zawiera rozmiar i mtime GIF-a, więc podmiana
+  pliku unieważnia cache.
+
+:func:`warm_loader_frames` przygotowuje klatki PIL bez Tk – można ją wołać w
+tle przy starcie.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageColor, ImageTk
+
+from utils.logger import logger
+from utils.paths import get_cache_dir_path
+
+LOADER_BASE_SIZE = 200
+LOADER_MIN_SIZE = 120
+LOADER_BG = "#f5f5f5"
+# Zmiana sposobu przygotowania klatek = nowa wersja (stare pliki nie pasują)
+CACHE_VERSION = 1
+CACHE_SUBDIR = "loader_frames"
+# Ile zestawów klatek trzymamy w pamięci i ile pasków na dysku
+MEMORY_ENTRIES = 2
+DISK_ENTRIES = 8
+
+FrameKey = Tuple[str, int, str]
+
+
+def loader_size(scale_factor: float) -> int:
+    """Rozmiar animacji (px) dla współczynnika skalowania UI."""
+    return max(LOADER_MIN_SIZE, int(LOADER_BASE_SIZE * scale_factor))
+
+
+def _resample():
+    try:
+        return Image.Resampling.LANCZOS
+    except AttributeError:  # starsze PIL
+        return Image.LANCZOS
+
+
+def decode_frames(path: str, size: int, bg: str = LOADER_BG) -> List[Image.Image]:
+    """Dekoduje GIF: każda klatka na tło ``bg`` i przeskalowana do ``size``×``size``."""
+    background = ImageColor.getrgb(bg)[:3] + (255,)
+    frames = []
+    with Image.open(path) as gif:
+        index = 0
+        while True:
+            try:
+                gif.seek(index)
+            except EOFError:
+                break
+            frame = gif.convert("RGBA")
+            frame = Image.alpha_composite(Image.new("RGBA", frame.size, background), frame)
+            frames.append(frame.resize((size, size), _resample()).convert("RGB"))
+            index += 1
+    return frames
+
+
+class LoaderFrameCache:
+    """Klatki PIL (dysk + pamięć, dowolny wątek) i ``PhotoImage`` (wątek UI)."""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._images: "OrderedDict[FrameKey, List[Image.Image]]" = OrderedDict()
+        self._photos: "OrderedDict[FrameKey, list]" = OrderedDict()
+        self.stats: Dict[str, int] = {"memory": 0, "disk": 0, "decoded": 0}
+
+    # ----------------------------------------------------------------- dysk
+    def _disk_path(self, key: FrameKey) -> Optional[str]:
+        path, size, bg = key
+        try:
+            info = os.stat(path)
+            directory = self._cache_dir or os.path.join(get_cache_dir_path(), CACHE_SUBDIR)
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            return None
+        source = f"{os.path.abspath(path)}|{info.st_size}|{info.st_mtime_ns}|{bg}|{CACHE_VERSION}"
+        digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(directory, f"{digest}_{size}.png")
+
+    @staticmethod
+    def _read_strip(file_path: str, size: int) -> Optional[List[Image.Image]]:
+        try:
+            with Image.open(file_path) as strip:
+                strip.load()
+                if strip.width != size or strip.height % size:
+                    return None
+                return [strip.crop((0, top, size, top + size)) for top in range(0, strip.height, size)]
+        except (OSError, ValueError):
+            return None
+
+    def _write_strip(self, file_path: str, frames: List[Image.Image], size: int) -> None:
+        strip = Image.new("RGB", (size, size * len(frames)))
+        for index, frame in enumerate(frames):
+            strip.paste(frame, (0, index * size))
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            strip.save(temp_path, format="PNG")
+            os.replace(temp_path, file_path)
+            self._prune(os.path.dirname(file_path))
+        except OSError as e:
+            logger.debug(f"Nie można zapisać cache klatek {file_path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _prune(directory: str) -> None:
+        strips = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".png")]
+        strips.sort(key=os.path.getmtime, reverse=True)
+        for old in strips[DISK_ENTRIES:]:
+            os.remove(old)
+
+    # ------------------------------------------------------------ klatki PIL
+    def images(self, path: str, size: int, bg: str = LOADER_BG) -> List[Image.Image]:
+        """Klatki PIL z pamięci, z paska na dysku albo zdekodowane (i zapisane)."""
+        key: FrameKey = (path, size, bg)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.stats["memory"] += 1
+                return self._images[key]
+
+        disk_path = self._disk_path(key)
+        frames = self._read_strip(disk_path, size) if disk_path and os.path.exists(disk_path) else None
+        if frames:
+            source = "disk"
+        else:
+            frames = decode_frames(path, size, bg)
+            source = "decoded"
+            if disk_path and frames:
+                self._write_strip(disk_path, frames, size)
+
+        with self._lock:
+            self.stats[source] += 1
+            self._images[key] = frames
+            while len(self._images) > MEMORY_ENTRIES:
+                self._images.popitem(last=False)
+        logger.debug(f"Klatki loadera {size}px: {len(frames)} ({source})")
+        return frames
+
+    # ------------------------------------------------------- klatki Tk (UI)
+    def photos(self, path: str, size: int, bg: str = LOADER_BG) -> list:
+        """Wspólna lista ``PhotoImage`` dla wszystkich paneli (tylko wątek UI)."""
+        key: FrameKey = (path, size, bg)
+        photos = self._photos.get(key)
+        if photos is not None:
+            self._photos.move_to_end(key)
+            return photos
+        photos = [ImageTk.PhotoImage(frame) for frame in self.images(path, size, bg)]
+        self._photos[key] = photos
+        # Panele z poprzednim rozmiarem trzymają własne referencje, aż przeładują klatki
+        while len(self._photos) > MEMORY_ENTRIES:
+            self._photos.popitem(last=False)
+        return photos
+
+
+_cache: Optional[LoaderFrameCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_loader_frame_cache() -> LoaderFrameCache:
+    """Singleton cache klatek loadera."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LoaderFrameCache()
+    return _cache
+
+
+def warm_loader_frames(path: str, size: int, bg: str = LOADER_BG) -> int:
+    """Przygotowuje klatki PIL (bez Tk, np. w tle przy starcie); zwraca ich liczbę."""
+    try:
+        return len(get_loader_frame_cache().images(path, size, bg))
+    except Exception as e:
+        logger.debug(f"Nie można przygotować klatek loadera {path}: {e}")
+        return 0
+
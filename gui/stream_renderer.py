@@ -0,0 +1,119 @@
+"""Buforowane renderowanie strumieni do paneli wyników.
+
+Wątki silnika tylko dopisują fragmenty do bufora panelu (bez dotykania Tk).
+Jeden flusher w wątku UI opróżnia wszystkie panele z ograniczoną częstotliwością
+(domyślnie ~45 Hz), wykonując co najwyżej jeden insert na panel na klatkę –
+zamiast osobnego ``after(0)`` dla każdego tokenu.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.logger import logger
+
+DEFAULT_FPS = 45
+
+
+class StreamRenderer:
+    """Bufor fragmentów per panel + flusher w wątku UI.
+
+    ``apply_func(idx, session_id, text)`` jest wołana w wątku UI z tekstem
+    sklejonym ze wszystkich fragmentów panelu, które przyszły od ostatniej klatki.
+    """
+
+    def __init__(self, tk_root, apply_func: Callable[[int, int, str], None], fps: int = DEFAULT_FPS):
+        self._root = tk_root
+        self._apply = apply_func
+        self._interval = 1.0 / max(1, fps)
+        self._lock = threading.Lock()
+        # idx -> (session_id, fragmenty)
+        self._buffers: Dict[int, Tuple[int, List[str]]] = {}
+        self._scheduled = False
+        self._first_pending: Optional[float] = None
+        self._last_flush = 0.0
+        self.reset_stats()
+
+    # ------------------------------------------------------------ statystyki
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.chunks_received = 0
+            self.panel_inserts = 0
+            self.frames = 0
+            self.flush_latency_total = 0.0
+            self.flush_latency_max = 0.0
+
+    @property
+    def chunks_coalesced(self) -> int:
+        """Ile fragmentów zostało połączonych z innymi (oszczędzone inserty)."""
+        return max(0, self.chunks_received - self.panel_inserts)
+
+    def stats_summary(self) -> str:
+        avg_ms = (self.flush_latency_total / self.frames * 1000) if self.frames else 0.0
+        return (
+            f"fragmenty={self.chunks_received} inserty={self.panel_inserts} "
+            f"połączone={self.chunks_coalesced} klatki={self.frames} "
+            f"opóźnienie flush avg={avg_ms:.1f} ms max={self.flush_latency_max * 1000:.1f} ms"
+        )
+
+    # ------------------------------------------------------------------- API
+    def push(self, idx: int, session_id: int, text: str) -> None:
+        """Dopisuje fragment do bufora panelu (dowolny wątek)."""
+        if not text:
+            return
+        with self._lock:
+            current = self._buffers.get(idx)
+            if current is None or current[0] != session_id:
+                current = (session_id, [])
+                self._buffers[idx] = current
+            current[1].append(text)
+            self.chunks_received += 1
+            if self._first_pending is None:
+                self._first_pending = time.perf_counter()
+            if self._scheduled:
+                return
+            self._scheduled = True
+            delay = self._interval - (time.perf_counter() - self._last_flush)
+        self._root.after(max(0, int(delay * 1000)), self._flush)
+
+    def discard(self, idx: Optional[int] = None) -> None:
+        """Porzuca oczekujące fragmenty panelu (albo wszystkich paneli)."""
+        with self._lock:
+            if idx is None:
+                self._buffers.clear()
+            else:
+                self._buffers.pop(idx, None)
+
+    def flush_panel(self, idx: int) -> None:
+        """Natychmiast renderuje oczekujące fragmenty jednego panelu (wątek UI)."""
+        with self._lock:
+            pending = self._buffers.pop(idx, None)
+        if pending is not None:
+            self._apply(idx, pending[0], "".join(pending[1]))
+            with self._lock:
+                self.panel_inserts += 1
+
+    def _flush(self) -> None:
+        with self._lock:
+            pending = self._buffers
+            self._buffers = {}
+            first_pending = self._first_pending
+            self._first_pending = None
+            self._scheduled = False
+            self._last_flush = time.perf_counter()
+        if not pending:
+            return
+
+        for idx, (session_id, parts) in pending.items():
+            try:
+                self._apply(idx, session_id, "".join(parts))
+            except Exception:
+                logger.debug(f"Render strumienia panelu {idx} nie powiódł się", exc_info=True)
+
+        with self._lock:
+            self.frames += 1
+            self.panel_inserts += len(pending)
+            if first_pending is not None:
+                latency = time.perf_counter() - first_pending
+                self.flush_latency_total += latency
+                self.flush_latency_max = max(self.flush_latency_max, latency)
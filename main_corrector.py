@@ -8,34 +8,52 @@ import sys
 import os
 import logging
 from datetime import datetime
-import difflib
-import re
 import functools
+import tempfile
+# Profiler startu przed ciężkimi importami - mierzy fazę "imports"
+from utils.startup_profiler import get_startup_profiler, is_benchmark_run
 import customtkinter as ctk
-import pystray
 from PIL import Image, ImageTk
-import threading
 import time
-import queue
 import asyncio
 import tkinter as tk
 from tkinter import messagebox
 from utils import config_manager
 from utils.hotkey_manager import get_hotkey_processor, cleanup_global_hotkey
-from api_clients import openai_client, anthropic_client, gemini_client, deepseek_client
-
-# Import debug moved to main() after setup_logging()
-import httpx
+from api_clients.base_client import is_error_result
+from api_clients.engine import ProviderRequest, get_engine, shutdown_engine
+from api_clients.registry import get_providers, preload_providers
+from utils.latency import get_latency_stats
+from utils.response_cache import make_cache_key
+from utils.text_chunker import is_long_text, split_text
+
+# SDK providerów, pystray i keyboard są importowane dopiero przy użyciu
 import pyperclip
-import keyboard
 from gui.prompts import get_system_prompt, get_instruction_prompt
-from utils.model_fetcher import fetch_models_for_provider, get_default_model
+from gui.stream_renderer import StreamRenderer
+from gui.large_text import ChunkedTextInserter, LazyTagger, is_large_text
+from gui.loader_frames import LOADER_BG, get_loader_frame_cache, loader_size
+from utils.diff_highlight import IncrementalDiffHighlighter, can_reconcile, changed_spans
+from utils.quorum import DEFAULT_QUORUM_SIZE, DEFAULT_QUORUM_THRESHOLD, find_quorum
+from utils.executor import get_executor, shutdown_executor
+from utils.race_stats import get_race_stats
+from utils.clipboard_watch import get_clipboard_watcher, histogram_summary as clipboard_histogram_summary
+from utils.correction_session import STATE_CANCELLED, STATE_FAILED, STATE_SKIPPED, SessionRegistry
+from utils.model_fetcher import get_default_model
 from utils.build_info import get_app_version
 
 # Globalne zmienne
 main_app = None
 tray_icon = None
 
+# Odświeżanie pasków postępu (ms) - stan pochodzi ze zdarzeń silnika
+PROGRESS_TICK_MS = 100
+# Pełny diff po streamingu - dopiero po narysowaniu finalnej klatki
+DIFF_RECONCILE_DELAY_MS = 50
+# Raport startu czeka na hotkey i tray (wątki w tle) najwyżej tyle po pierwszym idle
+STARTUP_SETTLE_MS = 3000
+STARTUP_POLL_MS = 50
+
 
 def _safe_update_idletasks(widget):
     """Safely update idle tasks for a widget, ignoring errors."""
@@ -295,7 +313,7 @@ def get_assets_dir_path():
         return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
 
 class AnimatedGIF(tk.Label):
-    """Widget dla animowanego GIF z lazy loading - oszczędza RAM."""
+    """Widget dla animowanego GIF z lazy loading - klatki ze wspólnego cache."""
     def __init__(self, master, path, scale_factor=1.0):
         self.master = master
         self.path = path
@@ -306,7 +324,7 @@ class AnimatedGIF(tk.Label):
         self.frames_loaded = False  # Lazy loading flag
         
         # Create placeholder image instead of loading GIF immediately
-        gif_size = max(120, int(200 * self.scale_factor))
+        gif_size = loader_size(self.scale_factor)
         placeholder = Image.new('RGBA', (gif_size, gif_size), (245, 245, 245, 0))  # Transparent placeholder
         self.placeholder_photo = ImageTk.PhotoImage(placeholder)
         
@@ -316,59 +334,43 @@ class AnimatedGIF(tk.Label):
             borderwidth=0,           # Usuń ramkę
             highlightthickness=0,    # Usuń highlight ring
             relief='flat',           # Płaski relief
-            bg='#f5f5f5'            # Dopasuj tło do aplikacji
+            bg=LOADER_BG            # Dopasuj tło do aplikacji
         )
     
     def _load_frames_lazy(self):
-        """Lazy loading GIF frames - ładuje tylko kiedy potrzeba."""
+        """Lazy loading klatek - wspólne dla wszystkich paneli (pamięć + cache na dysku)."""
         if self.frames_loaded:
             return
             
+        gif_size = loader_size(self.scale_factor)
         try:
-            logging.debug(f"Lazy loading GIF frames: {self.path}")
-            
-            # Load GIF
-            gif = Image.open(self.path)
-            
-            # Extract frames
-            try:
-                while True:
-                    frame = gif.copy()
-                    
-                    # Convert to RGBA for transparency support
-                    if frame.mode != 'RGBA':
-                        frame = frame.convert('RGBA')
-                    
-                    # Composite na tło aplikacji (#f5f5f5) żeby pozbyć się szarego tła
-                    app_bg_color = (245, 245, 245, 255)  # #f5f5f5 w RGBA
-                    app_bg = Image.new('RGBA', frame.size, app_bg_color)
-                    frame = Image.alpha_composite(app_bg, frame)
-                    
-                    # Resize with scale factor for different screen sizes
-                    gif_size = max(120, int(200 * self.scale_factor))
-                    try:
-                        frame = frame.resize((gif_size, gif_size), Image.Resampling.LANCZOS)
-                    except AttributeError:
-                        # Fallback for older PIL versions
-                        frame = frame.resize((gif_size, gif_size), Image.LANCZOS)
-                    
-                    self.frames.append(ImageTk.PhotoImage(frame))
-                    gif.seek(len(self.frames))
-            except EOFError:
-                pass
-            
-            gif.close()  # Close to free memory
+            self.frames = get_loader_frame_cache().photos(self.path, gif_size, LOADER_BG)
             self.frames_loaded = True
-            logging.debug(f"🍾 Lazy loaded {len(self.frames)} GIF frames")
+            logging.debug(f"🍾 Loader GIF: {len(self.frames)} klatek {gif_size}px")
                 
         except Exception as e:
             logging.error(f"Błąd lazy loading GIF {self.path}: {e}")
             # Create a simple colored square as fallback
-            gif_size = max(120, int(200 * self.scale_factor))
             fallback_image = Image.new('RGB', (gif_size, gif_size), color='blue')
             self.frames = [ImageTk.PhotoImage(fallback_image)]
             self.frames_loaded = True
 
+    def set_scale_factor(self, scale_factor):
+        """Zmiana skali UI (np. DPI) - klatki w nowym rozmiarze z cache, bez dekodowania GIF."""
+        if loader_size(scale_factor) == loader_size(self.scale_factor):
+            return
+        self.scale_factor = scale_factor
+        was_loaded = self.frames_loaded
+        self.frames = []
+        self.current_frame = 0
+        self.frames_loaded = False
+        if was_loaded or self.is_running:
+            self._load_frames_lazy()
+        if not self.is_running:
+            gif_size = loader_size(scale_factor)
+            self.placeholder_photo = ImageTk.PhotoImage(Image.new('RGBA', (gif_size, gif_size), (245, 245, 245, 0)))
+            self.configure(image=self.placeholder_photo)
+
     def start(self):
         """Start animation - z lazy loading."""
         if not self.frames_loaded:
@@ -435,31 +437,42 @@ class MultiAPICorrector(ctk.CTk):
         self.models = {}
         self.settings = {}
         self.ai_settings = {}
-        self.api_threads = {}
-        self.api_results = {}
+        self.api_session = None  # SessionHandle z silnika asyncio
+        # Stan sesji (stany providerów, wyniki, liczniki) - trzymane tylko ostatnie sesje
+        self.sessions = SessionRegistry()
         self.original_text = ""
         self.original_text_window = None
         self.original_text_textbox = None
         self.processing = False
-        self.current_session_id = 0
-        self.cancel_flags = {}  # Flagi anulowania dla każdego API
-        self.api_cancel_events = {}
-        # Guardy anty-duplikacji
-        self.result_update_guard = {}  # klucz: (session_id, idx) -> bool
         self.paste_in_progress = False
-        self._stream_started_indices = set()
-        self.api_names = ["OpenAI", "Anthropic", "Gemini", "DeepSeek"]
-        self._diff_word_pattern = re.compile(r"\S+")
+        # Fragmenty strumieni trafiają do paneli partiami, max ~45 klatek/s
+        self.stream_renderer = StreamRenderer(self, self._render_stream_text)
+        # Pomijanie cache odpowiedzi w bieżącej sesji (przycisk "Bez cache")
+        self.cache_bypass = False
+        # Panele budowane z rejestru providerów (wbudowani + [PROVIDER:*] z config.ini)
+        self.providers = get_providers()
+        self.api_names = [spec.name for spec in self.providers]
+        # Wynik wskazany przez kworum - Enter wkleja go przez use_api_result
+        self.preselected_result_idx = None
+        # Przyrostowe podświetlanie różnic w trakcie streamingu (idx -> highlighter)
+        self._diff_highlighters = {}
+        # Trwające wstawianie kawałkami / leniwe tagowanie długich wyników (idx -> zadania)
+        self._panel_renders = {}
+        self._original_text_render = None
         
         # UI - zbuduj cały interfejs
-        self.setup_ui()
-        self.load_config()
+        profiler = get_startup_profiler()
+        with profiler.phase("ui_construction"):
+            self.setup_ui()
+        with profiler.phase("config_load"):
+            self.load_config()
         
         # Protocol dla zamykania okna
         self.protocol("WM_DELETE_WINDOW", self.minimize_to_tray)
         
         # PRE-RENDER wszystko w pamięci dla błyskawicznego pokazania
-        self.update_idletasks()  # Wyrenderuj wszystkie widżety
+        with profiler.phase("pre_render"):
+            self.update_idletasks()  # Wyrenderuj wszystkie widżety
         logging.info("🚀 Okno pre-rendered w pamięci - gotowe do natychmiastowego pokazania")
         
         # UKRYJ okno - będzie czekać w RAM!
@@ -467,6 +480,7 @@ class MultiAPICorrector(ctk.CTk):
         
         # Bind window configure events
         self.bind('<Configure>', self.on_window_configure)
+        self.bind('<Return>', self._use_preselected_result)
     
     def get_screen_dimensions(self):
         """Pobiera wymiary aktualnego ekranu."""
@@ -579,12 +593,12 @@ class MultiAPICorrector(ctk.CTk):
         """Aktualizuje przechowywany oryginalny tekst i widok podglądu."""
         self.original_text = text or ""
         self._update_original_text_view()
-        if hasattr(self, "original_text_button"):
+        for button_name in ("original_text_button", "no_cache_button"):
+            button = getattr(self, button_name, None)
+            if button is None:
+                continue
             try:
-                if self.original_text.strip():
-                    self.original_text_button.configure(state="normal")
-                else:
-                    self.original_text_button.configure(state="disabled")
+                button.configure(state="normal" if self.original_text.strip() else "disabled")
             except Exception:
                 pass
 
@@ -603,13 +617,25 @@ class MultiAPICorrector(ctk.CTk):
             prev_state = textbox.cget("state")
         except Exception:
             prev_state = "normal"
-        if prev_state != "normal":
-            textbox.configure(state="normal")
+        self._fill_original_textbox(textbox, prev_state)
+
+    def _fill_original_textbox(self, textbox, final_state) -> None:
+        """Wstawia oryginalny tekst do podglądu - długi tekst kawałkami, bez blokowania UI."""
+        if self._original_text_render is not None:
+            self._original_text_render.cancel()
+            self._original_text_render = None
+        if is_large_text(self.original_text):
+            self._original_text_render = ChunkedTextInserter(
+                textbox, self.original_text, final_state=final_state
+            ).start()
+            textbox.yview_moveto(0.0)
+            return
+        textbox.configure(state="normal")
         textbox.delete("1.0", "end")
         textbox.insert("1.0", self.original_text)
         textbox.yview_moveto(0.0)
-        if prev_state != "normal":
-            textbox.configure(state=prev_state)
+        if final_state != "normal":
+            textbox.configure(state=final_state)
 
     def _on_original_window_destroy(self, event) -> None:
         """Czyści referencje po zamknięciu okna podglądu oryginalnego tekstu."""
@@ -716,8 +742,7 @@ class MultiAPICorrector(ctk.CTk):
             text_color="black"
         )
         textbox.pack(side="left", fill="both", expand=True)
-        textbox.insert("1.0", self.original_text)
-        textbox.configure(state="disabled")
+        self._fill_original_textbox(textbox, "disabled")
         textbox.configure(cursor="xterm")
 
         scrollbar = ctk.CTkScrollbar(
@@ -763,11 +788,10 @@ class MultiAPICorrector(ctk.CTk):
         if hasattr(self, 'status_label'):
             self.status_label.configure(font=ctk.CTkFont(size=scaled_font_size, weight="bold"))
         
-        # Przeskaluj rozmiary animacji GIF
-        if hasattr(self, 'api_loaders'):
-            new_gif_size = max(120, int(200 * self.scale_factor))
-            # Tutaj można by przeładować GIFy z nowym rozmiarem, ale to kosztowne
-            # Zostawiamy to jako jest dla wydajności
+        # Przeskaluj animacje GIF - klatki w nowym rozmiarze ze wspólnego cache
+        for loader in getattr(self, 'api_loaders', []):
+            if hasattr(loader, 'set_scale_factor'):
+                loader.set_scale_factor(self.scale_factor)
         
         logging.info(f"UI rescaled with factor: {self.scale_factor:.2f}")
 
@@ -808,7 +832,7 @@ class MultiAPICorrector(ctk.CTk):
         
         self.api_counter_label = ctk.CTkLabel(
             info_frame,
-            text="🤖 API: 0/4",
+            text=f"🤖 API: 0/{len(self.api_names)}",
             font=ctk.CTkFont(size=info_font_size)
         )
         self.api_counter_label.pack(side="left", padx=10)
@@ -820,11 +844,12 @@ class MultiAPICorrector(ctk.CTk):
         )
         self.progress_label.pack(side="left", padx=10)
         
-        # Container dla 4 API panels
+        # Container dla paneli API
         panels_container = ctk.CTkFrame(self.main_frame)
         panels_container.pack(fill="both", expand=True, padx=5, pady=5)
         
-        # Grid 2x2 dla 4 API
+        # Grid: 2 kolumny do 4 paneli (2x2), powyżej 3 kolumny
+        grid_columns = 2 if len(self.providers) <= 4 else 3
         self.api_frames = []
         self.api_text_widgets = []
         self.api_labels = []
@@ -836,21 +861,14 @@ class MultiAPICorrector(ctk.CTk):
         self.api_loader_frames = []
 
         # Dodatkowe mechanizmy dla custom akcji
-        self.api_action_threads = {}  # Wątki dla custom akcji
+        self.api_action_sessions = {}  # Sesje silnika dla custom akcji
         self.api_action_cancel_flags = {}  # Flagi anulowania dla custom akcji
         
-        # Oryginalne kolory z PyQt6 aplikacji
-        api_colors = {
-            "OpenAI": "#10a37f",     # Zielony OpenAI
-            "Anthropic": "#d97706",   # Pomarańczowy Anthropic
-            "Gemini": "#4285f4",      # Niebieski Google
-            "DeepSeek": "#7c3aed"     # Fioletowy DeepSeek
-        }
-        
-        for i, name in enumerate(self.api_names):
-            row = i // 2
-            col = i % 2
-            color = api_colors[name]
+        for i, spec in enumerate(self.providers):
+            name = spec.name
+            row = i // grid_columns
+            col = i % grid_columns
+            color = spec.color
             
             # Frame dla każdego API z kolorem tła
             api_frame = ctk.CTkFrame(panels_container, corner_radius=10)
@@ -935,7 +953,8 @@ class MultiAPICorrector(ctk.CTk):
             # Animated GIF loader (skalowany)
             gif_path = os.path.join(get_assets_dir_path(), "loader.gif")
             if os.path.exists(gif_path):
-                loader = AnimatedGIF(loader_frame, gif_path, self.scale_factor)
+                with get_startup_profiler().phase("gif_preload"):
+                    loader = AnimatedGIF(loader_frame, gif_path, self.scale_factor)
                 loader.pack(expand=True)
                 self.api_loaders.append(loader)
             else:
@@ -1026,6 +1045,16 @@ class MultiAPICorrector(ctk.CTk):
         )
         self.original_text_button.pack(side="left", padx=5)
 
+        self.no_cache_button = ctk.CTkButton(
+            control_frame,
+            text="🔁 Bez cache",
+            command=self.reprocess_without_cache,
+            width=140,
+            height=40,
+            state="disabled"
+        )
+        self.no_cache_button.pack(side="left", padx=5)
+
         self.paste_button = ctk.CTkButton(
             control_frame,
             text="📋 Wklej tekst",
@@ -1084,9 +1113,9 @@ class MultiAPICorrector(ctk.CTk):
             
             # Sprawdź które API są skonfigurowane
             configured = []
-            for api in self.api_names:
-                if self.api_keys.get(api, ""):
-                    configured.append(api)
+            for spec in self.providers:
+                if spec.is_configured(self.api_keys.get(spec.name, "")):
+                    configured.append(spec.name)
             
             if configured:
                 self.update_status(f"✅ API gotowe: {', '.join(configured)}")
@@ -1119,16 +1148,21 @@ class MultiAPICorrector(ctk.CTk):
             except Exception:
                 pass
 
-    def handle_hotkey_event(self):
-        """Obsługuje Ctrl+Shift+C - NAJPIERW kopiuje tekst, POTEM pokazuje GUI."""
+    def handle_hotkey_event(self, race=None):
+        """Obsługuje Ctrl+Shift+C - NAJPIERW kopiuje tekst, POTEM pokazuje GUI.
+
+        ``race`` wymusza tryb wyścigu (skrót RaceHotkey); None = ustawienie RaceMode.
+        """
+        if race is None:
+            race = self._is_race_mode_enabled()
         try:
             logging.info("🚀 Hotkey detected - clipboard copy FIRST, GUI AFTER")
             
-            # Jeśli już przetwarza - anuluj poprzednie
-            if self.processing:
+            # Jeśli już przetwarza - anuluj poprzednie (nieblokujące; jesteśmy poza
+            # wątkiem UI, więc bez resetu widgetów - zrobi to nowa sesja)
+            if self.processing and self.api_session is not None:
                 logging.info("Hotkey: Quick cancel poprzedniego przetwarzania...")
-                self.cancel_all_processing()
-                time.sleep(0.1)  # Zmniejszony delay
+                self.api_session.cancel()
             
             # KLUCZOWE: Szybkie kopiowanie W TLE - okno NADAL UKRYTE!
             # Oryginalna aplikacja ma focus, zaznaczenie nie zostanie utracone
@@ -1136,7 +1170,16 @@ class MultiAPICorrector(ctk.CTk):
             clipboard_text = ""
             
             try:
-                clipboard_text = self._robust_clipboard_copy()
+                # Worker hotkeya już skopiował zaznaczenie i poczekał na schowek
+                last_copy = get_hotkey_processor().last_copy
+                if last_copy is not None and last_copy.text.strip():
+                    clipboard_text = last_copy.text
+                    logging.info(
+                        f"Tekst gotowy po {last_copy.latency * 1000:.0f} ms ({last_copy.source}); "
+                        f"histogram: {clipboard_histogram_summary()}"
+                    )
+                else:
+                    clipboard_text = self._robust_clipboard_copy()
                         
             except Exception as e:
                 logging.warning(f"Background clipboard copy failed: {e}")
@@ -1154,7 +1197,7 @@ class MultiAPICorrector(ctk.CTk):
             self._set_original_text(clipboard_text)
             
             # DOPIERO TERAZ pokaż GUI - po udanym kopiowaniu!
-            self._show_gui_and_process(clipboard_text)
+            self._show_gui_and_process(clipboard_text, race=race)
             
         except Exception as e:
             logging.error(f"Błąd obsługi hotkey: {e}")
@@ -1188,35 +1231,105 @@ class MultiAPICorrector(ctk.CTk):
         
         # Okno pozostaje otwarte do momentu wyboru wyniku lub anulowania
     
-    def _show_gui_and_process(self, clipboard_text):
+    def _show_gui_and_process(self, clipboard_text, race=False):
         """Pokazuje GUI i rozpoczyna przetwarzanie po udanym kopiowaniu."""
         logging.info("🔧 Preparing loading state BEFORE showing GUI...")
-        self.process_text_multi_api(clipboard_text, force_show=True)
+        hotkey_time = get_hotkey_processor().last_hotkey_time
+        self.process_text_multi_api(clipboard_text, force_show=True, hotkey_time=hotkey_time, race=race)
 
-    def _prepare_processing_session(self, text, status_message):
+    def _is_response_cache_enabled(self) -> bool:
+        value = str(self.settings.get("ResponseCache", "1")).strip().lower()
+        return value in {"1", "true", "yes", "on"}
+
+    def _response_cache_key(self, api_name, model, text, instruction_prompt, system_prompt):
+        """Klucz cache odpowiedzi dla zapytania albo None (cache wyłączony / pominięty)."""
+        if self.cache_bypass or not self._is_response_cache_enabled():
+            return None
+        # Ustawienia AI wpływają tylko na providerów, którzy je obsługują
+        spec = self.providers[self.api_names.index(api_name)]
+        ai_settings = self.ai_settings if spec.supports_ai_settings else None
+        return make_cache_key(
+            api_name, model, system_prompt, instruction_prompt, text, ai_settings, options=spec.options
+        )
+
+    def _is_long_text_mode_enabled(self) -> bool:
+        value = str(self.settings.get("LongTextMode", "1")).strip().lower()
+        return value in {"1", "true", "yes", "on"}
+
+    def _is_hedging_enabled(self) -> bool:
+        value = str(self.settings.get("HedgeRequests", "0")).strip().lower()
+        return value in {"1", "true", "yes", "on"}
+
+    def _provider_options(self, spec):
+        """Dodatkowe argumenty dla klienta providera (ustawienia z pamięci, nie z dysku)."""
+        options = dict(spec.options)
+        if spec.supports_ai_settings:
+            options["ai_settings"] = dict(self.ai_settings)
+        return options
+
+    def reprocess_without_cache(self):
+        """Ponawia przetwarzanie oryginalnego tekstu z pominięciem cache odpowiedzi."""
+        if not self.original_text.strip():
+            return
+        logging.info("🔁 Ponowne przetwarzanie z pominięciem cache")
+        self.process_text_multi_api(self.original_text, bypass_cache=True)
+
+    def _is_prewarm_enabled(self) -> bool:
+        value = str(self.settings.get("PrewarmConnections", "1")).strip().lower()
+        return value in {"1", "true", "yes", "on"}
+
+    def prewarm_connections(self):
+        """Otwiera połączenia do providerów z kluczem API (wołane z wątku hotkeya).
+
+        Działa równolegle z kopiowaniem schowka, więc właściwe zapytania idą już
+        po gotowych połączeniach TCP+TLS.
+        """
+        if not self._is_prewarm_enabled():
+            return
+        engine = get_engine()
+        for spec in self.providers:
+            api_key = self.api_keys.get(spec.name, "")
+            if spec.prewarm is not None and spec.is_configured(api_key):
+                model = self.models.get(spec.name, "")
+                engine.prewarm(spec.name, functools.partial(spec.prewarm, api_key, model, **spec.options))
+
+    @property
+    def session(self):
+        """Bieżąca :class:`CorrectionSession` (None przed pierwszym przetwarzaniem)."""
+        return self.sessions.current
+
+    @property
+    def current_session_id(self):
+        return self.sessions.current_id
+
+    @property
+    def api_results(self):
+        """Udane wyniki bieżącej sesji (idx -> tekst)."""
+        session = self.sessions.current
+        return session.results if session is not None else {}
+
+    def _prepare_processing_session(self, text, status_message, race=False, hotkey_time=None):
         """Resetuje UI i ustawia wszystkie panele w stan ładowania."""
         # Zatrzymaj ewentualne poprzednie strumienie
-        for event in self.api_cancel_events.values():
-            try:
-                event.set()
-            except Exception:
-                pass
+        if self.api_session is not None:
+            self.api_session.cancel()
+            self.api_session = None
 
         self.processing = True
-        self.api_results = {}
-        self.cancel_flags = {}
-        self.api_cancel_events = {}
-        self.current_session_id += 1
-        self._stream_started_indices.clear()
+        self._cancel_panel_render()
+        self.sessions.begin(self.api_names, text_length=len(text), race=race, hotkey_time=hotkey_time)
+        self._diff_highlighters = {}
+        self._clear_preselected_result()
+        self.stream_renderer.discard()
+        self.stream_renderer.reset_stats()
         self._set_original_text(text)
 
         self.update_status(status_message)
         self.session_label.configure(text=f"📝 Sesja: {self.current_session_id}")
         self.progress_label.configure(text=f"Tekst: {len(text)} znaków")
-        self.api_counter_label.configure(text="🤖 API: 0/4")
+        self.api_counter_label.configure(text=f"🤖 API: 0/{len(self.api_names)}")
 
         for i, api_name in enumerate(self.api_names):
-            self.api_cancel_events[i] = threading.Event()
             text_widget = self.api_text_widgets[i]
             text_widget.configure(state="normal")
             text_widget.delete("1.0", "end")
@@ -1243,43 +1356,32 @@ class MultiAPICorrector(ctk.CTk):
         self.cancel_all_button.configure(state="normal")
 
     def _append_partial(self, idx, chunk_text, session_id):
-        """Bezpiecznie dokleja fragment strumienia do panelu API w aktualnej sesji."""
-        if session_id != self.current_session_id:
+        """Dopisuje fragment strumienia do bufora panelu (wołane z wątku silnika)."""
+        session = self.session
+        if session is None or session.session_id != session_id or session.is_cancelled(idx):
             return
-        if self.cancel_flags.get(idx, False):
-            return
-
-        # ASYNCHRONICZNY streaming - używam after() aby nie blokować wątku API
-        def do_append():
-            if session_id != self.current_session_id:
-                return
-            # Przełącz z loadera na textbox przy pierwszym fragmencie
-            if idx not in self._stream_started_indices:
-                # Ukryj loader i pokaż textbox
-                try:
-                    self.api_text_widgets[idx].lift()
-                except Exception:
-                    pass
-                # Wyczyść placeholder
-                try:
-                    self.api_text_widgets[idx].configure(state="normal")
-                    self.api_text_widgets[idx].delete("1.0", "end")
-                    self.api_text_widgets[idx].configure(state="disabled")
-                except Exception:
-                    pass
-                self._stream_started_indices.add(idx)
+        self.stream_renderer.push(idx, session_id, chunk_text)
 
-            # Doklej fragment
-            try:
-                self.api_text_widgets[idx].configure(state="normal")
-                self.api_text_widgets[idx].insert("end", chunk_text)
-                self.api_text_widgets[idx].see("end")
-                self.api_text_widgets[idx].configure(state="disabled")
-            except Exception:
-                pass
-        
-        # ASYNCHRONICZNY UPDATE - nie blokuje wątku API
-        self.after(0, do_append)
+    def _render_stream_text(self, idx, session_id, text):
+        """Dokleja zbuforowane fragmenty do panelu - jeden insert na klatkę (wątek UI)."""
+        session = self.session
+        if session is None or session.session_id != session_id or session.is_cancelled(idx):
+            return
+        widget = self.api_text_widgets[idx]
+        widget.configure(state="normal")
+        # Przełącz z loadera na textbox przy pierwszym fragmencie i wyczyść placeholder
+        if session.mark_streaming(idx):
+            widget.lift()
+            widget.delete("1.0", "end")
+            if self._is_diff_highlighting_enabled() and self.original_text.strip():
+                self._diff_highlighters[idx] = IncrementalDiffHighlighter(self.original_text)
+        widget.insert("end", text)
+        # Taguj tylko wyrazy dopasowane w tej klatce
+        highlighter = self._diff_highlighters.get(idx)
+        if highlighter is not None:
+            self._apply_diff_spans(widget, highlighter.feed(text))
+        widget.see("end")
+        widget.configure(state="disabled")
 
     def _is_diff_highlighting_enabled(self) -> bool:
         value = str(self.settings.get("HighlightDiffs", "0")).strip().lower()
@@ -1295,6 +1397,14 @@ class MultiAPICorrector(ctk.CTk):
             except Exception:
                 return "normal"
 
+    def _apply_diff_spans(self, widget, spans):
+        """Taguje zakresy (znaki od początku tekstu) jako zmienione."""
+        if not spans:
+            return
+        widget.tag_config("diff_highlight", underline=1, foreground="#d93025")
+        for start, end in spans:
+            widget.tag_add("diff_highlight", f"1.0+{start}c", f"1.0+{end}c")
+
     def _highlight_diff(self, idx: int, original: str, corrected: str) -> None:
         widget = self.api_text_widgets[idx]
         prev_state = self._get_textbox_state(widget)
@@ -1306,27 +1416,64 @@ class MultiAPICorrector(ctk.CTk):
                 return
             if not original.strip() or not corrected.strip():
                 return
-
-            orig_tokens = [m.group() for m in self._diff_word_pattern.finditer(original)]
-            corr_matches = list(self._diff_word_pattern.finditer(corrected))
-            if not corr_matches:
-                return
-            corr_tokens = [m.group() for m in corr_matches]
-            matcher = difflib.SequenceMatcher(None, orig_tokens, corr_tokens)
-            widget.tag_config("diff_highlight", underline=1, foreground="#d93025")
-            for tag, _i1, _i2, j1, j2 in matcher.get_opcodes():
-                if tag not in ("replace", "insert"):
-                    continue
-                if j1 >= len(corr_matches) or j1 == j2:
-                    continue
-                end_index = min(j2 - 1, len(corr_matches) - 1)
-                start = corr_matches[j1].start()
-                end = corr_matches[end_index].end()
-                widget.tag_add("diff_highlight", f"1.0+{start}c", f"1.0+{end}c")
+            self._apply_diff_spans(widget, changed_spans(original, corrected))
         finally:
             if prev_state != "normal":
                 widget.configure(state=prev_state)
 
+    def _cancel_panel_render(self, idx=None):
+        """Przerywa wstawianie/tagowanie długiego tekstu w panelu (albo we wszystkich)."""
+        targets = list(self._panel_renders) if idx is None else [idx]
+        for target in targets:
+            for job in self._panel_renders.pop(target, ()):
+                job.cancel()
+
+    def _insert_large_result(self, idx, session_id, result):
+        """Długi wynik: wstawianie kawałkami, diff w tle, tagi najpierw w widocznym obszarze."""
+        self._cancel_panel_render(idx)
+        widget = self.api_text_widgets[idx]
+        widget.tag_remove("diff_highlight", "1.0", "end")
+        original = self.original_text or ""
+
+        def on_inserted():
+            if not self._is_diff_highlighting_enabled() or not original.strip():
+                return
+            future = get_executor().submit(changed_spans, original, result)
+            future.add_done_callback(
+                lambda f: self.after(0, self._tag_large_result, idx, session_id, result, f)
+            )
+
+        inserter = ChunkedTextInserter(widget, result, on_done=on_inserted)
+        self._panel_renders[idx] = [inserter]
+        inserter.start()
+
+    def _tag_large_result(self, idx, session_id, result, future):
+        if session_id != self.current_session_id or self.api_results.get(idx) != result:
+            return
+        if future.cancelled() or future.exception() is not None:
+            return
+        widget = self.api_text_widgets[idx]
+        widget.tag_config("diff_highlight", underline=1, foreground="#d93025")
+        tagger = LazyTagger(widget, result, future.result(), "diff_highlight").start()
+        self._panel_renders.setdefault(idx, []).append(tagger)
+
+    def _reconcile_diff(self, idx, session_id, result):
+        """Pełny diff po zakończeniu strumienia - tylko gdy tekst mieści się w limicie.
+
+        Dla dłuższych tekstów zostają tagi nadane przyrostowo w trakcie streamingu.
+        """
+        if session_id != self.current_session_id or self.api_results.get(idx) != result:
+            return
+        if not can_reconcile(self.original_text or "", result):
+            logging.debug(f"Diff panelu {idx}: tekst za długi na pełną rekonsyliację - zostają tagi przyrostowe")
+            return
+        try:
+            # Offsety liczone względem treści panelu (tekst strumienia przed strip())
+            text = self.api_text_widgets[idx].get("1.0", "end-1c")
+            self._highlight_diff(idx, self.original_text or "", text)
+        except Exception:
+            logging.debug("Highlight diff failed", exc_info=True)
+
     def refresh_diff_highlights(self):
         if not hasattr(self, "api_text_widgets"):
             return
@@ -1343,99 +1490,159 @@ class MultiAPICorrector(ctk.CTk):
             if prev_state != "normal":
                 widget.configure(state=prev_state)
 
-    def _start_api_threads(self, text):
-        """Uruchamia API threads - UI już przygotowane!"""
-        logging.info("🚀 Starting API threads with pre-rendered UI")
-        
-        # Uruchom wątki dla każdego API
-        self.api_threads = {}
-        session_id = self.current_session_id
-        
-        apis = [
-            (0, "OpenAI", openai_client.correct_text_openai),
-            (1, "Anthropic", anthropic_client.correct_text_anthropic),
-            (2, "Gemini", gemini_client.correct_text_gemini),
-            (3, "DeepSeek", deepseek_client.correct_text_deepseek)
-        ]
-        
-        # Debug: podgląd przypisanych funkcji API
-        for idx, api_name, api_func in apis:
-            logging.debug(
-                "API slot %s -> %s",
-                idx,
-                api_func.__name__ if hasattr(api_func, '__name__') else api_func,
-            )
-        
-        for idx, api_name, api_func in apis:
-            if self.api_keys.get(api_name):
-                logging.info(f"🔍 DEBUG: Starting thread for {api_name} with model: {self.models.get(api_name, 'unknown')}")
-                self.cancel_flags[idx] = False  # Flaga anulowania
-                thread = threading.Thread(
-                    target=self._process_single_api,
-                    args=(idx, api_name, api_func, text, session_id),
-                    daemon=True
-                )
-                thread.start()
-                self.api_threads[idx] = thread
+    def _start_api_session(self, text):
+        """Zgłasza sesję do silnika asyncio - UI już przygotowane!"""
+        logging.info("🚀 Starting API session with pre-rendered UI")
+
+        session = self.session
+        session_id = session.session_id
+        instruction_prompt = get_instruction_prompt("normal")
+        system_prompt = get_system_prompt("normal")
+
+        # Tryb długiego tekstu: fragmenty na granicach akapitów, wspólne dla wszystkich API
+        chunks = None
+        if self._is_long_text_mode_enabled() and is_long_text(text):
+            chunks = split_text(text)
+            logging.info(f"📚 Długi tekst ({len(text)} znaków) - podział na {len(chunks)} fragmentów")
+
+        requests = []
+        for idx, spec in enumerate(self.providers):
+            api_name = spec.name
+            if spec.is_configured(self.api_keys.get(api_name, "")):
+                logging.info(f"🔍 DEBUG: Queueing {api_name} with model: {self.models.get(api_name, 'unknown')}")
+                session.start(idx)
+                model = self.models.get(api_name, "")
+                requests.append(ProviderRequest(
+                    index=idx,
+                    name=api_name,
+                    func=spec.correct,
+                    api_key=self.api_keys.get(api_name, ""),
+                    model=model,
+                    text=text,
+                    instruction_prompt=instruction_prompt,
+                    system_prompt=system_prompt,
+                    cache_key=self._response_cache_key(api_name, model, text, instruction_prompt, system_prompt),
+                    options=self._provider_options(spec),
+                    hedge=self._is_hedging_enabled(),
+                    chunks=chunks,
+                ))
             else:
                 logging.info(f"🔍 DEBUG: Skipping {api_name} - no API key")
-                self._update_api_result(idx, f"❌ Brak klucza API dla {api_name}", True, 0, session_id)
-    
+                self._update_api_result(idx, f"❌ Brak klucza API dla {api_name}", True, 0, session_id, outcome=STATE_SKIPPED)
+
+        if requests:
+            self.api_session = get_engine().submit(session_id, requests, self._on_engine_event)
+            self.after(PROGRESS_TICK_MS, self._tick_progress, session_id)
+
+    def _on_engine_event(self, event):
+        """Odbiera zdarzenia z wątku silnika i przekazuje je do wątku UI."""
+        if event.kind in ("chunk", "result"):
+            self._log_hotkey_latency(event)
+        if event.kind == "chunk":
+            self._append_partial(event.index, event.data, event.session_id)
+        elif event.kind == "result":
+            if is_error_result(event.data):
+                # Komunikat błędu providera albo pusta odpowiedź - nie wynik do kworum/wyścigu
+                message = event.data or f"❌ Pusta odpowiedź {self.api_names[event.index]}"
+                self.after(0, lambda e=event, m=message: self._update_api_result(e.index, m, True, 0, e.session_id))
+            else:
+                self.after(0, lambda e=event: self._update_api_result(e.index, e.data, False, e.elapsed, e.session_id))
+        elif event.kind == "error":
+            self.after(0, lambda e=event: self._update_api_result(e.index, f"❌ Błąd: {e.data}", True, 0, e.session_id))
+        elif event.kind == "cancelled":
+            self.after(0, lambda e=event: self._update_api_result(
+                e.index, "❌ Anulowano", True, 0, e.session_id, outcome=STATE_CANCELLED))
+
+    def _log_hotkey_latency(self, event):
+        """Loguje czas od wciśnięcia hotkeya do pierwszego tokenu danego API."""
+        session = self.sessions.get(event.session_id)
+        if session is None or session.hotkey_time is None:
+            return
+        if not session.record_first_token(event.index):
+            return
+        latency = time.perf_counter() - session.hotkey_time
+        api_name = self.api_names[event.index]
+        get_latency_stats().record(api_name, "hotkey_to_first_token", latency)
+        logging.info(
+            f"⏱️ Hotkey -> pierwszy token {api_name}: {latency * 1000:.0f} ms "
+            f"(prewarm: {'on' if self._is_prewarm_enabled() else 'off'}; "
+            f"{get_latency_stats().summary(api_name, 'hotkey_to_first_token')})"
+        )
+
+    def _tick_progress(self, session_id, shown=None):
+        """Jeden ticker UI rysujący postęp zgłaszany przez silnik.
+
+        Fazy (połączenie, pierwszy token, odebrane vs oczekiwane tokeny) ustawia
+        warstwa API; ticker tylko je odczytuje i zmienia paski, które się zmieniły.
+        """
+        session = self.api_session
+        if session_id != self.current_session_id or session is None or not session.is_active():
+            return
+        shown = shown if shown is not None else {}
+        for idx, progress_bar in enumerate(self.api_progress_bars):
+            progress = session.progress(idx)
+            if progress is None or not session.is_active(idx):
+                continue
+            value = round(progress.fraction(), 2)
+            if shown.get(idx) != value:
+                shown[idx] = value
+                progress_bar.set(value)
+        self.after(PROGRESS_TICK_MS, self._tick_progress, session_id, shown)
+
     def _robust_clipboard_copy(self, max_retries=2):
-        """Szybki clipboard copy - maksymalnie uproszczony."""
+        """Ctrl+C i oczekiwanie na zmianę schowka (bez stałych opóźnień)."""
+        watcher = get_clipboard_watcher()
         
         for attempt in range(max_retries):
             try:
                 logging.debug(f"Quick copy {attempt + 1}/{max_retries}")
                 
-                # Pynput z minimalnym delay
                 from pynput.keyboard import Key, Controller
                 kb_controller = Controller()
                 
+                before = watcher.snapshot()
                 kb_controller.press(Key.ctrl)
                 kb_controller.press('c')
-                time.sleep(0.02)  # Minimalny hold
                 kb_controller.release('c')
                 kb_controller.release(Key.ctrl)
                 
-                # Krótkie sprawdzenie - max 2 razy
-                for check in range(2):  
-                    time.sleep(0.02)  # Bardzo krótki delay
-                    new_clipboard = pyperclip.paste()
-                    
-                    if new_clipboard and new_clipboard.strip():
-                        logging.info(f"✅ Copy success {attempt + 1}.{check + 1}")
-                        return new_clipboard
+                copy = watcher.wait_for_change(before, get_hotkey_processor().clipboard_timeout)
+                if copy.text and copy.text.strip():
+                    logging.info(f"✅ Copy success {attempt + 1} po {copy.latency * 1000:.0f} ms ({copy.source})")
+                    return copy.text
                 
-                # Jeśli pierwsze nie powiodło się, krótki retry
-                if attempt < max_retries - 1:
-                    logging.warning(f"Attempt {attempt + 1} failed - quick retry")
-                    time.sleep(0.05)  # Minimalny delay przed retry
+                logging.warning(f"Attempt {attempt + 1} failed - quick retry")
                 
             except Exception as e:
                 logging.warning(f"Copy attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(0.05)  # Minimalny delay
         
         logging.error("All clipboard copy attempts failed")
         return ""
     
-    def process_text_multi_api(self, text, force_show=False):
-        """Przetwarza tekst używając wszystkich 4 API równocześnie."""
-        if self.processing and not self.cancel_flags:
+    def process_text_multi_api(self, text, force_show=False, hotkey_time=None, bypass_cache=False, race=False):
+        """Przetwarza tekst używając wszystkich skonfigurowanych API równocześnie.
+
+        ``race=True`` - tryb wyścigu: pierwszy wynik bez błędu jest od razu
+        wklejany, a pozostałe zapytania anulowane.
+        """
+        if self.processing and self.session is not None and self.session.not_started:
             self.update_status("⚠️ Już przetwarzam...")
             return
 
         window_visible = bool(self.winfo_viewable())
         should_show = force_show or not window_visible
-        status_message = "📝 Przetwarzanie tekstu..." if should_show else "🔄 Wysyłanie do 4 API równocześnie..."
+        sending_message = f"🔄 Wysyłanie do {len(self.api_names)} API równocześnie..."
+        status_message = "📝 Przetwarzanie tekstu..." if should_show else sending_message
 
         if should_show and window_visible:
             # Ukryj okno na czas przebudowy UI, żeby zapobiec migotaniu loaderów
             self.withdraw()
             self.update_idletasks()
 
-        self._prepare_processing_session(text, status_message)
+        self._prepare_processing_session(text, status_message, race=race, hotkey_time=hotkey_time)
+        self.cache_bypass = bypass_cache
+        if race:
+            logging.info("🏁 Tryb wyścigu - pierwszy poprawny wynik zostanie wklejony")
 
         if should_show:
             self.attributes('-alpha', 0.0)
@@ -1448,182 +1655,41 @@ class MultiAPICorrector(ctk.CTk):
             self.after(120, lambda: self.attributes('-topmost', False))
 
         def launch_threads():
-            if status_message != "🔄 Wysyłanie do 4 API równocześnie...":
-                self.update_status("🔄 Wysyłanie do 4 API równocześnie...")
-            self._start_api_threads(text)
+            if status_message != sending_message:
+                self.update_status(sending_message)
+            self._start_api_session(text)
 
         self.after(1, launch_threads)
     
-    def _process_single_api(self, idx, api_name, api_func, text, session_id):
-        """Przetwarza tekst w pojedynczym API (w wątku)."""
-        try:
-            start_time = time.time()
-            logging.info(f"🔍 DEBUG: _process_single_api started for {api_name} (idx={idx})")
-            
-            cancel_event = self.api_cancel_events.get(idx)
+    def _update_api_result(self, idx, result, is_error, elapsed_time=0, session_id=0, outcome=STATE_FAILED):
+        """Aktualizuje wynik dla danego API z opóźnieniem dla płynności.
 
-            # Sprawdzaj co 0.5s czy anulowano
-            def check_cancelled():
-                if self.cancel_flags.get(idx, False):
-                    return True
-                return bool(cancel_event and cancel_event.is_set())
-            
-            # Symuluj możliwość anulowania
-            # W prawdziwej implementacji musisz sprawdzać cancel_flag w api_func
-            result = None
-            error = None
-            
-            # Uruchom API w osobnym wątku aby móc anulować
-            api_thread_result = [None, None]  # [result, error]
-            
-            def run_api():
-                try:
-                    # Get prompts
-                    instruction_prompt = get_instruction_prompt("normal")
-                    system_prompt = get_system_prompt("normal")
-                    
-                    logging.info(f"🔍 DEBUG: Calling {api_name} API function with model: {self.models.get(api_name, '')}")
-                    logging.debug("Calling %s via %s", api_name, api_func)
-                    logging.debug("api_func type: %s", type(api_func))
-                    logging.debug(
-                        "api_func.__name__: %s",
-                        getattr(api_func, '__name__', 'NO_NAME'),
-                    )
-                    
-                    # Call API with correct arguments: (api_key, model, text, instruction_prompt, system_prompt[, on_chunk])
-                    logging.debug(
-                        "Invoking %s with key=%s chars, model=%s, text_len=%s",
-                        api_name,
-                        len(self.api_keys[api_name]),
-                        self.models.get(api_name, ''),
-                        len(text),
-                    )
-                    
-                    # DIRECT INSPECTION of the function being called
-                    if api_name == "OpenAI":
-                        logging.debug("OpenAI function memory address: %s", hex(id(api_func)))
-                        logging.debug(
-                            "OpenAI function source: %s",
-                            getattr(api_func, '__code__', {}).co_filename
-                            if hasattr(api_func, '__code__')
-                            else 'NO_CODE',
-                        )
-                        logging.debug(
-                            "OpenAI function first line: %s",
-                            getattr(api_func, '__code__', {}).co_firstlineno
-                            if hasattr(api_func, '__code__')
-                            else 'NO_LINE',
-                        )
-                    
-                    # Jeżeli klient wspiera streaming (on_chunk), przekaż callback
-                    callback = (lambda ch, i=idx, s=session_id: self._append_partial(i, ch, s))
-                    try:
-                        if api_name == "Gemini":
-                            api_thread_result[0] = api_func(
-                                self.api_keys[api_name],
-                                self.models.get(api_name, ""),
-                                text,
-                                instruction_prompt,
-                                system_prompt,
-                                on_chunk=callback,
-                                cancel_event=cancel_event,
-                            )
-                        else:
-                            api_thread_result[0] = api_func(
-                                self.api_keys[api_name],
-                                self.models.get(api_name, ""),
-                                text,
-                                instruction_prompt,
-                                system_prompt,
-                                on_chunk=callback
-                            )
-                    except TypeError:
-                        # Starsza sygnatura bez on_chunk
-                        api_thread_result[0] = api_func(
-                            self.api_keys[api_name],
-                            self.models.get(api_name, ""),
-                            text,
-                            instruction_prompt,
-                            system_prompt
-                        )
-
-                    logging.info(f"🚨 CALL AFTER: {api_name} zwrócił: {type(api_thread_result[0])} - {str(api_thread_result[0])[:100]}...")
-                    logging.info(f"🔍 DEBUG: {api_name} API call completed successfully")
-                except Exception as e:
-                    logging.error(f"🔍 DEBUG: {api_name} API call failed: {e}")
-                    api_thread_result[1] = e
-
-            api_thread = threading.Thread(target=run_api)
-            api_thread.start()
-            
-            # Animuj progress bar i czekaj na wynik lub anulowanie
-            
-            while api_thread.is_alive():
-                if check_cancelled():
-                    logging.info(f"API {api_name} anulowane")
-                    if cancel_event:
-                        cancel_event.set()
-                    def update_cancel_gui(i=idx, s=session_id):
-                        self._update_api_result(i, "❌ Anulowano", True, 0, s)
-                    self.after(0, update_cancel_gui)
-                    return
-                
-                # Animuj progress bar 0->100% w ciągu 1s, potem resetuj
-                for step in range(20):  # 20 kroków x 50ms = 1s
-                    if not api_thread.is_alive():
-                        break
-                    progress = (step + 1) / 20.0  # 0.05, 0.10, ... 1.0
-                    self.after(0, lambda i=idx, v=progress: 
-                        self.api_progress_bars[i].set(v) if i < len(self.api_progress_bars) else None
-                    )
-                    time.sleep(0.05)  # 50ms między krokami
-                
-                # Reset progress bar na początek po 1s
-                if api_thread.is_alive():
-                    self.after(0, lambda i=idx: 
-                        self.api_progress_bars[i].set(0) if i < len(self.api_progress_bars) else None
-                    )
-            
-            # Sprawdź wynik
-            if api_thread_result[1]:
-                raise api_thread_result[1]
-
-            result = api_thread_result[0]
-            elapsed = time.time() - start_time
-
-            # Sprawdź czy to nadal aktualna sesja
-            if session_id != self.current_session_id:
-                logging.info(f"Ignoruję wynik z nieaktualnej sesji {session_id}")
-                return
-
-            if check_cancelled():
-                logging.info(f"API {api_name} zakończone po anulowaniu")
-                return
-            
-            # Aktualizuj GUI w głównym wątku
-            def update_gui(i=idx, r=result, e=elapsed, s=session_id):
-                self._update_api_result(i, r, False, e, s)
-            self.after(0, update_gui)
-            
-        except Exception as e:
-            if session_id == self.current_session_id and not check_cancelled():
-                error_msg = f"❌ Błąd: {str(e)}"
-                logging.error(f"API {api_name} error: {e}")
-                def update_error_gui(i=idx, msg=error_msg, s=session_id):
-                    self._update_api_result(i, msg, True, 0, s)
-                self.after(0, update_error_gui)
-    
-    def _update_api_result(self, idx, result, is_error, elapsed_time=0, session_id=0):
-        """Aktualizuje wynik dla danego API z opóźnieniem dla płynności."""
-        # Anti-dup: ignoruj powtórne aktualizacje tego samego API w tej samej sesji
-        guard_key = (session_id or self.current_session_id, idx)
-        if self.result_update_guard.get(guard_key):
-            return
-        self.result_update_guard[guard_key] = True
+        ``outcome`` rozróżnia błędy (failed / cancelled / skipped) w stanie sesji.
+        """
+        session = self.session
         # Sprawdź czy to aktualna sesja
-        if session_id != 0 and session_id != self.current_session_id:
+        if session is None or (session_id != 0 and session_id != session.session_id):
             logging.info(f"Ignoruję nieaktualny wynik z sesji {session_id}")
             return
+        if session.is_terminal(idx):
+            return  # Duplikat albo spóźnione zdarzenie (np. "cancelled" po "Anuluj wszystko")
+        if is_error:
+            # Błąd zastępuje treść panelu - niewyrenderowane fragmenty są zbędne
+            self.stream_renderer.discard(idx)
+        else:
+            # Dorenderuj ogon strumienia (jeszcze w stanie streaming), żeby panel
+            # można było porównać z wynikiem
+            self.stream_renderer.flush_panel(idx)
+        if not is_error:
+            session.complete(idx, result, elapsed_time)
+        elif outcome == STATE_CANCELLED:
+            session.cancel(idx)
+        elif outcome == STATE_SKIPPED:
+            session.skip(idx, result)
+        else:
+            session.fail(idx, result)
+        highlighter = self._diff_highlighters.pop(idx, None)
+        result_session = session.session_id
         
         # Funkcja do aktualizacji panelu
         def update_panel():
@@ -1641,17 +1707,33 @@ class MultiAPICorrector(ctk.CTk):
             self.api_progress_bars[idx].set(1.0 if not is_error else 0)
             
             # Update text
-            self.api_text_widgets[idx].configure(state="normal")
-            self.api_text_widgets[idx].delete("1.0", "end")
-            self.api_text_widgets[idx].insert("1.0", result)
-            if is_error:
-                self.api_text_widgets[idx].tag_remove("diff_highlight", "1.0", "end")
+            widget = self.api_text_widgets[idx]
+            widget.configure(state="normal")
+            streamed = (
+                not is_error
+                and session.has_streamed(idx)
+                and widget.get("1.0", "end-1c").strip() == result.strip()
+            )
+            if streamed:
+                # Panel ma już pełny tekst ze strumienia - bez ponownego wstawiania;
+                # domknij tagi przyrostowe, pełny diff po wyrenderowaniu klatki
+                if highlighter is not None:
+                    self._apply_diff_spans(widget, highlighter.finish())
+                    self.after(DIFF_RECONCILE_DELAY_MS, self._reconcile_diff, idx, result_session, result)
+            elif not is_error and is_large_text(result):
+                self._insert_large_result(idx, result_session, result)
             else:
-                try:
-                    self._highlight_diff(idx, self.original_text or "", result)
-                except Exception:
-                    logging.debug("Highlight diff failed", exc_info=True)
-            self.api_text_widgets[idx].configure(state="disabled")
+                self._cancel_panel_render(idx)
+                widget.delete("1.0", "end")
+                widget.insert("1.0", result)
+                if is_error:
+                    widget.tag_remove("diff_highlight", "1.0", "end")
+                else:
+                    try:
+                        self._highlight_diff(idx, self.original_text or "", result)
+                    except Exception:
+                        logging.debug("Highlight diff failed", exc_info=True)
+            widget.configure(state="disabled")
             
             # Disable cancel button
             self.api_cancel_buttons[idx].configure(state="disabled")
@@ -1666,7 +1748,6 @@ class MultiAPICorrector(ctk.CTk):
         api_name = self.api_names[idx]
         
         if not is_error:
-            self.api_results[idx] = result
             self.api_buttons[idx].configure(state="normal")
             self.api_action_buttons[idx].configure(state="normal")
             
@@ -1675,47 +1756,155 @@ class MultiAPICorrector(ctk.CTk):
                 self.api_labels[idx].configure(text=f"✅ {api_name} ({elapsed_time:.1f}s)")
             else:
                 self.api_labels[idx].configure(text=f"✅ {api_name}")
+
+            if self.processing and session.race and not is_error_result(result):
+                self._finish_race(idx, elapsed_time)
+            elif self.processing and self.preselected_result_idx is None and self._is_quorum_enabled():
+                self._check_quorum()
         else:
             self.api_labels[idx].configure(text=f"❌ {api_name}")
         
         # Update API counter
-        finished_count = len(self.api_results) + sum(
-            1 for w in self.api_text_widgets 
-            if "❌" in w.get("1.0", "end-1c")
-        )
-        self.api_counter_label.configure(text=f"🤖 API: {finished_count}/4")
+        self.api_counter_label.configure(text=f"🤖 API: {session.finished_count}/{len(self.api_names)}")
         
         # Check if all APIs finished
-        if finished_count >= 4:
+        if session.all_finished:
             self.processing = False
             self.cancel_all_button.configure(state="disabled")
-            # Reset guard po ukończeniu sesji
-            self.result_update_guard.clear()
+            logging.info(f"📊 Koniec: {session.describe()}")
+            logging.info(f"🖼️ Render strumieni: {self.stream_renderer.stats_summary()}")
+            logging.debug(f"🧵 Wątki w tle: {get_executor().stats_summary()}")
             
             # Hide all progress bars
             for pb in self.api_progress_bars:
                 pb.set(1.0)  # Ustaw na 100% przed ukryciem
                 pb.pack_forget()
             
-            if len(self.api_results) > 0:
-                self.update_status(f"✅ Gotowe! Otrzymano {len(self.api_results)} wyników")
+            if self.preselected_result_idx is not None:
+                pass  # Zostaje status kworum
+            elif session.success_count > 0:
+                self.update_status(f"✅ Gotowe! Otrzymano {session.success_count} wyników")
                 self.progress_label.configure(text="Wybierz najlepszy wynik i kliknij 'Użyj'")
             else:
                 self.update_status("❌ Nie otrzymano żadnych wyników")
                 self.progress_label.configure(text="Sprawdź klucze API w ustawieniach")
     
+    def _is_quorum_enabled(self) -> bool:
+        value = str(self.settings.get("QuorumMode", "0")).strip().lower()
+        return value in {"1", "true", "yes", "on"}
+
+    def _quorum_params(self):
+        """(ilu providerów musi się zgodzić, próg odległości) z ustawień."""
+        try:
+            size = max(2, int(self.settings.get("QuorumSize", DEFAULT_QUORUM_SIZE)))
+        except (TypeError, ValueError):
+            size = DEFAULT_QUORUM_SIZE
+        try:
+            threshold = min(1.0, max(0.0, float(self.settings.get("QuorumThreshold", DEFAULT_QUORUM_THRESHOLD))))
+        except (TypeError, ValueError):
+            threshold = DEFAULT_QUORUM_THRESHOLD
+        return size, threshold
+
+    def _check_quorum(self):
+        """Kończy sesję wcześniej, gdy dość providerów zwróciło zgodny wynik."""
+        size, threshold = self._quorum_params()
+        quorum = find_quorum(self.api_results, size, threshold)
+        if quorum is None:
+            return
+        chosen, group = quorum
+        names = ", ".join(self.api_names[i] for i in group)
+        logging.info(
+            f"🤝 Kworum ({len(group)}/{size}, próg {threshold:.2f}): {names} - "
+            f"wybrano {self.api_names[chosen]}, anuluję pozostałe API"
+        )
+        self._preselect_result(chosen)
+
+        handle = self.api_session
+        if handle is not None:
+            for idx in range(len(self.api_names)):
+                if handle.is_active(idx):
+                    self.session.request_cancel(idx)
+                    handle.cancel(idx)
+
+        self.processing = False
+        self.cancel_all_button.configure(state="disabled")
+        self.update_status(f"🤝 Zgodne: {names} - Enter wkleja wynik {self.api_names[chosen]}")
+
+    def _is_race_mode_enabled(self) -> bool:
+        value = str(self.settings.get("RaceMode", "0")).strip().lower()
+        return value in {"1", "true", "yes", "on"}
+
+    def _finish_race(self, winner, elapsed_time):
+        """Kończy wyścig: anuluje pozostałe zapytania, zapisuje statystyki i wkleja wynik."""
+        self.session.race = False
+        handle = self.api_session
+        participants = [self.api_names[winner]]
+        margin = None
+        unknown_margin = False
+        if handle is not None:
+            for idx in range(len(self.api_names)):
+                if idx == winner:
+                    continue
+                progress = handle.progress(idx)
+                if progress is not None:
+                    participants.append(self.api_names[idx])
+                if not handle.is_active(idx):
+                    continue
+                # Przewaga = ile najszybszy z przegranych potrzebowałby jeszcze do końca
+                remaining = progress.estimated_remaining() if progress is not None else None
+                if remaining is None:
+                    unknown_margin = True
+                elif margin is None or remaining < margin:
+                    margin = remaining
+                self.session.request_cancel(idx)
+                handle.cancel(idx)
+        if unknown_margin:
+            # Ktoś jeszcze nie streamował - znamy tylko dolną granicę przewagi
+            margin = None
+
+        api_name = self.api_names[winner]
+        race_stats = get_race_stats()
+        race_stats.record_race(api_name, elapsed_time, participants, margin)
+        margin_text = f"{margin * 1000:.0f} ms" if margin is not None else "nieznana"
+        logging.info(
+            f"🏁 Wyścig wygrał {api_name} ({elapsed_time:.2f}s, przewaga {margin_text}); "
+            f"bilans: {race_stats.summary()}"
+        )
+
+        self.processing = False
+        self.cancel_all_button.configure(state="disabled")
+        self._preselect_result(winner)
+        self.use_api_result(winner)
+        self.update_status(f"🏁 Wygrał {api_name} ({elapsed_time:.1f}s) - wynik wklejony")
+
+    def _preselect_result(self, idx):
+        """Wyróżnia wynik, który wklei Enter."""
+        self._clear_preselected_result()
+        self.preselected_result_idx = idx
+        self.api_buttons[idx].configure(text=f"⭐ Użyj {self.api_names[idx]} (Enter)")
+
+    def _clear_preselected_result(self):
+        idx = self.preselected_result_idx
+        self.preselected_result_idx = None
+        if idx is not None and idx < len(self.api_buttons):
+            self.api_buttons[idx].configure(text=f"📋 Użyj {self.api_names[idx]}")
+
+    def _use_preselected_result(self, event=None):
+        if self.preselected_result_idx in self.api_results:
+            self.use_api_result(self.preselected_result_idx)
+
     def cancel_single_api(self, idx):
         """Anuluje pojedyncze API."""
-        if idx in self.api_threads and self.api_threads[idx].is_alive():
-            self.cancel_flags[idx] = True
+        if self.api_session is not None and self.api_session.is_active(idx):
+            self.session.request_cancel(idx)
             logging.info(f"Anulowanie API {idx}")
-            event = self.api_cancel_events.get(idx)
-            if event:
-                event.set()
+            self.api_session.cancel(idx)
 
         # Anuluj też custom akcje jeśli są aktywne
-        if idx in self.api_action_threads and self.api_action_threads[idx].is_alive():
+        action_session = self.api_action_sessions.get(idx)
+        if action_session is not None and action_session.is_active():
             self.api_action_cancel_flags[idx] = True
+            action_session.cancel()
             logging.info(f"Anulowanie custom akcji dla API {idx}")
 
             # Zaktualizuj GUI dla anulowanej custom akcji
@@ -1726,18 +1915,17 @@ class MultiAPICorrector(ctk.CTk):
         """Anuluje wszystkie przetwarzania."""
         logging.info("Anulowanie wszystkich API...")
         
-        # Ustaw flagi anulowania
-        for idx in range(4):
-            self.cancel_flags[idx] = True
-            event = self.api_cancel_events.get(idx)
-            if event:
-                event.set()
-        
-        # Czekaj chwilę na zakończenie
-        time.sleep(0.1)
+        self._cancel_panel_render()
+        # Zakończ sesję od razu - spóźnione zdarzenia "cancelled" nie zmienią już stanu
+        if self.session is not None:
+            self.session.cancel_all()
+        if self.api_session is not None:
+            self.api_session.cancel()
+        self.stream_renderer.discard()
+        # Anulowanie jest nieblokujące - strumienie HTTP zamyka pętla silnika
         
         # Reset UI
-        for i in range(4):
+        for i in range(len(self.api_names)):
             # Stop animations
             if hasattr(self.api_loaders[i], 'stop'):
                 self.api_loaders[i].stop()
@@ -1772,7 +1960,7 @@ class MultiAPICorrector(ctk.CTk):
         self.cancel_all_button.configure(state="disabled")
         self.update_status("❌ Anulowano przetwarzanie")
         self.progress_label.configure(text="")
-        self.api_counter_label.configure(text="🤖 API: 0/4")
+        self.api_counter_label.configure(text=f"🤖 API: 0/{len(self.api_names)}")
 
     def show_action_menu(self, api_index):
         """Pokazuje menu dropdown z opcjami akcji"""
@@ -1851,18 +2039,21 @@ class MultiAPICorrector(ctk.CTk):
         try:
             api_name = self.api_names[api_index]
 
-            # Anuluj poprzedni wątek akcji jeśli istnieje
-            if api_index in self.api_action_threads:
+            # Anuluj poprzednią akcję jeśli istnieje
+            previous_session = self.api_action_sessions.get(api_index)
+            if previous_session is not None:
                 self.api_action_cancel_flags[api_index] = True
-                if self.api_action_threads[api_index].is_alive():
+                if previous_session.is_active():
                     self.log_message(f"Anulowanie poprzedniej akcji dla {api_name}")
+                    previous_session.cancel()
 
             # Ustaw flagę anulowania na False dla nowej akcji
             self.api_action_cancel_flags[api_index] = False
 
             # Wyczyść poprzedni wynik
-            if api_index in self.api_results:
-                del self.api_results[api_index]
+            if self.session is not None:
+                self.session.clear_result(api_index)
+            self._cancel_panel_render(api_index)
 
             # Wyłącz przyciski dla tego panelu
             self.api_buttons[api_index].configure(state="disabled")
@@ -1882,76 +2073,54 @@ class MultiAPICorrector(ctk.CTk):
 
             self.log_message(f"Rozpoczęto {action_name} dla {api_name}")
 
-            # Uruchom żądanie API w osobnym wątku
-            def run_api_request():
-                try:
-                    self.log_message(f"🔍 DEBUG: Rozpoczynam custom API request dla {api_name}, action: {action_type}")
-
-                    # Sprawdź flagę anulowania na początku
-                    if self.api_action_cancel_flags.get(api_index, False):
-                        self.log_message(f"Anulowano akcję dla {api_name} przed rozpoczęciem")
-                        return
-
-                    # Pobierz prompty na podstawie typu akcji
-                    instruction_prompt = get_instruction_prompt(action_type)
-                    system_prompt = get_system_prompt(action_type)
-
-                    self.log_message(f"🔍 DEBUG: Prompty pobrane - instruction: {instruction_prompt[:50]}..., system: {system_prompt[:50]}...")
-
-                    # Sprawdź flagę anulowania ponownie
-                    if self.api_action_cancel_flags.get(api_index, False):
-                        self.log_message(f"Anulowano akcję dla {api_name} po pobraniu promptów")
-                        return
-
-                    # Mapowanie API do funkcji (tak jak w oryginalnym kodzie)
-                    api_functions = {
-                        "OpenAI": openai_client.correct_text_openai,
-                        "Anthropic": anthropic_client.correct_text_anthropic,
-                        "Gemini": gemini_client.correct_text_gemini,
-                        "DeepSeek": deepseek_client.correct_text_deepseek
-                    }
-
-                    api_func = api_functions.get(api_name)
-                    if not api_func:
-                        raise ValueError(f"Nieznany dostawca API: {api_name}")
-
-                    api_key = self.api_keys.get(api_name, "")
-                    model = self.models.get(api_name, "")
-
-                    self.log_message(f"🔍 DEBUG: Wywołuję {api_name} API - key: {'***' if api_key else 'BRAK'}, model: {model}")
-
-                    # Wywołaj API function z parametrami jak w oryginalnym kodzie
-                    result = api_func(
-                        api_key,
-                        model,
-                        text,
-                        instruction_prompt,
-                        system_prompt
-                    )
+            spec = self.providers[api_index]
+            api_key = self.api_keys.get(api_name, "")
+            model = self.models.get(api_name, "")
+
+            self.log_message(f"🔍 DEBUG: Wywołuję {api_name} API - key: {'***' if api_key else 'BRAK'}, model: {model}, action: {action_type}")
+
+            instruction_prompt = get_instruction_prompt(action_type)
+            system_prompt = get_system_prompt(action_type)
+            request = ProviderRequest(
+                index=api_index,
+                name=api_name,
+                func=spec.correct,
+                api_key=api_key,
+                model=model,
+                text=text,
+                instruction_prompt=instruction_prompt,
+                system_prompt=system_prompt,
+                stream=False,
+                cache_key=self._response_cache_key(api_name, model, text, instruction_prompt, system_prompt),
+                options=self._provider_options(spec),
+            )
 
+            def handle_action_event(event):
+                # Wątek UI - ignoruj zdarzenia z zastąpionych akcji
+                if self.api_action_sessions.get(api_index) is not action_session:
+                    return
+                if event.kind == "result":
+                    result = event.data
                     self.log_message(f"🔍 DEBUG: {api_name} API zwróciło: {type(result)} - {str(result)[:100] if result else 'None'}...")
-
-                    # Sprawdź flagę anulowania po otrzymaniu wyniku
                     if self.api_action_cancel_flags.get(api_index, False):
                         self.log_message(f"Anulowano akcję dla {api_name} po otrzymaniu wyniku")
                         return
-
-                    # Zaktualizuj GUI w głównym wątku
-                    if result:
-                        self.after(0, lambda: self.handle_single_api_result(api_index, result, action_name))
+                    if result and not is_error_result(result):
+                        self.handle_single_api_result(api_index, result, action_name)
                     else:
-                        self.after(0, lambda: self.handle_single_api_error(api_index, f"Brak odpowiedzi z {api_name}", action_name))
-
-                except Exception as e:
-                    self.log_message(f"🔍 DEBUG: Błąd w {api_name} API: {e}")
-                    # Sprawdź czy to nie było anulowanie
+                        # Komunikat błędu nie może trafić do sesji jako wynik panelu
+                        self.handle_single_api_error(api_index, result or f"Brak odpowiedzi z {api_name}", action_name)
+                elif event.kind == "error":
+                    self.log_message(f"🔍 DEBUG: Błąd w {api_name} API: {event.data}")
                     if not self.api_action_cancel_flags.get(api_index, False):
-                        self.after(0, lambda: self.handle_single_api_error(api_index, str(e), action_name))
+                        self.handle_single_api_error(api_index, event.data, action_name)
+
+            def on_action_event(event):
+                # Zdarzenia przychodzą z wątku silnika - przekaż do wątku UI
+                self.after(0, lambda e=event: handle_action_event(e))
 
-            # Uruchom w osobnym wątku
-            thread = threading.Thread(target=run_api_request, daemon=True)
-            self.api_action_threads[api_index] = thread
-            thread.start()
+            action_session = get_engine().submit(self.current_session_id, [request], on_action_event)
+            self.api_action_sessions[api_index] = action_session
 
         except Exception as e:
             self.log_message(f"Błąd podczas ponownego przetwarzania: {e}")
@@ -1961,7 +2130,7 @@ class MultiAPICorrector(ctk.CTk):
         """Obsługuje wynik z ponownego przetworzenia dla pojedynczego panelu"""
         try:
             # Zapisz wynik
-            self.api_results[api_index] = result
+            self.session.replace_result(api_index, result)
 
             # Ukryj loader
             if hasattr(self.api_loaders[api_index], 'stop'):
@@ -1969,10 +2138,16 @@ class MultiAPICorrector(ctk.CTk):
             self.api_text_widgets[api_index].lift()
 
             # Aktualizuj text widget
-            self.api_text_widgets[api_index].configure(state="normal")
-            self.api_text_widgets[api_index].delete("1.0", "end")
-            self.api_text_widgets[api_index].insert("1.0", result)
-            self.api_text_widgets[api_index].configure(state="disabled")
+            self._cancel_panel_render(api_index)
+            if is_large_text(result):
+                inserter = ChunkedTextInserter(self.api_text_widgets[api_index], result)
+                self._panel_renders[api_index] = [inserter]
+                inserter.start()
+            else:
+                self.api_text_widgets[api_index].configure(state="normal")
+                self.api_text_widgets[api_index].delete("1.0", "end")
+                self.api_text_widgets[api_index].insert("1.0", result)
+                self.api_text_widgets[api_index].configure(state="disabled")
 
             # Włącz przyciski
             self.api_buttons[api_index].configure(state="normal")
@@ -2031,16 +2206,16 @@ class MultiAPICorrector(ctk.CTk):
         
         # Poczekaj chwilę i symuluj Ctrl+V
         def paste_text():
+            import keyboard
+
             time.sleep(0.3)
             keyboard.send('ctrl+v')
             # odblokuj po krótkim czasie, aby uniknąć podwójnych wklejeń
             time.sleep(0.2)
             self.paste_in_progress = False
         
-        # Uruchom w osobnym wątku
-        paste_thread = threading.Thread(target=paste_text)
-        paste_thread.daemon = True
-        paste_thread.start()
+        # Uruchom w puli wątków w tle
+        get_executor().submit(paste_text)
         
         # Update status
         api_name = self.api_names[idx]
@@ -2130,6 +2305,10 @@ class SettingsWindow(ctk.CTkToplevel):
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
+        # Pobieranie list modeli w tle - anulowane razem z zamknięciem okna
+        self._model_tasks = get_executor().task_group("settings-models")
+        self.providers = parent.providers
+        self.providers_by_name = {spec.name: spec for spec in self.providers}
         self.api_names = parent.api_names
         
         # Ustaw ikonę okna Settings
@@ -2300,14 +2479,8 @@ class SettingsWindow(ctk.CTkToplevel):
         self.refresh_buttons = {}
         self.highlight_var = ctk.BooleanVar(value=False)
 
-        apis = [
-            ("OpenAI", "OpenAI API Key", "sk-...", "#10a37f"),
-            ("Anthropic", "Anthropic API Key", "sk-ant-...", "#d97706"),
-            ("Gemini", "Gemini API Key", "AIza...", "#4285f4"),
-            ("DeepSeek", "DeepSeek API Key", "sk-...", "#7c3aed")
-        ]
-        
-        for api_key, label, placeholder, color in apis:
+        for spec in self.providers:
+            api_key, label, placeholder, color = spec.name, f"{spec.name} API Key", spec.key_placeholder, spec.color
             frame = ctk.CTkFrame(self.main_frame, fg_color=color, corner_radius=10)
             frame.pack(fill="x", pady=10)
             
@@ -2525,7 +2698,7 @@ class SettingsWindow(ctk.CTkToplevel):
         
         # Load model settings
         for api_key, model_combo in self.model_combos.items():
-            current_model = self.parent.models.get(api_key, get_default_model(api_key))
+            current_model = self.parent.models.get(api_key) or self._default_model(api_key)
             if current_model:
                 # Try to set in combo, otherwise use input
                 try:
@@ -2558,74 +2731,55 @@ class SettingsWindow(ctk.CTkToplevel):
     def load_all_models_async(self):
         """Ładuje modele dla wszystkich API asynchronicznie."""
         async def load_models():
-            for provider in self.api_names:
+            for spec in self.providers:
+                provider = spec.name
                 api_key = self.entries[provider].get().strip()
-                if api_key:
+                if spec.is_configured(api_key):
                     await self.refresh_models_async(provider, api_key)
                 else:
                     # Load fallback models
-                    from utils.model_fetcher import FALLBACK_MODELS
-                    models = FALLBACK_MODELS.get(provider, [])
-                    self.after(0, lambda p=provider, m=models: self.update_model_combo(p, m))
-        
-        # Run in thread to avoid blocking UI
-        def run_async():
-            loop = None
-            try:
-                # Create new event loop for this thread
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(load_models())
-            except Exception as e:
-                logging.error(f"Error loading models: {e}")
-            finally:
-                # Clean up event loop properly
-                if loop and not loop.is_closed():
-                    try:
-                        # Cancel pending tasks
-                        pending = asyncio.all_tasks(loop)
-                        for task in pending:
-                            task.cancel()
-                        # Wait for cancelled tasks if any
-                        if pending:
-                            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                        loop.close()
-                    except Exception as e:
-                        logging.debug(f"Error cleaning up event loop: {e}")
-                # Clear the event loop from thread
-                try:
-                    asyncio.set_event_loop(None)
-                except Exception:
-                    pass
-        
-        threading.Thread(target=run_async, daemon=True).start()
-    
+                    models = list(spec.fallback_models)
+                    self._after_if_open(lambda p=provider, m=models: self.update_model_combo(p, m))
+
+        def on_error(e):
+            logging.error(f"Error loading models: {e}")
+
+        self._run_models_task(load_models, on_error)
+
     def refresh_models(self, provider):
         """Odświeża modele dla konkretnego providera."""
         api_key = self.entries[provider].get().strip()
-        if not api_key:
+        if not self.providers_by_name[provider].is_configured(api_key):
             messagebox.showwarning("Brak API Key", f"Wpisz {provider} API key przed odświeżaniem modeli", parent=self)
             return
         
         # Disable button during refresh
         self.refresh_buttons[provider].configure(text="⏳", state="disabled")
         
-        # Run async
-        def run_refresh():
-            async def refresh():
-                await self.refresh_models_async(provider, api_key)
-                # Re-enable button
-                self.after(0, lambda: self.refresh_buttons[provider].configure(text="🔄", state="normal"))
-            
+        async def refresh():
+            await self.refresh_models_async(provider, api_key)
+            # Re-enable button
+            self._after_if_open(lambda: self.refresh_buttons[provider].configure(text="🔄", state="normal"))
+
+        def on_error(e):
+            logging.error(f"Error refreshing models for {provider}: {e}")
+            self._after_if_open(lambda: self.refresh_buttons[provider].configure(text="❌", state="normal"))
+
+        self._run_models_task(refresh, on_error)
+
+    def _run_models_task(self, coro_factory, on_error):
+        """Wykonuje korutynę pobierania modeli w puli wątków (grupa zadań tego okna)."""
+        def run_async():
+            if self._model_tasks.cancelled:
+                return  # Okno zamknięte, zanim zadanie wyszło z kolejki
             loop = None
             try:
                 # Create new event loop for this thread
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
-                loop.run_until_complete(refresh())
+                loop.run_until_complete(coro_factory())
             except Exception as e:
-                logging.error(f"Error refreshing models for {provider}: {e}")
-                self.after(0, lambda: self.refresh_buttons[provider].configure(text="❌", state="normal"))
+                on_error(e)
             finally:
                 # Clean up event loop properly
                 if loop and not loop.is_closed():
@@ -2645,24 +2799,38 @@ class SettingsWindow(ctk.CTkToplevel):
                     asyncio.set_event_loop(None)
                 except Exception:
                     pass
-        
-        threading.Thread(target=run_refresh, daemon=True).start()
+
+        self._model_tasks.submit(run_async)
+
+    def _after_if_open(self, callback):
+        """Planuje aktualizację UI, o ile okno ustawień nie zostało zamknięte."""
+        if not self._model_tasks.cancelled:
+            self.after(0, callback)
+
+    def destroy(self):
+        # Zadania pobierania modeli tego okna nie mają już czego aktualizować
+        self._model_tasks.cancel()
+        super().destroy()
     
     async def refresh_models_async(self, provider, api_key):
         """Asynchronicznie pobiera modele dla providera."""
+        spec = self.providers_by_name[provider]
         try:
-            models = await fetch_models_for_provider(provider, api_key)
-            self.after(0, lambda: self.update_model_combo(provider, models))
+            models = await spec.list_models(api_key)
+            self._after_if_open(lambda: self.update_model_combo(provider, models))
         except Exception as e:
             logging.error(f"Failed to fetch models for {provider}: {e}")
-            from utils.model_fetcher import FALLBACK_MODELS
-            models = FALLBACK_MODELS.get(provider, [])
-            self.after(0, lambda: self.update_model_combo(provider, models))
+            models = list(spec.fallback_models)
+            self._after_if_open(lambda: self.update_model_combo(provider, models))
+
+    def _default_model(self, provider):
+        spec = self.providers_by_name.get(provider)
+        return spec.default_model if spec is not None else get_default_model(provider)
     
     def update_model_combo(self, provider, models):
         """Aktualizuje ComboBox z modelami."""
         if not models:
-            models = [get_default_model(provider)]
+            models = [self._default_model(provider)]
         
         # Update combo values
         combo = self.model_combos[provider]
@@ -2672,7 +2840,7 @@ class SettingsWindow(ctk.CTkToplevel):
         current = combo.get()
         if current == "Ładowanie modeli..." or current not in models:
             # Try to keep current model from parent
-            parent_model = self.parent.models.get(provider, get_default_model(provider))
+            parent_model = self.parent.models.get(provider) or self._default_model(provider)
             if parent_model in models:
                 combo.set(parent_model)
             else:
@@ -2685,7 +2853,11 @@ class SettingsWindow(ctk.CTkToplevel):
         try:
             # Update API keys
             for api_key, entry in self.entries.items():
+                old_key = self.parent.api_keys.get(api_key, "")
                 self.parent.api_keys[api_key] = entry.get().strip()
+                on_key_changed = self.providers_by_name[api_key].on_key_changed
+                if on_key_changed is not None and old_key and old_key != self.parent.api_keys[api_key]:
+                    on_key_changed(old_key)
             
             # Update models - prefer combo selection over manual input
             for api_key, combo in self.model_combos.items():
@@ -2699,7 +2871,7 @@ class SettingsWindow(ctk.CTkToplevel):
                     self.parent.models[api_key] = selected_model
                 else:
                     # Fallback to default
-                    self.parent.models[api_key] = get_default_model(api_key)
+                    self.parent.models[api_key] = self._default_model(api_key)
             
             ai_settings = {
                 "ReasoningEffort": (self.reasoning_combo.get() or "high").strip().lower(),
@@ -2738,6 +2910,8 @@ def create_tray_icon(app):
     global tray_icon
     
     try:
+        import pystray
+
         # Load icon with better error handling
         icon_path = os.path.join(get_assets_dir_path(), "icon.ico")
         logging.info(f"Próba załadowania ikony tray z: {icon_path}")
@@ -2796,10 +2970,16 @@ def create_tray_icon(app):
             menu=menu
         )
         
+        def on_tray_ready(icon):
+            # Własny setup zastępuje domyślny, który tylko pokazuje ikonę
+            icon.visible = True
+            get_startup_profiler().mark("tray_ready")
+
         # Start tray icon
-        tray_icon.run()
+        tray_icon.run(setup=on_tray_ready)
         
     except Exception as e:
+        get_startup_profiler().mark("tray_failed")
         logging.error(f"Błąd tworzenia tray icon: {e}")
 
 def quit_app():
@@ -2808,6 +2988,8 @@ def quit_app():
     
     try:
         cleanup_global_hotkey()
+        shutdown_engine()
+        shutdown_executor()
         
         if tray_icon:
             tray_icon.stop()
@@ -2861,7 +3043,6 @@ def setup_logging():
             os.makedirs(log_dir, exist_ok=True)
         except (OSError, PermissionError):
             # Fallback to temp directory
-            import tempfile
             log_dir = os.path.join(tempfile.gettempdir(), "PoprawiaczTekstu_logs")
             os.makedirs(log_dir, exist_ok=True)
         
@@ -2890,11 +3071,13 @@ def setup_logging():
             logging.info(f"Automatyczne czyszczenie logów - zachowywane 7 najnowszych plików")
         else:
             logging.info("Multi-API Corrector - console logging only")
+        return log_dir
             
     except Exception as e:
         print(f"Logging setup failed: {e}")
         # Minimal console logging as last resort
         logging.basicConfig(level=logging.INFO, format='%(message)s')
+        return None
 
 def setup_global_hotkey(app):
     """Konfiguruje globalny hotkey Ctrl+Shift+C."""
@@ -2903,33 +3086,32 @@ def setup_global_hotkey(app):
     try:
         hotkey_processor = get_hotkey_processor()
 
-        # Konfiguracja opóźnienia przetwarzania schowka (ms w config)
-        delay_setting = None
-        if hasattr(app, 'settings'):
-            delay_setting = app.settings.get('ClipboardProcessingDelayMs')
+        # Limit oczekiwania na skopiowany tekst po Ctrl+C (ms w config)
+        timeout_setting = app.settings.get('ClipboardTimeoutMs') if hasattr(app, 'settings') else None
+        try:
+            hotkey_processor.set_clipboard_timeout(
+                float(timeout_setting) / 1000.0 if timeout_setting not in (None, "") else None
+            )
+        except (TypeError, ValueError):
+            logging.warning("Invalid ClipboardTimeoutMs value '%s' - using default", timeout_setting)
+            hotkey_processor.set_clipboard_timeout(None)
 
-        if isinstance(delay_setting, str):
-            normalized = delay_setting.strip().lower()
-            if normalized in {"off", "disabled", "none"}:
-                hotkey_processor.set_clipboard_delay(None)
-            else:
-                try:
-                    hotkey_processor.set_clipboard_delay(float(delay_setting) / 1000.0)
-                except ValueError:
-                    logging.warning(
-                        "Invalid ClipboardProcessingDelayMs value '%s' - using default",
-                        delay_setting,
-                    )
-                    hotkey_processor.set_clipboard_delay(0.4)
-        elif isinstance(delay_setting, (int, float)):
-            hotkey_processor.set_clipboard_delay(float(delay_setting) / 1000.0)
-        else:
-            hotkey_processor.set_clipboard_delay(0.4)
+        primary_setting = str(app.settings.get('UsePrimarySelection', '1')) if hasattr(app, 'settings') else '1'
+        hotkey_processor.use_primary_selection = primary_setting.strip().lower() in {"1", "true", "yes", "on"}
+
+        race_hotkey = str(app.settings.get('RaceHotkey', '')).strip() if hasattr(app, 'settings') else ''
+        if race_hotkey and hotkey_processor.add_mode_hotkey(race_hotkey, "race"):
+            logging.info(f"Skrót trybu wyścigu: {race_hotkey}")
 
         def hotkey_callback():
-            app.handle_hotkey_event()
+            # Skrót wyścigu wymusza tryb; zwykły skrót - zgodnie z RaceMode
+            race = True if hotkey_processor.last_hotkey_mode == "race" else None
+            app.handle_hotkey_event(race=race)
+
+        hotkey_processor.set_hotkey_detected_callback(app.prewarm_connections)
         
-        success = hotkey_processor.setup_hotkey_with_fallback(hotkey_callback)
+        with get_startup_profiler().phase("hotkey_registration"):
+            success = hotkey_processor.setup_hotkey_with_fallback(hotkey_callback)
         
         if success:
             logging.info("Globalny skrót skonfigurowany pomyślnie")
@@ -2939,53 +3121,65 @@ def setup_global_hotkey(app):
             app.after(0, lambda: app.update_status("⚠️ Hotkey niedostępny - skonfiguruj ręcznie"))
             
     except Exception as e:
+        get_startup_profiler().mark("hotkey_failed")
         logging.error(f"Błąd konfiguracji hotkey: {e}")
 
+def _startup_settled(profiler):
+    """Czy wątki w tle (hotkey, tray) skończyły swoje fazy startu."""
+    hotkey = profiler.has("hotkey_registration") or profiler.has("hotkey_failed")
+    tray = profiler.has("tray_ready") or profiler.has("tray_failed")
+    return hotkey and tray
+
+
+def _on_first_idle(app, log_dir, app_version, benchmark):
+    """Pierwsze idle pętli Tk: czeka na fazy z tła i zapisuje raport startu."""
+    profiler = get_startup_profiler()
+    profiler.mark("first_idle")
+    deadline = time.perf_counter() + STARTUP_SETTLE_MS / 1000
+
+    def finish():
+        if not _startup_settled(profiler) and time.perf_counter() < deadline:
+            app.after(STARTUP_POLL_MS, finish)
+            return
+        report_dir = os.path.join(log_dir or tempfile.gettempdir(), "startup")
+        path = profiler.write_report(report_dir, version=app_version, benchmark=benchmark)
+        logging.info(f"⏱️ Start: {profiler.summary()}")
+        logging.info(f"Raport startu: {path}")
+        if benchmark:
+            print(path or profiler.summary())
+            quit_app()
+
+    finish()
+
+
 def main():
     global main_app
     
-    setup_logging()
-    app_version = get_app_version()
+    profiler = get_startup_profiler()
+    profiler.record("imports", profiler.origin)
+    benchmark = is_benchmark_run()
+    with profiler.phase("logging"):
+        log_dir = setup_logging()
+    with profiler.phase("version"):
+        app_version = get_app_version()
     logging.info("=== PoprawiaczTekstuPy Multi-API Start ===")
     logging.info("🔍 Build version: %s", app_version)
     
-    # Sprawdź sygnaturę funkcji OpenAI
-    import inspect
-    try:
-        sig = inspect.signature(openai_client.correct_text_openai)
-        logging.debug("OpenAI corrector signature: %s", sig)
-        logging.debug("OpenAI module: %s", openai_client.correct_text_openai.__module__)
-        logging.debug("OpenAI source file: %s", inspect.getfile(openai_client.correct_text_openai))
-    except Exception as e:
-        logging.error(f"🚨 SIGNATURE ERROR: {e}")
-    
-    logging.debug(
-        "openai_client.correct_text_openai exists: %s",
-        hasattr(openai_client, 'correct_text_openai'),
-    )
-    if hasattr(openai_client, 'correct_text_openai'):
-        logging.debug(
-            "openai_client.correct_text_openai ref: %s", openai_client.correct_text_openai
-        )
-    else:
-        logging.error(
-            "openai_client attributes (missing correct_text_openai): %s",
-            dir(openai_client),
-        )
-    
     try:
         # Tworzenie aplikacji
-        main_app = MultiAPICorrector()
+        with profiler.phase("app_init"):
+            main_app = MultiAPICorrector()
+        main_app.after_idle(_on_first_idle, main_app, log_dir, app_version, benchmark)
+        
+        # Globalny hotkey - jednorazowa konfiguracja w puli wątków w tle
+        executor = get_executor()
+        executor.submit(setup_global_hotkey, main_app)
         
-        # Globalny hotkey w osobnym wątku
-        hotkey_thread = threading.Thread(target=setup_global_hotkey, args=(main_app,))
-        hotkey_thread.daemon = True
-        hotkey_thread.start()
+        # System tray - pętla ikony działa do końca aplikacji, więc na własnym wątku
+        executor.start_service("tray", create_tray_icon, main_app)
         
-        # System tray w osobnym wątku
-        tray_thread = threading.Thread(target=create_tray_icon, args=(main_app,))
-        tray_thread.daemon = True
-        tray_thread.start()
+        # Klienci API włączonych providerów z kluczem - import SDK w tle, po starcie UI
+        executor.submit(preload_providers, main_app.providers, dict(main_app.api_keys))
         
         # Start aplikacji
         main_app.mainloop()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Testy importują moduły aplikacji tak jak main_corrector (z katalogu głównego)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _shutdown_engine():
+    """Zamyka pętlę silnika (i hooki zamykające klientów) po wszystkich testach."""
+    yield
+    from api_clients.engine import shutdown_engine
+
+    shutdown_engine()
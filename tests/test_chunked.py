@@ -0,0 +1,71 @@
+"""Błędy fragmentów rozpoznawane po typie wyniku, a nie po jego treści."""
+
+import asyncio
+
+from api_clients.base_client import ErrorResult, PartialResult, is_error_result
+from api_clients.chunked import correct_text_chunked
+from utils.text_chunker import TextChunk
+
+CHUNKS = [
+    TextChunk("Pierwszy akapit.", "\n\n"),
+    TextChunk("Błąd w drugim akapicie.", "\n\n"),
+    TextChunk("Trzeci akapit."),
+]
+
+
+def _run(func, on_chunk=None):
+    return asyncio.run(correct_text_chunked(func, "klucz", "model", CHUNKS, "popraw", "system", on_chunk=on_chunk))
+
+
+def test_is_error_result_checks_type_not_text():
+    assert not is_error_result("Błąd ortograficzny został poprawiony.")
+    assert not is_error_result("❌ w tekście użytkownika")
+    assert is_error_result(ErrorResult("Błąd: Brak tekstu do poprawy."))
+    assert is_error_result("")
+    assert is_error_result(None)
+
+
+def test_chunk_starting_with_bad_word_is_joined():
+    async def correct(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+        if on_chunk:
+            on_chunk(text)
+        return f" {text} "
+
+    streamed = []
+    result = _run(correct, streamed.append)
+
+    expected = "Pierwszy akapit.\n\nBłąd w drugim akapicie.\n\nTrzeci akapit."
+    assert result == expected
+    assert not is_error_result(result)
+    assert "".join(streamed) == expected
+
+
+def test_error_result_aborts_with_fragment_number():
+    cancelled = []
+
+    async def correct(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+        if text.startswith("Trzeci"):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(text)
+                raise
+        if text.startswith("Błąd"):
+            return ErrorResult("Błąd: limit zapytań")
+        return text
+
+    result = _run(correct)
+
+    assert isinstance(result, ErrorResult)
+    assert result == "Błąd: limit zapytań (fragment 2/3)"
+    assert cancelled == ["Trzeci akapit."]
+
+
+def test_partial_chunk_marks_whole_result_partial():
+    async def correct(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+        return PartialResult(f"{text[:6]} ") if text.startswith("Błąd") else text
+
+    result = _run(correct)
+
+    assert isinstance(result, PartialResult) and not is_error_result(result)
+    assert result == "Pierwszy akapit.\n\nBłąd w\n\nTrzeci akapit."
@@ -0,0 +1,100 @@
+"""Zmiana klucza API usuwa i zamyka cache'owanych klientów starego klucza."""
+
+import time
+
+import pytest
+
+from api_clients import engine as engine_module
+from api_clients.engine import get_engine
+
+
+async def _build(getter, api_key):
+    return getter(api_key)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def no_grace(monkeypatch):
+    monkeypatch.setattr(engine_module, "STALE_CLIENT_GRACE", 0.0)
+
+
+def _http_closed(monkeypatch, client):
+    return client.is_closed
+
+
+def _aio_closed(monkeypatch, client):
+    # genai.Client nie udostępnia stanu transportu - liczymy wywołania aclose()
+    closed = []
+    aclose = client.aio.aclose
+
+    async def recording_aclose():
+        closed.append(True)
+        await aclose()
+
+    monkeypatch.setattr(client.aio, "aclose", recording_aclose)
+    return lambda: bool(closed)
+
+
+@pytest.mark.parametrize("sdk, module_name, getter_name, cache_name, closed", [
+    ("openai", "api_clients.openai_client", "_get_openai_client", "_OPENAI_CLIENT_CACHE", _http_closed),
+    ("anthropic", "api_clients.anthropic_client", "_get_anthropic_client", "_ANTHROPIC_CLIENT_CACHE", _http_closed),
+    ("google.genai", "api_clients.gemini_client", "_get_client", "_CLIENT_CACHE", _aio_closed),
+])
+def test_invalidate_client_evicts_and_closes(no_grace, monkeypatch, sdk, module_name, getter_name, cache_name, closed):
+    pytest.importorskip(sdk)
+    module = __import__(module_name, fromlist=["_"])
+    getter = getattr(module, getter_name)
+    cache = getattr(module, cache_name)
+
+    old = get_engine().run_sync(_build(getter, "stary-klucz"), timeout=5)
+    kept = get_engine().run_sync(_build(getter, "inny-klucz"), timeout=5)
+    old_closed, kept_closed = closed(monkeypatch, old), closed(monkeypatch, kept)
+    module.invalidate_client("stary-klucz")
+
+    assert "stary-klucz" not in cache
+    assert cache["inny-klucz"] is kept
+    assert _wait_until(old_closed)
+    assert not kept_closed()
+    module.invalidate_client()
+    assert not cache
+
+
+def test_deepseek_invalidate_closes_shared_pool(no_grace):
+    from api_clients import deepseek_client
+
+    async def build():
+        return deepseek_client._get_http_client()
+
+    old = get_engine().run_sync(build(), timeout=5)
+    deepseek_client.invalidate_client("stary-klucz")
+    assert _wait_until(lambda: old.is_closed)
+    assert get_engine().run_sync(build(), timeout=5) is not old
+
+
+def test_close_stale_without_running_loop_is_noop():
+    closed = []
+
+    async def closer():
+        closed.append(True)
+
+    engine_module.CorrectionEngine().close_stale(closer, delay=0)
+    assert not closed
+
+
+def test_registry_hook_skips_unloaded_client(monkeypatch):
+    import sys
+
+    from api_clients.registry import get_provider
+
+    spec = get_provider("Gemini")
+    monkeypatch.delitem(sys.modules, "api_clients.gemini_client", raising=False)
+    spec.on_key_changed("stary-klucz")  # brak modułu = brak klientów, bez importu SDK
+    assert "api_clients.gemini_client" not in sys.modules
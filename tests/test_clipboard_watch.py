@@ -0,0 +1,43 @@
+"""Oczekiwanie na zmianę schowka po Ctrl+C zamiast stałego sleep."""
+
+import threading
+
+from utils.clipboard_watch import ClipboardWatcher, histogram_summary
+
+
+def _watcher(clipboard):
+    return ClipboardWatcher(read=lambda: clipboard["text"], native=False)
+
+
+def test_change_is_detected_before_timeout():
+    clipboard = {"text": "stary"}
+    watcher = _watcher(clipboard)
+
+    before = watcher.snapshot()
+    threading.Timer(0.02, lambda: clipboard.update(text="zaznaczony tekst")).start()
+    result = watcher.wait_for_change(before, timeout=1.0)
+
+    assert result.changed and result.source == "poll"
+    assert result.text == "zaznaczony tekst"
+    assert 0.02 <= result.latency < 1.0
+
+
+def test_timeout_returns_current_text():
+    clipboard = {"text": "bez zmian"}
+    watcher = _watcher(clipboard)
+
+    result = watcher.wait_for_change(watcher.snapshot(), timeout=0.1)
+
+    assert not result.changed and result.source == "timeout"
+    assert result.text == "bez zmian"
+    assert result.latency >= 0.1
+    assert "timeouty:" in histogram_summary()
+
+
+def test_read_errors_count_as_empty_clipboard():
+    def broken():
+        raise RuntimeError("brak schowka")
+
+    watcher = ClipboardWatcher(read=broken, native=False)
+    assert watcher.snapshot().text == ""
+    assert watcher.wait_for_change(watcher.snapshot(), timeout=0.02).text == ""
@@ -0,0 +1,60 @@
+"""Stany providerów w sesji poprawiania i rejestr ostatnich sesji."""
+
+from utils.correction_session import (
+    RETAINED_SESSIONS,
+    STATE_CANCELLED,
+    STATE_DONE,
+    STATE_FAILED,
+    STATE_SKIPPED,
+    SessionRegistry,
+)
+
+NAMES = ["OpenAI", "Anthropic", "Gemini", "DeepSeek"]
+
+
+def _finished_session(registry):
+    session = registry.begin(NAMES, text_length=120)
+    for idx in range(3):
+        session.start(idx)
+    session.skip(3, "❌ Brak klucza API")
+    assert session.mark_streaming(0) and not session.mark_streaming(0)
+    assert session.complete(0, "Poprawiony tekst ❌ z glifem", 1.2)
+    assert not session.complete(0, "duplikat")
+    assert session.fail(1, "Błąd: timeout")
+    assert session.cancel_all() == [2]
+    assert not session.cancel(2), "spóźnione 'cancelled' nie zmienia stanu"
+    return session
+
+
+def test_transitions_and_counters():
+    session = _finished_session(SessionRegistry())
+
+    assert [p.state for p in session.providers] == [STATE_DONE, STATE_FAILED, STATE_CANCELLED, STATE_SKIPPED]
+    assert session.all_finished and session.finished_count == 4
+    assert session.success_count == 1 and session.failed_count == 1 and session.cancelled_count == 1
+    assert session.results == {0: "Poprawiony tekst ❌ z glifem"}
+    assert session.providers[0].result == "Poprawiony tekst ❌ z glifem"
+    assert session.finished_at is not None
+
+
+def test_failed_provider_is_not_a_result():
+    session = SessionRegistry().begin(NAMES[:2])
+    session.start(0)
+    session.start(1)
+    assert session.fail(0, "Błąd: Klucz API OpenAI nie został podany.")
+    assert not session.complete(0, "Błąd: Klucz API OpenAI nie został podany.")
+
+    assert session.success_count == 0 and 0 not in session.results
+    assert session.providers[0].error.startswith("Błąd")
+    assert session.active_indices() == [1]
+
+
+def test_registry_keeps_only_recent_sessions():
+    registry = SessionRegistry()
+    for _ in range(500):
+        _finished_session(registry)
+
+    assert len(registry) == RETAINED_SESSIONS
+    assert registry.evicted == 500 - RETAINED_SESSIONS
+    assert registry.current.session_id == registry.current_id == 500
+    assert registry.get(1) is None
@@ -0,0 +1,52 @@
+"""Podświetlanie różnic: pełny diff i dopasowanie przyrostowe strumienia."""
+
+import pytest
+
+from utils.diff_highlight import IncrementalDiffHighlighter, can_reconcile, changed_spans
+
+ORIGINAL = "Ala ma kota i psa. Kot jest czarny, a pies jest biały i duży."
+CORRECTED = "Ala ma kota oraz psa. Kot jest czarny, a pies – biały i bardzo duży."
+
+
+def _stream(original, corrected, step):
+    highlighter = IncrementalDiffHighlighter(original)
+    spans = []
+    for start in range(0, len(corrected), step):
+        spans.extend(highlighter.feed(corrected[start:start + step]))
+    spans.extend(highlighter.finish())
+    return highlighter, spans
+
+
+def test_changed_spans():
+    assert [CORRECTED[s:e] for s, e in changed_spans(ORIGINAL, CORRECTED)] == ["oraz", "–", "bardzo"]
+    assert changed_spans(ORIGINAL, ORIGINAL) == []
+    assert changed_spans("", CORRECTED) == []
+
+
+@pytest.mark.parametrize("step", [1, 5, 17, len(CORRECTED)])
+def test_incremental_covers_full_diff(step):
+    highlighter, incremental = _stream(ORIGINAL, CORRECTED, step)
+
+    covered = {i for s, e in incremental for i in range(s, e)}
+    assert all(i in covered for s, e in changed_spans(ORIGINAL, CORRECTED) for i in range(s, e))
+    assert [CORRECTED[s:e] for s, e in incremental] == ["oraz", "–", "bardzo"]
+    assert highlighter.tokens_seen == len(CORRECTED.split())
+    assert highlighter.tokens_changed == 3
+
+
+def test_incomplete_word_waits_for_next_chunk():
+    highlighter = IncrementalDiffHighlighter("Ala ma kota.")
+    assert highlighter.feed("Ala ma kot") == []
+    assert highlighter.feed("ka.") == []
+    assert highlighter.finish() == [(7, 13)]
+
+
+def test_adjacent_changes_are_contiguous():
+    # Zakres kolejnego zmienionego wyrazu zaczyna się na końcu poprzedniego (ze spacją)
+    _highlighter, spans = _stream("Ala ma kota.", "Ala bardzo lubi kota.", 4)
+    assert spans == [(4, 10), (10, 15)]
+
+
+def test_can_reconcile_budget():
+    assert can_reconcile("a" * 10, "b" * 10, max_chars=20)
+    assert not can_reconcile("a" * 10, "b" * 11, max_chars=20)
@@ -0,0 +1,200 @@
+"""Silnik asyncio: strumień zdarzeń sesji, anulowanie, cache, hedging i run_sync."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api_clients import engine as engine_module
+from api_clients.base_client import ErrorResult, PartialResult
+from api_clients.engine import CANCELLED_RESULT, CorrectionEngine, ProviderRequest
+from utils.response_cache import ResponseCache
+
+
+@pytest.fixture
+def engine():
+    engine = CorrectionEngine()
+    yield engine
+    engine.shutdown()
+
+
+@pytest.fixture
+def response_cache(tmp_path, monkeypatch):
+    cache = ResponseCache(db_path=str(tmp_path / "responses.db"))
+    monkeypatch.setattr(engine_module, "get_response_cache", lambda: cache)
+    return cache
+
+
+class Recorder:
+    """Zbiera zdarzenia z wątku silnika; ``wait`` czeka na zdarzenia końcowe."""
+
+    def __init__(self, expected):
+        self.events = []
+        self._expected = expected
+        self._done = threading.Event()
+
+    def __call__(self, event):
+        self.events.append(event)
+        if sum(e.kind != "chunk" for e in self.events) >= self._expected:
+            self._done.set()
+
+    def wait(self, timeout=5.0):
+        assert self._done.wait(timeout), self.events
+        return self.events
+
+    def kinds(self, index):
+        return [e.kind for e in self.events if e.index == index]
+
+    def final(self, index):
+        return next(e for e in self.events if e.index == index and e.kind != "chunk")
+
+
+def _request(index, func, name=None, text="Ala ma kota.", **kwargs):
+    return ProviderRequest(
+        index=index, name=name or f"test-{index}", func=func, api_key="klucz", model="model",
+        text=text, instruction_prompt="Popraw.", system_prompt="System", **kwargs,
+    )
+
+
+async def streaming(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+    for word in ("Ala ", "ma ", "kota."):
+        on_chunk(word)
+        await asyncio.sleep(0)
+    return "Ala ma kota."
+
+
+async def failing(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+    raise ValueError("zepsute")
+
+
+def test_session_streams_chunks_then_result(engine):
+    recorder = Recorder(expected=2)
+    handle = engine.submit(1, [_request(0, streaming), _request(1, failing)], recorder)
+    recorder.wait()
+
+    assert recorder.kinds(0) == ["chunk", "chunk", "chunk", "result"]
+    assert "".join(e.data for e in recorder.events if e.index == 0 and e.kind == "chunk") == "Ala ma kota."
+    assert recorder.final(0).data == "Ala ma kota." and recorder.final(0).session_id == 1
+    assert recorder.final(1).kind == "error" and "zepsute" in recorder.final(1).data
+    assert not handle.is_active()
+
+
+def test_cancel_closes_running_request(engine):
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    async def endless(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    recorder = Recorder(expected=1)
+    handle = engine.submit(2, [_request(0, endless)], recorder)
+    assert started.wait(2)
+    handle.cancel(0)
+    recorder.wait()
+
+    assert recorder.kinds(0) == ["cancelled"]
+    assert cancelled.is_set() and not handle.is_active(0)
+
+
+def test_results_are_cached_but_errors_are_not(engine, response_cache):
+    calls = []
+
+    async def counted(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+        calls.append(text)
+        return ErrorResult("Błąd: limit") if text == "błąd" else "Poprawiony tekst źródłowy."
+
+    for session_id in (1, 2):
+        recorder = Recorder(expected=2)
+        engine.submit(session_id, [
+            _request(0, counted, cache_key="ok"),
+            _request(1, counted, text="błąd", cache_key="err"),
+        ], recorder)
+        recorder.wait()
+        # Zapis do cache kończy się już po zdarzeniu "result"
+        deadline = time.monotonic() + 2
+        while response_cache.get("ok") is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert recorder.final(0).data == "Poprawiony tekst źródłowy."
+        assert isinstance(recorder.final(1).data, ErrorResult)
+
+    assert calls.count("Ala ma kota.") == 1, "drugi raz z cache"
+    assert calls.count("błąd") == 2, "błędy nie trafiają do cache"
+    assert "chunk" in recorder.kinds(0), "trafienie z cache jest odtwarzane jako strumień"
+
+
+def test_interrupted_stream_is_not_cached(engine, response_cache):
+    async def interrupted(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+        on_chunk("Ala ma")
+        return PartialResult("Ala ma")
+
+    recorder = Recorder(expected=2)
+    engine.submit(1, [
+        _request(0, streaming, cache_key="ok"),
+        _request(1, interrupted, cache_key="partial"),
+    ], recorder)
+    recorder.wait()
+    deadline = time.monotonic() + 2
+    while response_cache.get("ok") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert recorder.final(1).kind == "result" and recorder.final(1).data == "Ala ma"
+    assert response_cache.get("ok") == "Ala ma kota."
+    assert response_cache.get("partial") is None
+
+
+def test_hedge_wins_when_primary_does_not_stream(engine, monkeypatch):
+    monkeypatch.setattr(engine_module, "HEDGE_DEFAULT_DELAY", 0.05)
+    attempts = []
+    primary_cancelled = threading.Event()
+
+    async def slow_first(api_key, model, text, instruction_prompt, system_prompt, on_chunk=None):
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+        on_chunk("zapasowe")
+        return "zapasowe"
+
+    recorder = Recorder(expected=1)
+    engine.submit(3, [_request(0, slow_first, name="hedge-test", hedge=True)], recorder)
+    recorder.wait()
+
+    assert attempts == [0, 1]
+    assert recorder.final(0).data == "zapasowe"
+    assert primary_cancelled.wait(2)
+
+
+def test_run_sync_returns_result_and_cancels(engine):
+    assert engine.run_sync(streaming("k", "m", "t", "i", "s", on_chunk=lambda _d: None), timeout=5) == "Ala ma kota."
+
+    cancelled = threading.Event()
+
+    async def endless():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    cancel_event = threading.Event()
+    threading.Timer(0.05, cancel_event.set).start()
+    start = time.perf_counter()
+    result = engine.run_sync(endless(), cancel_event=cancel_event)
+
+    assert result is CANCELLED_RESULT and isinstance(result, ErrorResult)
+    assert time.perf_counter() - start < 1.0
+    assert cancelled.wait(1)
+
+
+def test_run_sync_timeout(engine):
+    with pytest.raises(TimeoutError):
+        engine.run_sync(asyncio.sleep(5), timeout=0.1, cancel_event=threading.Event())
@@ -0,0 +1,56 @@
+"""Budżet importu: parser ``-X importtime`` i brak ciężkich SDK przy starcie."""
+
+import importlib.util
+import os
+
+import pytest
+
+from utils.import_budget import check, parse_importtime, profile_import
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "data", "importtime_registry.txt")
+
+
+@pytest.fixture
+def recorded():
+    with open(FIXTURE, encoding="utf-8") as handle:
+        return handle.read()
+
+
+def test_parse_recorded_importtime(recorded):
+    profile = parse_importtime("api_clients.registry", recorded)
+
+    assert len(profile.loaded) == 39
+    assert profile.loaded[-1] == "api_clients.registry"
+    assert profile.total_ms == pytest.approx(38.082)
+    assert [name for name, _ms in profile.direct] == [
+        "api_clients", "dataclasses", "utils", "utils.config_manager", "utils.model_fetcher",
+    ]
+    assert profile.slowest(2) == [("utils.model_fetcher", 101.348), ("utils.config_manager", 15.794)]
+    assert profile.deferred_loaded() == []
+
+
+def test_deferred_module_in_recording_is_reported(recorded):
+    eager = recorded.replace(
+        "|   utils.model_fetcher",
+        "|   utils.model_fetcher\nimport time:       900 |      52000 |   openai",
+    )
+    assert parse_importtime("api_clients.registry", eager).deferred_loaded() == ["openai"]
+
+
+def test_registry_defers_provider_sdks():
+    profile = profile_import("api_clients.registry")
+    assert profile.error is None
+    assert profile.deferred_loaded() == []
+    assert "httpx" in profile.loaded
+
+
+@pytest.mark.skipif(importlib.util.find_spec("customtkinter") is None, reason="brak customtkinter")
+def test_main_corrector_defers_heavy_modules():
+    profile = profile_import("main_corrector")
+    assert profile.error is None
+    assert profile.deferred_loaded() == []
+
+
+def test_check_fails_on_budget_regression(capsys):
+    assert not check(["api_clients.registry"], budget_ms=0.001, runs=1)
+    assert "budżet" in capsys.readouterr().out
@@ -0,0 +1,107 @@
+"""Wstawianie kawałkami i leniwe tagowanie długich tekstów (atrapa widgetu Tk)."""
+
+from gui.large_text import ChunkedTextInserter, LazyTagger, _LineIndex, is_large_text
+
+
+class FakeText:
+    """Minimalna atrapa ``tk.Text``: treść, tagi i kolejka ``after``."""
+
+    def __init__(self, visible_lines=(1, 3)):
+        self.content = ""
+        self.state = "normal"
+        self.tags = []
+        self.pending = {}
+        self._next_job = 0
+        self._visible_lines = visible_lines
+
+    def after(self, _ms, callback):
+        self._next_job += 1
+        self.pending[self._next_job] = callback
+        return self._next_job
+
+    def after_cancel(self, job):
+        self.pending.pop(job, None)
+
+    def run_pending(self):
+        steps = 0
+        while self.pending:
+            job = min(self.pending)
+            self.pending.pop(job)()
+            steps += 1
+        return steps
+
+    def configure(self, state):
+        self.state = state
+
+    def delete(self, _first, _last):
+        self.content = ""
+
+    def insert(self, _index, text):
+        self.content += text
+
+    def tag_add(self, tag, first, last):
+        self.tags.append((tag, first, last))
+
+    def winfo_height(self):
+        return 100
+
+    def index(self, position):
+        first, last = self._visible_lines
+        return f"{first if position == '@0,0' else last}.0"
+
+
+def test_line_index():
+    text = "wiersz pierwszy\ndrugi wiersz\n\ntrzeci"
+    lines = _LineIndex(text)
+    assert lines.index(0) == "1.0"
+    assert lines.index(text.index("drugi")) == "2.0"
+    assert lines.index(text.index("trzeci") + 2) == "4.2"
+    assert lines.line_start(2) == text.index("drugi")
+    assert lines.line_start(99) == len(text)
+
+
+def test_is_large_text():
+    assert is_large_text("a" * 10, threshold=10)
+    assert not is_large_text("a" * 9, threshold=10)
+
+
+def test_inserter_shows_first_slice_then_finishes_in_steps():
+    text = " ".join(f"wyraz{n}" for n in range(200))
+    widget = FakeText()
+    done = []
+
+    inserter = ChunkedTextInserter(widget, text, on_done=lambda: done.append(True), slice_chars=100).start()
+    first = widget.content
+    assert 0 < len(first) <= 100 and first.endswith(" "), "pierwszy kawałek od razu, cięty na spacji"
+    assert widget.state == "disabled" and not done
+
+    widget.run_pending()
+    assert widget.content == text
+    assert inserter.done and done == [True]
+    assert inserter.steps >= len(text) // 100
+
+
+def test_inserter_cancel_stops_steps():
+    widget = FakeText()
+    inserter = ChunkedTextInserter(widget, "abc " * 100, slice_chars=40).start()
+    inserter.cancel()
+    assert widget.run_pending() == 0
+    assert len(widget.content) <= 40 and not inserter.done
+
+
+def test_lazy_tagger_tags_visible_spans_first():
+    lines = [f"linia {n} zmiana" for n in range(1, 7)]
+    text = "\n".join(lines)
+    spans = []
+    for line in lines:
+        start = text.index(line) + line.index("zmiana")
+        spans.append((start, start + len("zmiana")))
+    widget = FakeText(visible_lines=(2, 3))
+
+    tagger = LazyTagger(widget, text, spans, "diff", batch=2).start()
+    assert widget.tags == [("diff", "2.8", "2.14"), ("diff", "3.8", "3.14")]
+    assert not tagger.done
+
+    widget.run_pending()
+    assert tagger.done and tagger.steps == 2
+    assert [first for _tag, first, _last in widget.tags[2:]] == ["1.8", "4.8", "5.8", "6.8"]
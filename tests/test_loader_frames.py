@@ -0,0 +1,65 @@
+"""Cache klatek loadera: pamięć, pasek PNG na dysku i unieważnianie."""
+
+import os
+
+import pytest
+from PIL import Image
+
+from gui.loader_frames import DISK_ENTRIES, LoaderFrameCache, decode_frames, loader_size
+
+
+@pytest.fixture
+def gif_path(tmp_path):
+    path = str(tmp_path / "loader.gif")
+    source = [Image.new("RGBA", (64, 64), (16 * i, 100, 200, 128)) for i in range(8)]
+    source[0].save(path, save_all=True, append_images=source[1:], duration=100, loop=0)
+    return path
+
+
+def test_decode_frames(gif_path):
+    frames = decode_frames(gif_path, 150)
+    assert len(frames) == 8
+    assert all(frame.size == (150, 150) and frame.mode == "RGB" for frame in frames)
+
+
+def test_memory_then_disk(tmp_path, gif_path):
+    cache_dir = str(tmp_path / "cache")
+    first = LoaderFrameCache(cache_dir=cache_dir)
+    frames = first.images(gif_path, 150)
+    assert first.images(gif_path, 150) is frames
+    assert first.stats == {"memory": 1, "disk": 0, "decoded": 1}
+
+    # "Kolejne uruchomienie": nowa instancja czyta gotowy pasek z dysku
+    second = LoaderFrameCache(cache_dir=cache_dir)
+    cached = second.images(gif_path, 150)
+    assert second.stats == {"memory": 0, "disk": 1, "decoded": 0}
+    assert [f.tobytes() for f in cached] == [f.tobytes() for f in frames]
+
+    # Inny rozmiar (zmiana DPI) = osobny wpis
+    assert second.images(gif_path, 240)[0].size == (240, 240)
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_replaced_gif_invalidates_disk_cache(tmp_path, gif_path):
+    cache_dir = str(tmp_path / "cache")
+    LoaderFrameCache(cache_dir=cache_dir).images(gif_path, 120)
+    Image.new("RGBA", (64, 64), (0, 0, 0, 255)).save(gif_path, save_all=True, duration=100)
+    stat = os.stat(gif_path)
+    os.utime(gif_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    cache = LoaderFrameCache(cache_dir=cache_dir)
+    assert len(cache.images(gif_path, 120)) == 1
+    assert cache.stats["decoded"] == 1
+
+
+def test_disk_entries_are_pruned(tmp_path, gif_path):
+    cache_dir = str(tmp_path / "cache")
+    cache = LoaderFrameCache(cache_dir=cache_dir)
+    for size in range(100, 100 + DISK_ENTRIES + 3):
+        cache.images(gif_path, size)
+    assert len(os.listdir(cache_dir)) == DISK_ENTRIES
+
+
+def test_loader_size():
+    assert loader_size(1.0) == 200
+    assert loader_size(0.25) == 120
@@ -0,0 +1,170 @@
+"""Zapamiętywanie wariantów modelu OpenAI: tylko aliasy, zapis poza pętlą asyncio."""
+
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from api_clients import openai_capabilities as capabilities
+
+
+@pytest.fixture
+def capability_file(tmp_path, monkeypatch):
+    path = tmp_path / capabilities.CAPABILITIES_FILE_NAME
+    monkeypatch.setattr(capabilities, "_file_path", lambda: str(path))
+    monkeypatch.setattr(capabilities, "_capabilities", {})
+    return path
+
+
+@pytest.mark.parametrize("variant, alias", [
+    ("gpt-5-mini", True),
+    ("gpt-5-mini-2025-08-07", True),
+    ("gpt-5-mini-preview", True),
+    ("gpt-4o-mini", False),
+    ("o1-mini", False),
+    ("gpt-5-mini-high", False),
+])
+def test_is_model_alias(variant, alias):
+    assert capabilities.is_model_alias("gpt-5-mini", variant) is alias
+
+
+def test_fallback_model_is_not_persisted(capability_file):
+    capabilities.record_capability("klucz", "gpt-5-mini", variant="gpt-4o-mini", endpoint="responses")
+    assert capabilities.get_capability("klucz", "gpt-5-mini") is None
+    assert not capability_file.exists()
+
+    capabilities.record_capability("klucz", "gpt-5-mini", variant="gpt-5-mini-2025-08-07", endpoint="responses")
+    assert capabilities.get_capability("klucz", "gpt-5-mini")["variant"] == "gpt-5-mini-2025-08-07"
+    assert capability_file.exists()
+
+
+def test_save_runs_off_the_event_loop(capability_file, monkeypatch):
+    writers = []
+    original_write = capabilities._write
+
+    def recording_write(content, seq):
+        writers.append(threading.current_thread())
+        original_write(content, seq)
+
+    monkeypatch.setattr(capabilities, "_write", recording_write)
+
+    async def record():
+        capabilities.record_capability("klucz", "gpt-5", variant="gpt-5", endpoint="responses")
+        loop_thread = threading.current_thread()
+        for _ in range(100):
+            if writers:
+                break
+            await asyncio.sleep(0.01)
+        return loop_thread
+
+    loop_thread = asyncio.run(record())
+    assert writers and writers[0] is not loop_thread
+    saved = json.loads(capability_file.read_text(encoding="utf-8"))
+    assert [entry["variant"] for entry in saved.values()] == ["gpt-5"]
+
+
+class _FakeStream:
+    def __init__(self, text):
+        self._text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        async def events():
+            yield SimpleNamespace(type="response.output_text.delta", delta=self._text)
+        return events()
+
+    async def get_final_response(self):
+        return SimpleNamespace(output_text=self._text)
+
+
+class _StreamRejected(Exception):
+    status_code = 400
+
+
+class _FakeResponses:
+    def __init__(self, working, stream_error=None):
+        self.working = working
+        self.stream_error = stream_error
+        self.tried = []
+
+    def stream(self, model, **kwargs):
+        self.tried.append(model)
+        if self.stream_error is not None:
+            raise self.stream_error
+        if model not in self.working:
+            raise RuntimeError(f"{model}: chwilowy błąd")
+        return _FakeStream(f"poprawione przez {model}")
+
+    async def create(self, model, **kwargs):
+        return SimpleNamespace(output_text=f"poprawione przez {model}")
+
+
+def test_transient_failure_does_not_downgrade_later_requests(capability_file, monkeypatch):
+    pytest.importorskip("openai")
+    from api_clients import openai_client
+
+    responses = _FakeResponses(working={"gpt-4o-mini"})
+    monkeypatch.setattr(openai_client, "_get_openai_client", lambda api_key: SimpleNamespace(responses=responses))
+
+    def correct():
+        return asyncio.run(openai_client.correct_text_openai_async(
+            "klucz", "gpt-5-mini", "tekst", "Popraw", "system", on_chunk=lambda delta: None, ai_settings={},
+        ))
+
+    assert "gpt-4o-mini" in correct()
+    assert capabilities.get_capability("klucz", "gpt-5-mini") is None
+
+    # Model wybrany przez użytkownika działa znowu - i jest próbowany jako pierwszy
+    responses.working = {"gpt-5-mini", "gpt-4o-mini"}
+    responses.tried.clear()
+    assert "gpt-5-mini" in correct()
+    assert responses.tried[0] == "gpt-5-mini"
+
+
+def test_stale_fallback_entry_is_ignored(capability_file, monkeypatch):
+    pytest.importorskip("openai")
+    from api_clients import openai_client
+
+    key = capabilities._entry_key("klucz", "gpt-5")
+    capabilities._capabilities[key] = {"variant": "gpt-4o", "endpoint": "responses", "stream": True}
+    responses = _FakeResponses(working={"gpt-5", "gpt-4o"})
+    monkeypatch.setattr(openai_client, "_get_openai_client", lambda api_key: SimpleNamespace(responses=responses))
+
+    asyncio.run(openai_client.correct_text_openai_async(
+        "klucz", "gpt-5", "tekst", "Popraw", "system", on_chunk=lambda delta: None, ai_settings={},
+    ))
+    assert responses.tried[0] == "gpt-5"
+    assert capabilities.get_capability("klucz", "gpt-5")["variant"] == "gpt-5"
+
+
+@pytest.mark.parametrize("stream_error, stream", [
+    (TimeoutError("Request timed out."), None),
+    (_StreamRejected("Error code: 400 - 'stream' is not supported for this model"), False),
+])
+def test_only_rejected_stream_is_remembered(capability_file, monkeypatch, stream_error, stream):
+    pytest.importorskip("openai")
+    from api_clients import openai_client
+
+    responses = _FakeResponses(working={"gpt-5"}, stream_error=stream_error)
+    monkeypatch.setattr(openai_client, "_get_openai_client", lambda api_key: SimpleNamespace(responses=responses))
+
+    def correct():
+        return asyncio.run(openai_client.correct_text_openai_async(
+            "klucz", "gpt-5", "tekst", "Popraw", "system", on_chunk=lambda delta: None, ai_settings={},
+        ))
+
+    assert "gpt-5" in correct(), "create() po nieudanym streamie"
+    assert capabilities.get_capability("klucz", "gpt-5").get("stream") is stream
+
+    # Po chwilowym błędzie następne zapytanie znowu próbuje streamu
+    responses.stream_error = None
+    responses.tried.clear()
+    correct()
+    assert bool(responses.tried) is (stream is None)
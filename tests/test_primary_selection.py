@@ -0,0 +1,31 @@
+"""Odczyt zaznaczenia PRIMARY i odrzucanie nieaktualnego tekstu."""
+
+import sys
+
+from utils.primary_selection import PrimarySelectionReader
+
+
+def _reader(script):
+    return PrimarySelectionReader(command=[sys.executable, "-c", script])
+
+
+def test_read_once_then_stale():
+    reader = _reader("print('zaznaczony tekst', end='')")
+
+    first = reader.read()
+    assert first is not None
+    assert first.text == "zaznaczony tekst" and first.source == "primary" and first.changed
+    assert reader.read() is None, "ten sam tekst drugi raz = nieaktualne zaznaczenie"
+
+
+def test_text_used_via_ctrl_c_is_stale():
+    reader = _reader("print('skopiowany', end='')")
+    reader.remember("skopiowany")
+    assert reader.read() is None
+
+
+def test_empty_or_failing_command():
+    assert _reader("pass").read() is None
+    assert _reader("import sys; print('x'); sys.exit(1)").read() is None
+    assert PrimarySelectionReader(command=[]).read() is None
+    assert not PrimarySelectionReader(command=[]).available
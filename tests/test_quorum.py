@@ -0,0 +1,32 @@
+"""Kworum: zgodność wyników providerów liczona na wyrazach."""
+
+import pytest
+
+from utils.quorum import find_quorum, normalized_edit_distance
+
+SAMPLE = {
+    0: "Ala ma kota i psa.",
+    1: "Ala ma kota oraz psa.",
+    2: "Ala ma kota i psa.",
+    3: "Zupełnie inny tekst.",
+}
+
+
+def test_normalized_edit_distance():
+    assert normalized_edit_distance("Ala ma kota.", "Ala  ma\nkota.") == 0.0
+    assert normalized_edit_distance("Ala ma kota.", "Zupełnie inny tekst") == 1.0
+    assert normalized_edit_distance(SAMPLE[0], SAMPLE[1]) == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize("size, threshold, expected", [
+    (2, 0.05, (0, [0, 2])),
+    (3, 0.25, (0, [0, 1, 2])),
+    (4, 0.25, None),
+])
+def test_find_quorum(size, threshold, expected):
+    assert find_quorum(SAMPLE, size=size, threshold=threshold) == expected
+
+
+def test_empty_results_are_not_agreement():
+    assert find_quorum({0: "", 1: "  \n", 2: "Ala ma kota."}, size=2) is None
+    assert find_quorum({0: "", 1: "Ala ma kota.", 2: "Ala ma kota."}, size=2) == (1, [1, 2])
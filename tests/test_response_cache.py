@@ -0,0 +1,90 @@
+"""Cache odpowiedzi: limity LRU w pamięci, TTL i limit wierszy na dysku, klucz."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import response_cache as response_cache_module
+from utils.response_cache import ResponseCache, make_cache_key
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "responses.sqlite3")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Zegar modułu cache przesuwany ręcznie w teście."""
+    clock = SimpleNamespace(now=time.time())
+    monkeypatch.setattr(response_cache_module, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def _memory_only(**limits):
+    cache = ResponseCache(db_path=":memory:", **limits)
+    cache.close()
+    return cache
+
+
+def test_memory_evicts_least_recently_used_entry():
+    cache = _memory_only(memory_max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+
+    assert cache.get("b") is None, "najdawniej używany wpis usunięty"
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+
+def test_memory_evicts_by_total_length():
+    cache = _memory_only(memory_max_chars=10)
+    cache.put("a", "x" * 4)
+    cache.put("b", "y" * 4)
+    cache.put("c", "z" * 4)
+    cache.put("big", "w" * 11)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 4 and cache.get("c") == "z" * 4
+    assert cache.get("big") is None, "wpis większy niż limit nie trafia do pamięci"
+
+
+def test_disk_entry_expires_after_ttl(db_path, clock):
+    ResponseCache(db_path=db_path, ttl_seconds=60).put("klucz", "Ala ma kota.")
+
+    clock.now += 30
+    assert ResponseCache(db_path=db_path, ttl_seconds=60).get("klucz") == "Ala ma kota."
+    clock.now += 31
+    assert ResponseCache(db_path=db_path, ttl_seconds=60).get("klucz") is None
+
+
+def test_disk_is_trimmed_to_max_rows(db_path, clock):
+    cache = ResponseCache(db_path=db_path, max_rows=2, memory_max_entries=1)
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        cache.put(key, key.upper())
+    cache.close()
+
+    reopened = ResponseCache(db_path=db_path, max_rows=2)
+    assert reopened.get("a") is None
+    assert reopened.get("b") == "B" and reopened.get("c") == "C"
+
+
+def test_value_survives_reopening_database(db_path):
+    cache = ResponseCache(db_path=db_path)
+    cache.put("klucz", "Zażółć gęślą jaźń.")
+    cache.close()
+
+    assert ResponseCache(db_path=db_path).get("klucz") == "Zażółć gęślą jaźń."
+
+
+def test_cache_key_includes_provider_options():
+    args = ("Lokalny", "model", "system", "popraw", "tekst")
+    first = make_cache_key(*args, options={"base_url": "http://localhost:11434/v1", "provider_name": "Lokalny"})
+    second = make_cache_key(*args, options={"base_url": "http://localhost:8080/v1", "provider_name": "Lokalny"})
+
+    assert first != second
+    assert first == make_cache_key(*args, options={"provider_name": "Lokalny", "base_url": "http://localhost:11434/v1"})
+    assert make_cache_key(*args) != first
@@ -0,0 +1,58 @@
+"""Fazy startu: sumowanie powtórzeń, znaczniki z wątków i rotacja raportów."""
+
+import json
+import os
+import threading
+import time
+
+from utils.startup_profiler import BENCHMARK_FLAG, StartupProfiler, is_benchmark_run
+
+
+def test_phases_and_marks():
+    profiler = StartupProfiler()
+    with profiler.phase("config_load"):
+        time.sleep(0.01)
+    for _ in range(3):
+        with profiler.phase("gif_preload"):
+            time.sleep(0.002)
+    worker = threading.Thread(target=lambda: profiler.mark("tray_ready"), name="poprawiacz-tray")
+    worker.start()
+    worker.join()
+    profiler.mark("first_idle")
+    profiler.mark("first_idle")
+
+    report = profiler.report(benchmark=True)
+    phases = {phase["name"]: phase for phase in report["phases"]}
+    assert list(phases) == ["config_load", "gif_preload"]
+    assert phases["gif_preload"]["count"] == 3 and phases["gif_preload"]["duration_ms"] >= 6
+    assert phases["config_load"]["duration_ms"] >= 10
+    assert report["marks"]["first_idle"] >= report["marks"]["tray_ready"]
+    assert report["first_idle_ms"] == report["marks"]["first_idle"]
+    assert report["benchmark"] is True
+    assert profiler.has("tray_ready") and profiler.has("gif_preload") and not profiler.has("hotkey_registration")
+    assert "gif_preload" in profiler.summary()
+
+
+def test_write_report_keeps_newest(tmp_path):
+    profiler = StartupProfiler()
+    with profiler.phase("imports"):
+        pass
+    for second in range(3):
+        profiler.started_at = profiler.started_at.replace(second=second)
+        path = profiler.write_report(str(tmp_path), keep=2)
+
+    assert sorted(os.listdir(tmp_path))[-1] == os.path.basename(path)
+    assert len(os.listdir(tmp_path)) == 2
+    with open(path, encoding="utf-8") as handle:
+        assert json.load(handle)["phases"][0]["name"] == "imports"
+
+
+def test_write_report_failure_returns_none(tmp_path):
+    blocker = tmp_path / "plik"
+    blocker.write_text("")
+    assert StartupProfiler().write_report(str(blocker / "startup")) is None
+
+
+def test_benchmark_flag():
+    assert is_benchmark_run(["main_corrector.py", BENCHMARK_FLAG])
+    assert not is_benchmark_run(["main_corrector.py"])
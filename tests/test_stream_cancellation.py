@@ -0,0 +1,153 @@
+"""cancel_event w synchronicznych wrapperach zamyka gniazdo strumienia HTTP.
+
+Każdy klient streamujący łączy się z lokalnym serwerem SSE, który nigdy nie
+kończy odpowiedzi. Wrapper anuluje przy pierwszym fragmencie, a serwer
+mierzy, po jakim czasie klient zamknął gniazdo.
+"""
+
+import json
+import select
+import socket
+import threading
+import time
+
+import pytest
+
+from api_clients.engine import CANCELLED_RESULT
+
+# Maksymalny czas od anulowania do zamknięcia gniazda po stronie klienta
+SOCKET_RELEASE_BOUND = 1.0
+
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+CHAT_CHUNK = _sse({
+    "id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": "test-model",
+    "choices": [{"index": 0, "delta": {"content": "token "}, "finish_reason": None}],
+})
+ANTHROPIC_PREAMBLE = _sse({
+    "type": "message_start",
+    "message": {
+        "id": "msg_1", "type": "message", "role": "assistant", "model": "test-model",
+        "content": [], "stop_reason": None, "stop_sequence": None,
+        "usage": {"input_tokens": 1, "output_tokens": 1},
+    },
+}, "message_start") + _sse({
+    "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+}, "content_block_start")
+ANTHROPIC_CHUNK = _sse({
+    "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "token "},
+}, "content_block_delta")
+
+
+class EndlessStreamServer:
+    """Serwer SSE (jedno połączenie), który streamuje bez końca do zamknięcia gniazda."""
+
+    def __init__(self, chunk, preamble=b""):
+        self.chunk = chunk
+        self.preamble = preamble
+        self.closed = threading.Event()
+        self.closed_at = None
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(1)
+        self.url = f"http://127.0.0.1:{self._server.getsockname()[1]}"
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        conn, _addr = self._server.accept()
+        with conn:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(4096)
+            conn.sendall(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                b"Connection: close\r\n\r\n" + self.preamble
+            )
+            while True:
+                try:
+                    conn.sendall(self.chunk)
+                    readable, _, _ = select.select([conn], [], [], 0.05)
+                    # Pozostałość body zapytania jest czytana; b"" = klient zamknął gniazdo
+                    if readable and not conn.recv(4096):
+                        break
+                except OSError:
+                    break
+        self.closed_at = time.perf_counter()
+        self.closed.set()
+
+    def close(self):
+        self._server.close()
+
+
+def _openai(server, monkeypatch, **kwargs):
+    pytest.importorskip("openai")
+    from api_clients import openai_client
+
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{server.url}/v1")
+    try:
+        return openai_client.correct_text_openai("klucz-testowy-openai", "gpt-4o-mini", **kwargs)
+    finally:
+        openai_client.invalidate_client("klucz-testowy-openai")
+
+
+def _anthropic(server, monkeypatch, **kwargs):
+    pytest.importorskip("anthropic")
+    from api_clients import anthropic_client
+
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", server.url)
+    try:
+        return anthropic_client.correct_text_anthropic("klucz-testowy-anthropic", "test-model", **kwargs)
+    finally:
+        anthropic_client.invalidate_client("klucz-testowy-anthropic")
+
+
+def _deepseek(server, monkeypatch, **kwargs):
+    from api_clients import deepseek_client
+
+    monkeypatch.setattr(deepseek_client, "DEEPSEEK_API_ENDPOINT", f"{server.url}/chat/completions")
+    return deepseek_client.correct_text_deepseek("klucz-testowy", "test-model", **kwargs)
+
+
+def _compatible(server, monkeypatch, **kwargs):
+    from api_clients import openai_compatible_client
+
+    return openai_compatible_client.correct_text_openai_compatible(
+        None, "test-model", base_url=f"{server.url}/v1", **kwargs
+    )
+
+
+@pytest.mark.parametrize("correct, chunk, preamble", [
+    pytest.param(_openai, CHAT_CHUNK, b"", id="openai"),
+    pytest.param(_anthropic, ANTHROPIC_CHUNK, ANTHROPIC_PREAMBLE, id="anthropic"),
+    pytest.param(_deepseek, CHAT_CHUNK, b"", id="deepseek"),
+    pytest.param(_compatible, CHAT_CHUNK, b"", id="openai-compatible"),
+])
+def test_cancel_event_closes_stream_socket(monkeypatch, correct, chunk, preamble):
+    server = EndlessStreamServer(chunk, preamble)
+    cancel_event = threading.Event()
+    cancelled = {}
+
+    def cancel_on_first_chunk(_text):
+        if not cancel_event.is_set():
+            cancelled["at"] = time.perf_counter()
+            cancel_event.set()
+
+    try:
+        result = correct(
+            server, monkeypatch,
+            text_to_correct="Ala ma kota.",
+            instruction_prompt="Popraw tekst.",
+            system_prompt="System",
+            on_chunk=cancel_on_first_chunk,
+            cancel_event=cancel_event,
+        )
+        assert result == CANCELLED_RESULT
+        assert "at" in cancelled, "anulowanie bez otrzymanego fragmentu"
+        assert server.closed.wait(SOCKET_RELEASE_BOUND), "gniazdo nie zostało zamknięte po anulowaniu"
+        assert server.closed_at - cancelled["at"] < SOCKET_RELEASE_BOUND
+    finally:
+        server.close()
@@ -0,0 +1,50 @@
+"""Dzielenie długich tekstów na fragmenty i sklejanie 1:1."""
+
+import pytest
+
+from utils.text_chunker import (
+    CHARS_PER_TOKEN,
+    LONG_TEXT_MIN_TOKENS,
+    estimate_tokens,
+    is_long_text,
+    join_chunks,
+    split_text,
+)
+
+SAMPLE = (
+    "\n  Wstęp do dokumentu.\n\n"
+    "Lista zadań:\n- pierwszy punkt\n- drugi punkt\n  z wcięciem\n\n\n"
+    + "Długi akapit. " * 40
+    + "\n\nZakończenie.\n"
+)
+
+
+@pytest.mark.parametrize("max_tokens", [5, 20, 60, 10_000])
+def test_join_restores_original(max_tokens):
+    chunks = split_text(SAMPLE, max_tokens=max_tokens)
+    assert join_chunks(chunks, [chunk.body for chunk in chunks]) == SAMPLE
+    assert all(chunk.body == chunk.body.rstrip() for chunk in chunks)
+
+
+def test_chunks_respect_budget_and_boundaries():
+    chunks = split_text(SAMPLE, max_tokens=60)
+    max_chars = int(60 * CHARS_PER_TOKEN)
+
+    assert len(chunks) > 2
+    assert all(len(chunk.body.strip()) <= max_chars for chunk in chunks)
+    # Lista mieści się w budżecie, więc nie jest dzielona między fragmenty
+    assert any("- pierwszy punkt\n- drugi punkt\n  z wcięciem" in chunk.body for chunk in chunks)
+    # Za długi akapit jest cięty na granicach zdań
+    assert all(chunk.body.endswith((".", ":", "wcięciem")) for chunk in chunks)
+
+
+def test_short_text_is_one_chunk():
+    assert split_text("") == []
+    assert [chunk.body for chunk in split_text("Ala ma kota.\n")] == ["Ala ma kota."]
+
+
+def test_long_text_detection():
+    long_text = "a" * int(LONG_TEXT_MIN_TOKENS * CHARS_PER_TOKEN + CHARS_PER_TOKEN + 1)
+    assert estimate_tokens("abcd") == 2
+    assert is_long_text(long_text)
+    assert not is_long_text("Ala ma kota.")
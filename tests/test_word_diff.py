@@ -0,0 +1,74 @@
+"""Diff wyrazów (Myers + patience): poprawność skryptu edycji względem LCS."""
+
+import difflib
+import random
+
+import pytest
+
+from utils.word_diff import WordMatcher, matching_blocks, opcodes_from_blocks
+
+
+def _apply_opcodes(a, b, opcodes):
+    """Odtwarza b z a według opkodów, sprawdzając, że bloki equal są równe."""
+    out = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j), "opkody nie są ciągłe"
+        if tag == "equal":
+            assert list(a[i1:i2]) == list(b[j1:j2]), "blok equal nie jest równy"
+            out.extend(a[i1:i2])
+        else:
+            out.extend(b[j1:j2])
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b)), "opkody nie pokrywają całych sekwencji"
+    return out
+
+
+def _lcs_length(a, b):
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def _random_pairs(rounds=400, seed=7):
+    rng = random.Random(seed)
+    for _ in range(rounds):
+        alphabet = rng.choice(["ab", "abc", "abcdef", "abcdefghijklmnop"])
+        a = [rng.choice(alphabet) for _ in range(rng.randint(0, 40))]
+        b = [rng.choice(alphabet) for _ in range(rng.randint(0, 40))]
+        yield a, b
+
+
+@pytest.mark.parametrize("patience", [True, False])
+def test_random_pairs_reconstruct(patience):
+    for a, b in _random_pairs():
+        blocks = matching_blocks(a, b, max_cost=10_000, patience=patience)
+        assert blocks[-1] == (len(a), len(b), 0)
+        assert _apply_opcodes(a, b, opcodes_from_blocks(blocks)) == b
+
+
+def test_myers_without_patience_is_minimal():
+    # Sam Myers daje minimalny skrypt edycji (= LCS)
+    for a, b in _random_pairs():
+        blocks = matching_blocks(a, b, max_cost=10_000, patience=False)
+        assert sum(size for _i, _j, size in blocks) == _lcs_length(a, b), (a, b)
+
+
+def test_cost_limit_still_gives_valid_script():
+    rng = random.Random(3)
+    a = [rng.choice("abcdefgh") for _ in range(300)]
+    b = [rng.choice("abcdefgh") for _ in range(300)]
+    opcodes = opcodes_from_blocks(matching_blocks(a, b, max_cost=4, patience=False))
+    assert _apply_opcodes(a, b, opcodes) == b
+
+
+def test_word_matcher_matches_difflib_format():
+    a = "Ala ma kota i psa .".split()
+    b = "Ala ma dwa koty i psa".split()
+    ours = WordMatcher(a, b).get_opcodes()
+    assert ours == difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+    assert _apply_opcodes(a, b, ours) == b
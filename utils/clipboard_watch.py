@@ -0,0 +1,191 @@
+"""Wykrywanie momentu, w którym symulowany Ctrl+C faktycznie trafił do schowka.
+
+Zamiast stałych opóźnień (0.3 s po Ctrl+C + 0.4 s przed przetwarzaniem) robimy
+migawkę schowka przed naciśnięciem i wracamy, gdy tylko się zmieni:
+
+- Windows: ``GetClipboardSequenceNumber`` – licznik zmieniany przy każdym
+  zapisie do schowka (także tym samym tekstem), odczyt bez otwierania schowka,
+- X11 z rozszerzeniem XFixes (opcjonalnie ``python-xlib``): zdarzenie zmiany
+  właściciela selekcji CLIPBOARD budzi oczekiwanie od razu,
+- pozostałe: porównanie treści z migawką, odpytywanie z rosnącym interwałem
+  (5 ms, potem coraz rzadziej do 40 ms).
+
+Po przekroczeniu limitu czasu zwracamy bieżącą treść – zaznaczony tekst mógł
+być identyczny z poprzednią zawartością schowka. Opóźnienia i timeouty trafiają
+do :mod:`utils.latency` (provider ``clipboard``).
+"""
+
+import select
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import pyperclip
+
+from .latency import get_latency_stats
+from .logger import logger
+
+DEFAULT_TIMEOUT = 0.6
+POLL_START = 0.005
+POLL_MAX = 0.04
+POLL_GROWTH = 1.5
+
+STATS_PROVIDER = "clipboard"
+METRIC_READY = "copy_ready"
+METRIC_TIMEOUT = "copy_timeout"
+# Przedziały histogramu opóźnień (sekundy)
+HISTOGRAM_BOUNDS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.4)
+
+
+@dataclass
+class ClipboardSnapshot:
+    text: str
+    sequence: Optional[int]
+    taken_at: float
+
+
+@dataclass
+class CopyResult:
+    text: str
+    latency: float
+    changed: bool
+    source: str  # "sequence", "xfixes", "poll" albo "timeout"
+
+
+def _windows_sequence_reader() -> Optional[Callable[[], int]]:
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+
+        return ctypes.windll.user32.GetClipboardSequenceNumber
+    except Exception:
+        return None
+
+
+class _XFixesNotifier:
+    """Budzi oczekiwanie przy zmianie właściciela selekcji CLIPBOARD (X11)."""
+
+    def __init__(self):
+        from Xlib import display
+        from Xlib.ext import xfixes
+
+        self._display = display.Display()
+        if not self._display.has_extension("XFIXES"):
+            raise RuntimeError("brak rozszerzenia XFIXES")
+        self._display.xfixes_query_version()
+        clipboard = self._display.intern_atom("CLIPBOARD")
+        self._display.xfixes_select_selection_input(
+            self._display.screen().root, clipboard, xfixes.XFixesSetSelectionOwnerNotifyMask
+        )
+        self._display.flush()
+
+    def drain(self) -> int:
+        count = 0
+        while self._display.pending_events():
+            self._display.next_event()
+            count += 1
+        return count
+
+    def wait(self, timeout: float) -> bool:
+        """True, gdy w ciągu ``timeout`` przyszło zdarzenie zmiany właściciela."""
+        if self.drain():
+            return True
+        readable, _, _ = select.select([self._display.fileno()], [], [], timeout)
+        return bool(readable) and self.drain() > 0
+
+
+class ClipboardWatcher:
+    """Migawka schowka przed Ctrl+C i oczekiwanie na zmianę."""
+
+    def __init__(self, read: Callable[[], str] = pyperclip.paste, native: bool = True):
+        self._read = read
+        # native=False: tylko porównanie treści (np. dla własnej funkcji ``read``)
+        self._sequence = _windows_sequence_reader() if native else None
+        self._notifier: Optional[_XFixesNotifier] = None
+        if native and self._sequence is None and sys.platform.startswith("linux"):
+            try:
+                self._notifier = _XFixesNotifier()
+                logger.info("Schowek: powiadomienia XFixes aktywne")
+            except Exception as e:
+                logger.debug(f"Schowek: XFixes niedostępne ({e}) - odpytywanie")
+        self._lock = threading.Lock()
+
+    def _read_text(self) -> str:
+        try:
+            return self._read() or ""
+        except Exception as e:
+            logger.debug(f"Odczyt schowka nie powiódł się: {e}")
+            return ""
+
+    def snapshot(self) -> ClipboardSnapshot:
+        """Stan schowka tuż przed symulowanym Ctrl+C."""
+        if self._notifier is not None:
+            self._notifier.drain()
+        sequence = self._sequence() if self._sequence is not None else None
+        text = "" if sequence is not None else self._read_text()
+        return ClipboardSnapshot(text, sequence, time.perf_counter())
+
+    def wait_for_change(self, before: ClipboardSnapshot, timeout: float = DEFAULT_TIMEOUT) -> CopyResult:
+        """Czeka, aż schowek zmieni się względem ``before`` (najdłużej ``timeout``)."""
+        with self._lock:
+            result = self._wait(before, timeout)
+        stats = get_latency_stats()
+        if result.changed:
+            stats.record(STATS_PROVIDER, METRIC_READY, result.latency)
+        else:
+            stats.record(STATS_PROVIDER, METRIC_TIMEOUT, result.latency)
+        return result
+
+    def _wait(self, before: ClipboardSnapshot, timeout: float) -> CopyResult:
+        deadline = before.taken_at + timeout
+        interval = POLL_START
+        # Zmiana właściciela selekcji = nowa kopia, nawet z identycznym tekstem
+        owner_changed = False
+        while True:
+            if self._sequence is not None:
+                if self._sequence() != before.sequence:
+                    return self._result(before, self._read_text(), True, "sequence")
+            else:
+                text = self._read_text()
+                if text != before.text or owner_changed:
+                    source = "xfixes" if owner_changed else "poll"
+                    return self._result(before, text, True, source)
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return self._result(before, self._read_text(), False, "timeout")
+            wait = min(interval, remaining)
+            if self._notifier is not None:
+                owner_changed = self._notifier.wait(wait)
+            else:
+                time.sleep(wait)
+            interval = min(POLL_MAX, interval * POLL_GROWTH)
+
+    @staticmethod
+    def _result(before: ClipboardSnapshot, text: str, changed: bool, source: str) -> CopyResult:
+        return CopyResult(text, time.perf_counter() - before.taken_at, changed, source)
+
+
+def histogram_summary() -> str:
+    """Histogram opóźnień gotowości schowka do logów."""
+    stats = get_latency_stats()
+    counts = stats.histogram(STATS_PROVIDER, METRIC_READY, HISTOGRAM_BOUNDS)
+    labels = [f"<{bound * 1000:.0f}ms" for bound in HISTOGRAM_BOUNDS] + [f">={HISTOGRAM_BOUNDS[-1] * 1000:.0f}ms"]
+    buckets = " ".join(f"{label}:{count}" for label, count in zip(labels, counts))
+    return f"{buckets} timeouty:{stats.count(STATS_PROVIDER, METRIC_TIMEOUT)}"
+
+
+_watcher: Optional[ClipboardWatcher] = None
+_watcher_lock = threading.Lock()
+
+
+def get_clipboard_watcher() -> ClipboardWatcher:
+    """Singleton obserwatora schowka."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = ClipboardWatcher()
+    return _watcher
+
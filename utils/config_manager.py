@@ -1,6 +1,10 @@
 import configparser
 import os
 import sys
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 # Windows-specific imports
 if sys.platform == "win32":
@@ -41,23 +45,30 @@ def get_config_value(config, section_name, key_name, fallback=''):
     # Jeśli żadna sekcja nie istnieje, zwróć fallback
     return fallback
 
+# Sekcje [PROVIDER:Nazwa] definiują dodatkowe endpointy zgodne z OpenAI
+# (np. lokalny serwer inferencji w LAN). Opcje: BaseUrl (wymagane), Model,
+# ApiKey, RequiresKey, Models (lista po przecinku), Color, Timeout, Enabled.
+PROVIDER_SECTION_PREFIX = "PROVIDER:"
+
 DEFAULT_CONFIG = {
-    "API_KEYS": {
-        "OpenAI": "",
-        "Anthropic": "",
-        "Gemini": "",
-        "DeepSeek": ""
-    },
-    "MODELS": {
-        "OpenAI": "gpt-5-mini", 
-        "Anthropic": "claude-3-7-sonnet-latest",
-        "Gemini": "gemini-2.5-flash-preview-04-17",
-        "DeepSeek": "deepseek-chat"
-    },
+    "API_KEYS": {name: "" for name in DEFAULT_MODELS},
+    "MODELS": dict(DEFAULT_MODELS),
     "SETTINGS": {
         "AutoStartup": "0",
         "DefaultStyle": "normal",
-        "HighlightDiffs": "0"
+        "HighlightDiffs": "0",
+        "PrewarmConnections": "1",
+        "ResponseCache": "1",
+        "HedgeRequests": "0",
+        "LongTextMode": "1",
+        "DisabledProviders": "",  # nazwy providerów po przecinku, bez paneli
+        "QuorumMode": "0",
+        "QuorumSize": "2",          # ilu providerów musi się zgodzić
+        "QuorumThreshold": "0.05",  # maks. znormalizowana odległość edycyjna (wyrazy)
+        "RaceMode": "0",            # pierwszy poprawny wynik wklejany od razu
+        "RaceHotkey": "",  # skrót uruchamiający wyścig, np. <ctrl>+<shift>+r (pusty = brak)
+        "ClipboardTimeoutMs": "600",  # maks. czekanie na skopiowany tekst po Ctrl+C
+        "UsePrimarySelection": "1"  # Linux: czytaj zaznaczenie PRIMARY zamiast Ctrl+C
     },
     "AI_SETTINGS": {
         "ReasoningEffort": "high",  # minimal, low, medium, high - dla modeli GPT-5
@@ -97,70 +108,71 @@ def create_default_config():
     
     return False
 
-def load_config():
-    """Ładuje konfigurację z pliku, tworząc domyślny jeśli nie istnieje."""
-    config_path = get_config_path()
-    logger.info(f"Próba załadowania konfiguracji z: {config_path}")
-    new_config = False
-    
-    if not os.path.exists(config_path):
-        logger.info(f"Plik konfiguracyjny nie znaleziono w {config_path}. Próba utworzenia domyślnego.")
-        new_config = create_default_config()
-        if not os.path.exists(config_path):
-            logger.error(
-                f"Krytyczny błąd: Plik konfiguracyjny nadal nie istnieje po próbie utworzenia: {config_path}"
-            )
-            logger.warning(
-                "Powracanie do pustej konfiguracji z powodu błędu tworzenia/ładowania configu."
-            )
-            return (
-                dict(DEFAULT_CONFIG['API_KEYS']),
-                dict(DEFAULT_CONFIG['MODELS']),
-                dict(DEFAULT_CONFIG['SETTINGS']),
-                dict(DEFAULT_CONFIG['AI_SETTINGS']),
-                new_config,
-            )
-    
-    config = configparser.ConfigParser()
-    
-    try:
-        config.read(config_path)
-        logger.info(f"Pomyślnie załadowano konfigurację z: {config_path}")
-    except Exception as e:
-        logger.error(
-            f"Błąd podczas ładowania istniejącego pliku konfiguracyjnego {config_path}: {e}",
-            exc_info=True,
-        )
-        logger.warning("Powracanie do pustej konfiguracji z powodu błędu ładowania.")
-        return (
-            dict(DEFAULT_CONFIG['API_KEYS']),
-            dict(DEFAULT_CONFIG['MODELS']),
-            dict(DEFAULT_CONFIG['SETTINGS']),
-            dict(DEFAULT_CONFIG['AI_SETTINGS']),
-            new_config,
-        )
+def _defaults_tuple():
+    return (
+        dict(DEFAULT_CONFIG['API_KEYS']),
+        dict(DEFAULT_CONFIG['MODELS']),
+        dict(DEFAULT_CONFIG['SETTINGS']),
+        dict(DEFAULT_CONFIG['AI_SETTINGS']),
+    )
+
+def _provider_sections(config):
+    """Mapuje nazwę dodatkowego providera na nazwę jego sekcji [PROVIDER:Nazwa]."""
+    sections = {}
+    prefix = PROVIDER_SECTION_PREFIX.lower()
+    for section in config.sections():
+        if section.lower().startswith(prefix):
+            name = section[len(prefix):].strip()
+            if name and name not in DEFAULT_MODELS:
+                sections[name] = section
+            elif name:
+                logger.warning(f"Sekcja [{section}] koliduje z wbudowanym providerem - pominięto")
+    return sections
+
+
+def _parse_providers(config):
+    """Opcje dodatkowych providerów: {nazwa: {opcja (małe litery): wartość}}."""
+    return {
+        name: {key: value for key, value in config.items(section)}
+        for name, section in _provider_sections(config).items()
+    }
 
-    
+
+def _parse_config(config):
+    """Wyciąga klucze API, modele, ustawienia i dodatkowych providerów ze sparsowanego ConfigParsera."""
     # Pobierz klucze API i nazwy modeli (ignorując wielkość liter w sekcjach)
     api_keys = {
-        "OpenAI": get_config_value(config, 'API_KEYS', 'OpenAI', ''),
-        "Anthropic": get_config_value(config, 'API_KEYS', 'Anthropic', ''),
-        "Gemini": get_config_value(config, 'API_KEYS', 'Gemini', ''),
-        "DeepSeek": get_config_value(config, 'API_KEYS', 'DeepSeek', '')
+        name: get_config_value(config, 'API_KEYS', name, '')
+        for name in DEFAULT_MODELS
     }
-    
     models = {
-        "OpenAI": get_config_value(config, 'MODELS', 'OpenAI', 'o4-mini'),
-        "Anthropic": get_config_value(config, 'MODELS', 'Anthropic', 'claude-3-7-sonnet-latest'),
-        "Gemini": get_config_value(config, 'MODELS', 'Gemini', 'gemini-2.5-flash-preview-04-17'),
-        "DeepSeek": get_config_value(config, 'MODELS', 'DeepSeek', 'deepseek-chat')
+        name: get_config_value(config, 'MODELS', name, default_model)
+        for name, default_model in DEFAULT_MODELS.items()
     }
-    
+
+    # Dodatkowi providerzy trzymają klucz i model we własnej sekcji
+    providers = _parse_providers(config)
+    for name, options in providers.items():
+        api_keys[name] = options.get('apikey', '')
+        models[name] = options.get('model', '')
+
     # Pobierz ustawienia
     settings = {
         "AutoStartup": get_config_value(config, 'SETTINGS', 'AutoStartup', '0'),
         "DefaultStyle": get_config_value(config, 'SETTINGS', 'DefaultStyle', 'normal'),
-        "HighlightDiffs": get_config_value(config, 'SETTINGS', 'HighlightDiffs', '0')
+        "HighlightDiffs": get_config_value(config, 'SETTINGS', 'HighlightDiffs', '0'),
+        "PrewarmConnections": get_config_value(config, 'SETTINGS', 'PrewarmConnections', '1'),
+        "ResponseCache": get_config_value(config, 'SETTINGS', 'ResponseCache', '1'),
+        "HedgeRequests": get_config_value(config, 'SETTINGS', 'HedgeRequests', '0'),
+        "LongTextMode": get_config_value(config, 'SETTINGS', 'LongTextMode', '1'),
+        "DisabledProviders": get_config_value(config, 'SETTINGS', 'DisabledProviders', ''),
+        "QuorumMode": get_config_value(config, 'SETTINGS', 'QuorumMode', '0'),
+        "QuorumSize": get_config_value(config, 'SETTINGS', 'QuorumSize', '2'),
+        "QuorumThreshold": get_config_value(config, 'SETTINGS', 'QuorumThreshold', '0.05'),
+        "RaceMode": get_config_value(config, 'SETTINGS', 'RaceMode', '0'),
+        "RaceHotkey": get_config_value(config, 'SETTINGS', 'RaceHotkey', ''),
+        "ClipboardTimeoutMs": get_config_value(config, 'SETTINGS', 'ClipboardTimeoutMs', '600'),
+        "UsePrimarySelection": get_config_value(config, 'SETTINGS', 'UsePrimarySelection', '1')
     }
 
     ai_settings_raw = {
@@ -182,11 +194,119 @@ def load_config():
         for key, value in ai_settings_raw.items()
     }
 
+    return api_keys, models, settings, ai_settings, providers
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Niezmienny widok konfiguracji (słowniki tylko do odczytu)."""
+
+    api_keys: Mapping[str, str]
+    models: Mapping[str, str]
+    settings: Mapping[str, str]
+    ai_settings: Mapping[str, str]
+    providers: Mapping[str, Mapping[str, str]]
+
+
+_snapshot: Optional[ConfigSnapshot] = None
+_snapshot_stamp = None
+_snapshot_lock = threading.Lock()
+
+
+def _file_stamp(config_path):
+    """(mtime_ns, size) pliku albo None, gdy plik nie istnieje."""
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _make_snapshot(api_keys, models, settings, ai_settings, providers=None):
+    return ConfigSnapshot(
+        MappingProxyType(dict(api_keys)),
+        MappingProxyType(dict(models)),
+        MappingProxyType(dict(settings)),
+        MappingProxyType(dict(ai_settings)),
+        MappingProxyType({
+            name: MappingProxyType(dict(options))
+            for name, options in (providers or {}).items()
+        }),
+    )
+
+
+def get_config_snapshot():
+    """Zwraca wspólny dla procesu snapshot konfiguracji.
+
+    Plik jest parsowany tylko przy pierwszym wywołaniu i gdy zmieni się jego
+    mtime lub rozmiar; w pozostałych przypadkach kosztem jest jeden ``os.stat``.
+    """
+    global _snapshot, _snapshot_stamp
+    config_path = get_config_path()
+    stamp = _file_stamp(config_path)
+    with _snapshot_lock:
+        if _snapshot is not None and stamp is not None and stamp == _snapshot_stamp:
+            return _snapshot
+
+        config = configparser.ConfigParser()
+        try:
+            config.read(config_path)
+            parsed = _parse_config(config)
+            logger.info(f"Pomyślnie załadowano konfigurację z: {config_path}")
+        except Exception as e:
+            logger.error(
+                f"Błąd podczas ładowania istniejącego pliku konfiguracyjnego {config_path}: {e}",
+                exc_info=True,
+            )
+            logger.warning("Powracanie do pustej konfiguracji z powodu błędu ładowania.")
+            parsed = _defaults_tuple()
+            stamp = None  # spróbuj ponownie przy następnym wywołaniu
+
+        _snapshot = _make_snapshot(*parsed)
+        _snapshot_stamp = stamp
+        return _snapshot
+
+
+def invalidate_config_snapshot():
+    """Wymusza ponowne sparsowanie pliku przy następnym odczycie."""
+    global _snapshot, _snapshot_stamp
+    with _snapshot_lock:
+        _snapshot = None
+        _snapshot_stamp = None
+
+
+def load_config():
+    """Ładuje konfigurację z pliku, tworząc domyślny jeśli nie istnieje.
+
+    Zwraca kopie słowników ze snapshotu, więc wywołujący może je modyfikować.
+    """
+    config_path = get_config_path()
+    new_config = False
+    
+    if not os.path.exists(config_path):
+        logger.info(f"Plik konfiguracyjny nie znaleziono w {config_path}. Próba utworzenia domyślnego.")
+        new_config = create_default_config()
+        if not os.path.exists(config_path):
+            logger.error(
+                f"Krytyczny błąd: Plik konfiguracyjny nadal nie istnieje po próbie utworzenia: {config_path}"
+            )
+            logger.warning(
+                "Powracanie do pustej konfiguracji z powodu błędu tworzenia/ładowania configu."
+            )
+            return (*_defaults_tuple(), new_config)
+    
+    snapshot = get_config_snapshot()
+    api_keys = dict(snapshot.api_keys)
+    models = dict(snapshot.models)
+    settings = dict(snapshot.settings)
+    ai_settings = dict(snapshot.ai_settings)
+
     # Logowanie wczytanych kluczy i modeli (opcjonalnie, może być zbyt szczegółowe dla INFO)
     logger.debug("Wczytano klucze API z konfiguracji")
     logger.debug(f"Wczytane modele: {models}")
     logger.debug(f"Wczytane ustawienia: {settings}")
 
+
     return api_keys, models, settings, ai_settings, new_config
 
 def save_config(api_keys, models, settings=None, ai_settings=None):
@@ -215,13 +335,19 @@ def save_config(api_keys, models, settings=None, ai_settings=None):
     if 'AI_SETTINGS' not in config:
         config['AI_SETTINGS'] = {}
     
-    # Zapisz klucze API
+    # Zapisz klucze API i modele (dodatkowi providerzy - do swoich sekcji)
+    provider_sections = _provider_sections(config)
     for key, value in api_keys.items():
-        config['API_KEYS'][key] = value
+        if key in provider_sections:
+            config[provider_sections[key]]['ApiKey'] = value
+        else:
+            config['API_KEYS'][key] = value
     
-    # Zapisz modele
     for key, value in models.items():
-        config['MODELS'][key] = value
+        if key in provider_sections:
+            config[provider_sections[key]]['Model'] = value
+        else:
+            config['MODELS'][key] = value
     
     # Zapisz ustawienia, jeśli podano
     if settings:
@@ -236,6 +362,7 @@ def save_config(api_keys, models, settings=None, ai_settings=None):
     # Zapisz do pliku
     with open(config_path, 'w') as configfile:
         config.write(configfile)
+    invalidate_config_snapshot()
     
     print(f"Zapisano konfigurację do: {config_path}")
 
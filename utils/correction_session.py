@@ -0,0 +1,245 @@
+"""Stan jednej sesji poprawiania (jedno wciśnięcie hotkeya) dla wszystkich providerów.
+
+Każdy provider ma jawny stan z historią przejść (znacznik ``perf_counter``)::
+
+    pending -> running -> streaming -> done | failed | cancelled
+    pending -> skipped                      (np. brak klucza API)
+
+Stany końcowe są ostateczne – powtórne albo spóźnione zdarzenie (np.
+``cancelled`` po "Anuluj wszystko") nie zmienia już stanu, więc metody przejść
+zwracają False i zastępują dawne guardy anty-duplikacji. Liczniki
+zakończonych i udanych zapytań są aktualizowane przy przejściu (O(1)), bez
+przeglądania treści paneli.
+
+:class:`SessionRegistry` nadaje identyfikatory i trzyma tylko ostatnie
+``retain`` sesji – starsze są usuwane przy rozpoczęciu nowej, więc pamięć nie
+rośnie przy tysiącach sesji.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+STATE_PENDING = "pending"
+STATE_RUNNING = "running"
+STATE_STREAMING = "streaming"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+STATE_SKIPPED = "skipped"
+
+TERMINAL_STATES = frozenset({STATE_DONE, STATE_FAILED, STATE_CANCELLED, STATE_SKIPPED})
+
+# Ile sesji (łącznie z bieżącą) trzyma rejestr
+RETAINED_SESSIONS = 2
+
+
+class ProviderState:
+    """Stan jednego providera w sesji."""
+
+    __slots__ = ("name", "state", "transitions", "result", "error", "elapsed",
+                 "cancel_requested", "first_token_at")
+
+    def __init__(self, name: str, now: float):
+        self.name = name
+        self.state = STATE_PENDING
+        self.transitions: List[Tuple[str, float]] = [(STATE_PENDING, now)]
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+        self.cancel_requested = False
+        self.first_token_at: Optional[float] = None
+
+    def entered(self, state: str) -> Optional[float]:
+        """Moment wejścia w stan albo None."""
+        for recorded, moment in self.transitions:
+            if recorded == state:
+                return moment
+        return None
+
+
+class CorrectionSession:
+    """Stan sesji: per-provider stany, wyniki, liczniki i znaczniki czasu.
+
+    Przejścia wykonuje wątek UI; flagi czytane z wątku silnika
+    (:meth:`is_cancelled`, :meth:`record_first_token`) są chronione blokadą.
+    """
+
+    def __init__(self, session_id: int, names: Sequence[str], text_length: int = 0,
+                 race: bool = False, hotkey_time: Optional[float] = None):
+        now = time.perf_counter()
+        self.session_id = session_id
+        self.created_at = now
+        self.finished_at: Optional[float] = None
+        self.text_length = text_length
+        self.race = race
+        self.hotkey_time = hotkey_time
+        self.providers = [ProviderState(name, now) for name in names]
+        # Udane wyniki (idx -> tekst); akcje z menu panelu mogą je podmieniać
+        self.results: Dict[int, str] = {}
+        self.finished_count = 0
+        self.failed_count = 0
+        self.cancelled_count = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------- odczyt
+    def __len__(self) -> int:
+        return len(self.providers)
+
+    def state(self, idx: int) -> str:
+        return self.providers[idx].state
+
+    def is_terminal(self, idx: int) -> bool:
+        return self.providers[idx].state in TERMINAL_STATES
+
+    def is_cancelled(self, idx: int) -> bool:
+        """Czy fragmenty tego providera należy już ignorować (dowolny wątek)."""
+        provider = self.providers[idx]
+        return provider.cancel_requested or provider.state == STATE_CANCELLED
+
+    @property
+    def success_count(self) -> int:
+        return len(self.results)
+
+    @property
+    def all_finished(self) -> bool:
+        return self.finished_count >= len(self.providers)
+
+    @property
+    def not_started(self) -> bool:
+        """Sesja przygotowana, ale żadne zapytanie jeszcze nie wystartowało."""
+        return all(provider.state == STATE_PENDING for provider in self.providers)
+
+    def has_streamed(self, idx: int) -> bool:
+        """Czy panel dostał już fragmenty strumienia."""
+        return self.providers[idx].entered(STATE_STREAMING) is not None
+
+    def active_indices(self) -> List[int]:
+        return [idx for idx, provider in enumerate(self.providers) if provider.state not in TERMINAL_STATES]
+
+    # ----------------------------------------------------------- przejścia
+    def _transition(self, idx: int, state: str) -> bool:
+        provider = self.providers[idx]
+        if provider.state in TERMINAL_STATES or provider.state == state:
+            return False
+        now = time.perf_counter()
+        provider.state = state
+        provider.transitions.append((state, now))
+        if state in TERMINAL_STATES:
+            self.finished_count += 1
+            if state == STATE_FAILED:
+                self.failed_count += 1
+            elif state == STATE_CANCELLED:
+                self.cancelled_count += 1
+            if self.all_finished:
+                self.finished_at = now
+        return True
+
+    def start(self, idx: int) -> bool:
+        """Zapytanie wysłane do silnika."""
+        return self._transition(idx, STATE_RUNNING)
+
+    def mark_streaming(self, idx: int) -> bool:
+        """Pierwszy fragment dotarł do panelu; True tylko za pierwszym razem."""
+        if self.providers[idx].state not in (STATE_PENDING, STATE_RUNNING):
+            return False
+        return self._transition(idx, STATE_STREAMING)
+
+    def record_first_token(self, idx: int) -> bool:
+        """Zapisuje czas pierwszego tokenu (wątek silnika); True tylko za pierwszym razem."""
+        provider = self.providers[idx]
+        with self._lock:
+            if provider.first_token_at is not None:
+                return False
+            provider.first_token_at = time.perf_counter()
+        return True
+
+    def complete(self, idx: int, result: str, elapsed: float = 0.0) -> bool:
+        if not self._transition(idx, STATE_DONE):
+            return False
+        provider = self.providers[idx]
+        provider.result = result
+        provider.elapsed = elapsed
+        self.results[idx] = result
+        return True
+
+    def fail(self, idx: int, message: str) -> bool:
+        if not self._transition(idx, STATE_FAILED):
+            return False
+        self.providers[idx].error = message
+        return True
+
+    def skip(self, idx: int, message: str) -> bool:
+        if not self._transition(idx, STATE_SKIPPED):
+            return False
+        self.providers[idx].error = message
+        return True
+
+    def request_cancel(self, idx: int) -> None:
+        """Od teraz ignoruj fragmenty providera; stan końcowy ustawi zdarzenie ``cancelled``."""
+        with self._lock:
+            self.providers[idx].cancel_requested = True
+
+    def cancel(self, idx: int) -> bool:
+        self.request_cancel(idx)
+        return self._transition(idx, STATE_CANCELLED)
+
+    def cancel_all(self) -> List[int]:
+        """Kończy wszystkie niezakończone zapytania jako anulowane; zwraca ich indeksy."""
+        cancelled = self.active_indices()
+        for idx in cancelled:
+            self.cancel(idx)
+        return cancelled
+
+    # ------------------------------------------------ wyniki akcji z menu
+    def replace_result(self, idx: int, result: str) -> None:
+        """Wynik akcji z menu panelu zastępuje poprawkę (stan bez zmian)."""
+        self.results[idx] = result
+
+    def clear_result(self, idx: int) -> None:
+        self.results.pop(idx, None)
+
+    def describe(self) -> str:
+        """Krótki opis do logów."""
+        duration = ((self.finished_at or time.perf_counter()) - self.created_at) * 1000
+        return (
+            f"sesja {self.session_id}: {self.success_count} wyników, "
+            f"{self.failed_count} błędów, {self.cancelled_count} anulowanych, "
+            f"{self.finished_count}/{len(self.providers)} zakończonych w {duration:.0f} ms"
+        )
+
+
+class SessionRegistry:
+    """Nadaje identyfikatory sesji i trzyma tylko ``retain`` ostatnich."""
+
+    def __init__(self, retain: int = RETAINED_SESSIONS):
+        self._retain = max(1, retain)
+        self._sessions: "OrderedDict[int, CorrectionSession]" = OrderedDict()
+        self._last_id = 0
+        self.evicted = 0
+
+    @property
+    def current(self) -> Optional[CorrectionSession]:
+        return self._sessions.get(self._last_id)
+
+    @property
+    def current_id(self) -> int:
+        return self._last_id
+
+    def begin(self, names: Sequence[str], **kwargs) -> CorrectionSession:
+        """Tworzy nową sesję i usuwa najstarsze ponad limit."""
+        self._last_id += 1
+        session = CorrectionSession(self._last_id, names, **kwargs)
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self._retain:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        return session
+
+    def get(self, session_id: int) -> Optional[CorrectionSession]:
+        return self._sessions.get(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
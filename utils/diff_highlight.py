@@ -0,0 +1,129 @@
+"""Wyznaczanie fragmentów poprawionego tekstu do podświetlenia (różnice słów).
+
+Dwa tryby:
+- :func:`changed_spans` – pełny diff słów oryginału i poprawki (po zakończeniu),
+- :class:`IncrementalDiffHighlighter` – przyrostowe dopasowanie strumienia do
+  oryginału: każdy nowy, kompletny wyraz jest porównywany z oryginałem wokół
+  kursora, więc koszt rozkłada się na cały strumień, a UI taguje tylko nowy
+  fragment.
+
+Zakresy to pary (początek, koniec) w znakach względem początku poprawionego tekstu.
+"""
+
+import bisect
+import re
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from .word_diff import WordMatcher
+
+WORD_PATTERN = re.compile(r"\S+")
+
+# Jak daleko od kursora szukamy wyrazu unikalnego w oryginale (kotwica)
+# i wyrazu powtarzającego się (np. "i", "w") – ten drugi łatwo dopasować źle.
+ANCHOR_LOOKAHEAD = 64
+COMMON_LOOKAHEAD = 4
+# Limit (suma długości obu tekstów) dla pełnej rekonsyliacji po zakończeniu strumienia
+RECONCILE_MAX_CHARS = 40000
+
+Span = Tuple[int, int]
+
+
+def tokenize(text: str) -> List[str]:
+    return [m.group() for m in WORD_PATTERN.finditer(text)]
+
+
+def changed_spans(original: str, corrected: str) -> List[Span]:
+    """Zakresy wyrazów wstawionych/zamienionych w ``corrected`` względem ``original``."""
+    orig_tokens = tokenize(original)
+    corr_matches = list(WORD_PATTERN.finditer(corrected))
+    if not orig_tokens or not corr_matches:
+        return []
+    corr_tokens = [m.group() for m in corr_matches]
+    matcher = WordMatcher(orig_tokens, corr_tokens)
+    spans = []
+    for tag, _i1, _i2, j1, j2 in matcher.get_opcodes():
+        if tag not in ("replace", "insert") or j1 == j2:
+            continue
+        spans.append((corr_matches[j1].start(), corr_matches[j2 - 1].end()))
+    return spans
+
+
+def can_reconcile(original: str, corrected: str, max_chars: int = RECONCILE_MAX_CHARS) -> bool:
+    """Czy pełny diff po zakończeniu strumienia mieści się w budżecie."""
+    return len(original) + len(corrected) <= max_chars
+
+
+class IncrementalDiffHighlighter:
+    """Przyrostowe dopasowanie strumienia poprawki do oryginału.
+
+    ``feed(delta)`` zwraca zakresy do podświetlenia wyłącznie dla wyrazów, które
+    w tym fragmencie stały się kompletne (ostatni wyraz bez następującego po nim
+    białego znaku czeka na kolejny fragment albo na :meth:`finish`).
+    """
+
+    def __init__(self, original: str):
+        self._original = tokenize(original)
+        self._positions: Dict[str, List[int]] = defaultdict(list)
+        for position, token in enumerate(self._original):
+            self._positions[token].append(position)
+        self._cursor = 0
+        self._pending = ""
+        self._pending_offset = 0
+        self._last_changed_end = None
+        self.tokens_seen = 0
+        self.tokens_changed = 0
+
+    def _match(self, token: str) -> bool:
+        positions = self._positions.get(token)
+        if not positions:
+            return False
+        found = bisect.bisect_left(positions, self._cursor)
+        if found == len(positions):
+            return False
+        lookahead = ANCHOR_LOOKAHEAD if len(positions) == 1 else COMMON_LOOKAHEAD
+        if positions[found] - self._cursor > lookahead:
+            return False
+        self._cursor = positions[found] + 1
+        return True
+
+    def _consume(self, matches: Sequence["re.Match"]) -> List[Span]:
+        spans: List[Span] = []
+        for match in matches:
+            start = self._pending_offset + match.start()
+            end = self._pending_offset + match.end()
+            self.tokens_seen += 1
+            if self._match(match.group()):
+                self._last_changed_end = None
+                continue
+            self.tokens_changed += 1
+            # Sąsiednie zmienione wyrazy tworzą jeden ciągły zakres (ze spacjami)
+            if self._last_changed_end is not None:
+                start = self._last_changed_end
+            spans.append((start, end))
+            self._last_changed_end = end
+        return spans
+
+    def feed(self, delta: str) -> List[Span]:
+        """Przyjmuje kolejny fragment strumienia; zwraca nowe zakresy do otagowania."""
+        if not delta:
+            return []
+        self._pending += delta
+        matches = list(WORD_PATTERN.finditer(self._pending))
+        if matches and matches[-1].end() == len(self._pending):
+            matches.pop()  # wyraz może być jeszcze niedokończony
+        if not matches:
+            return []
+        spans = self._consume(matches)
+        cut = matches[-1].end()
+        self._pending = self._pending[cut:]
+        self._pending_offset += cut
+        return spans
+
+    def finish(self) -> List[Span]:
+        """Domyka strumień – dopasowuje ostatni, wstrzymany wyraz."""
+        spans = self._consume(list(WORD_PATTERN.finditer(self._pending)))
+        self._pending_offset += len(self._pending)
+        self._pending = ""
+        return spans
+
@@ -0,0 +1,182 @@
+"""Wspólna, ograniczona pula wątków dla pracy w tle (poza zapytaniami do API).
+
+Zapytania do providerów obsługuje pętla asyncio silnika (``api_clients.engine``);
+tutaj trafia reszta: wklejanie wyniku, odświeżanie list modeli, konfiguracja
+hotkeya. Zamiast osobnego ``threading.Thread`` na każdą czynność:
+
+- pula ma stały rozmiar i nazwane wątki (``poprawiacz-worker_N``),
+- zadania można grupować (:class:`TaskGroup`) – nowa grupa o tej samej nazwie
+  anuluje poprzednią (np. zadania zastąpionej sesji), a zadania czekające w
+  kolejce w ogóle nie startują,
+- liczniki (kolejka, aktywne, szczyt kolejki) są dostępne do logów.
+
+Pętle działające przez cały czas życia aplikacji (np. ikona w trayu) nie mogą
+blokować workera, więc dostają własny nazwany wątek przez
+:meth:`BackgroundExecutor.start_service` – i też są widoczne w statystykach.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .logger import logger
+
+DEFAULT_MAX_WORKERS = 4
+THREAD_NAME_PREFIX = "poprawiacz-worker"
+
+
+class TaskGroup:
+    """Zadania jednej sesji/okna, anulowane razem.
+
+    ``cancel()`` anuluje zadania z kolejki i ustawia :attr:`cancel_event`, które
+    zadania już działające mogą sprawdzać przed dotknięciem UI.
+    """
+
+    def __init__(self, executor: "BackgroundExecutor", name: str):
+        self._executor = executor
+        self.name = name
+        self.cancel_event = threading.Event()
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """Zgłasza zadanie w ramach grupy; None gdy grupa jest już anulowana."""
+        if self.cancelled:
+            return None
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()]
+            self._futures.append(future)
+        return future
+
+    def cancel(self) -> int:
+        """Anuluje grupę; zwraca liczbę zadań zdjętych z kolejki."""
+        self.cancel_event.set()
+        with self._lock:
+            futures, self._futures = self._futures, []
+        dropped = sum(1 for future in futures if future.cancel())
+        if dropped:
+            logger.debug(f"Executor: grupa '{self.name}' - anulowano {dropped} zadań z kolejki")
+        return dropped
+
+
+class BackgroundExecutor:
+    """Ograniczona pula wątków z metrykami i grupami zadań."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=THREAD_NAME_PREFIX)
+        self._lock = threading.Lock()
+        self._groups: Dict[str, TaskGroup] = {}
+        self._services: Dict[str, threading.Thread] = {}
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.peak_queued = 0
+
+    # ---------------------------------------------------------------- metryki
+    @property
+    def queued(self) -> int:
+        """Zadania zgłoszone, ale jeszcze nie rozpoczęte (głębokość kolejki)."""
+        with self._lock:
+            return self.submitted - self.started - self.cancelled
+
+    @property
+    def active(self) -> int:
+        with self._lock:
+            return self.started - self.completed - self.failed
+
+    def stats_summary(self) -> str:
+        with self._lock:
+            services = sum(1 for thread in self._services.values() if thread.is_alive())
+            return (
+                f"workery={self.max_workers} aktywne={self.started - self.completed - self.failed} "
+                f"kolejka={self.submitted - self.started - self.cancelled} (szczyt {self.peak_queued}) "
+                f"zgłoszone={self.submitted} ukończone={self.completed} błędy={self.failed} "
+                f"anulowane={self.cancelled} usługi={services}"
+            )
+
+    # ------------------------------------------------------------------- API
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Zgłasza zadanie do puli (dowolny wątek)."""
+        def run():
+            with self._lock:
+                self.started += 1
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    self.failed += 1
+                logger.error(f"Executor: zadanie {getattr(fn, '__name__', fn)} zakończone błędem", exc_info=True)
+                raise
+            with self._lock:
+                self.completed += 1
+            return result
+
+        with self._lock:
+            self.submitted += 1
+            self.peak_queued = max(self.peak_queued, self.submitted - self.started - self.cancelled)
+        future = self._pool.submit(run)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self.cancelled += 1
+
+    def task_group(self, name: str) -> TaskGroup:
+        """Nowa grupa zadań; poprzednia grupa o tej nazwie jest anulowana."""
+        group = TaskGroup(self, name)
+        with self._lock:
+            previous = self._groups.get(name)
+            self._groups[name] = group
+        if previous is not None:
+            previous.cancel()
+        return group
+
+    def start_service(self, name: str, fn: Callable, *args) -> threading.Thread:
+        """Uruchamia pętlę działającą przez cały czas życia aplikacji na własnym wątku."""
+        thread = threading.Thread(target=fn, args=args, name=f"poprawiacz-{name}", daemon=True)
+        with self._lock:
+            self._services[name] = thread
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        """Anuluje grupy i zadania z kolejki; nie czeka na działające zadania."""
+        with self._lock:
+            groups = list(self._groups.values())
+            self._groups.clear()
+        for group in groups:
+            group.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"Executor zamknięty: {self.stats_summary()}")
+
+
+_executor: Optional[BackgroundExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> BackgroundExecutor:
+    """Singleton puli wątków w tle."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = BackgroundExecutor()
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Zamyka pulę (przy wyjściu z aplikacji)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
@@ -1,9 +1,12 @@
 import queue
 import threading
 import time
-from typing import Optional, Callable
+from functools import partial
+from typing import Dict, Optional, Callable
 from pynput import keyboard
+from .clipboard_watch import DEFAULT_TIMEOUT, CopyResult, get_clipboard_watcher
 from .logger import logger
+from .primary_selection import get_primary_selection_reader
 
 
 class ThreadSafeHotkeyProcessor:
@@ -17,9 +20,22 @@ class ThreadSafeHotkeyProcessor:
         self.worker_thread: Optional[threading.Thread] = None
         self.hotkeys: Optional[keyboard.GlobalHotKeys] = None
         self.main_window_callback: Optional[Callable] = None
+        # Wołany natychmiast po wykryciu hotkeya (np. prewarm połączeń do API),
+        # równolegle z kopiowaniem schowka
+        self.hotkey_detected_callback: Optional[Callable] = None
+        self.last_hotkey_time: Optional[float] = None
+        # Tryb ostatniego hotkeya (None = zwykły, np. "race" = tryb wyścigu)
+        self.last_hotkey_mode: Optional[str] = None
+        # Dodatkowe skróty: kombinacja pynput -> tryb przetwarzania
+        self.mode_hotkeys: Dict[str, str] = {}
         self.hotkey_registered = False
         self.running = False
-        self.clipboard_processing_delay: Optional[float] = 0.4  # seconds
+        # Maks. czas oczekiwania na pojawienie się skopiowanego tekstu w schowku
+        self.clipboard_timeout: float = DEFAULT_TIMEOUT  # seconds
+        # Wynik ostatniego symulowanego Ctrl+C (tekst, opóźnienie, czy schowek się zmienił)
+        self.last_copy: Optional[CopyResult] = None
+        # Linux: najpierw zaznaczenie PRIMARY (bez Ctrl+C i bez nadpisywania schowka)
+        self.use_primary_selection = True
         
     def start_worker(self):
         """Uruchamia worker thread dla przetwarzania queue."""
@@ -60,11 +76,21 @@ class ThreadSafeHotkeyProcessor:
     
     def _safe_simulate_copy(self):
         """
-        Bezpieczna symulacja Ctrl+C z lepszym timing.
-        Zwiększony czas oczekiwania z 0.1s na 0.3s dla pewności aktualizacji schowka.
+        Bezpieczna symulacja Ctrl+C - wraca, gdy tylko schowek się zmieni
+        (migawka przed naciśnięciem, limit ``clipboard_timeout``).
+        Na Linuksie najpierw próbuje aktualnego zaznaczenia PRIMARY.
         """
         try:
+            primary = get_primary_selection_reader() if self.use_primary_selection else None
+            if primary is not None and primary.available:
+                self.last_copy = primary.read()
+                if self.last_copy is not None:
+                    logger.debug(f"PRIMARY selection used: {self.last_copy.latency * 1000:.0f} ms")
+                    return
+
             logger.debug("Simulating Ctrl+C...")
+            watcher = get_clipboard_watcher()
+            before = watcher.snapshot()
             controller = keyboard.Controller()
 
             controller.press(keyboard.Key.ctrl)
@@ -72,10 +98,13 @@ class ThreadSafeHotkeyProcessor:
             controller.release('c')
             controller.release(keyboard.Key.ctrl)
             
-            # Zwiększony timing dla pewności kopiowania
-            time.sleep(0.3)  # Zmienione z 0.1s na 0.3s
-            
-            logger.debug("Ctrl+C simulation completed")
+            self.last_copy = watcher.wait_for_change(before, self.clipboard_timeout)
+            if primary is not None and primary.available:
+                primary.remember(self.last_copy.text)
+            logger.debug(
+                f"Ctrl+C simulation completed: {self.last_copy.latency * 1000:.0f} ms "
+                f"({self.last_copy.source})"
+            )
             
         except Exception as e:
             logger.error(f"Copy simulation error: {e}", exc_info=True)
@@ -94,33 +123,34 @@ class ThreadSafeHotkeyProcessor:
         except Exception as e:
             logger.error(f"Clipboard processing error: {e}", exc_info=True)
     
-    def on_hotkey(self):
+    def on_hotkey(self, mode: Optional[str] = None):
         """
         Callback wywołany przez pynput przy wykryciu hotkey.
         Non-blocking operation - dodaje komendy do queue.
         """
         try:
-            logger.info("Global hotkey Ctrl+Shift+C detected (pynput)")
+            logger.info(f"Global hotkey detected (pynput, tryb: {mode or 'zwykły'})")
+            self.last_hotkey_time = time.perf_counter()
+            self.last_hotkey_mode = mode
+            self.last_copy = None
             
-            # Dodaj komendy do queue (non-blocking)
-            self.command_queue.put(("simulate_copy", None))
+            # Sieć jest bezczynna podczas kopiowania - od razu otwieramy połączenia
+            if self.hotkey_detected_callback:
+                try:
+                    self.hotkey_detected_callback()
+                except Exception as e:
+                    logger.warning(f"Hotkey detected callback error: {e}")
             
-            # Zaplanuj przetwarzanie schowka z opóźnieniem
-            # Używamy threading.Timer zamiast QTimer (bo jesteśmy poza Qt thread)
-            delay = self.clipboard_processing_delay
-            if delay is None or delay <= 0:
-                logger.debug("Clipboard delay disabled -> scheduling immediate processing")
-                self._schedule_clipboard_processing()
-            else:
-                clipboard_timer = threading.Timer(delay, self._schedule_clipboard_processing)
-                clipboard_timer.daemon = True
-                clipboard_timer.start()
+            # Dodaj komendy do queue (non-blocking); worker przetwarza schowek
+            # zaraz po tym, jak kopiowanie trafi do schowka
+            self.command_queue.put(("simulate_copy", None))
+            self._schedule_clipboard_processing()
             
         except Exception as e:
             logger.error(f"Hotkey callback error: {e}", exc_info=True)
     
     def _schedule_clipboard_processing(self):
-        """Planuje przetwarzanie schowka z opóźnieniem."""
+        """Planuje przetwarzanie schowka po kopiowaniu."""
         try:
             self.command_queue.put(("process_clipboard", None))
         except Exception as e:
@@ -153,9 +183,7 @@ class ThreadSafeHotkeyProcessor:
             True jeśli sukces, False jeśli failure
         """
         try:
-            self.hotkeys = keyboard.GlobalHotKeys({
-                '<ctrl>+<shift>+c': self.on_hotkey
-            })
+            self.hotkeys = keyboard.GlobalHotKeys(self._hotkey_map('<ctrl>+<shift>+c'))
             self.hotkeys.start()
             self.hotkey_registered = True
             logger.info("Global hotkey Ctrl+Shift+C registered successfully (pynput)")
@@ -183,7 +211,7 @@ class ThreadSafeHotkeyProcessor:
                 if self.hotkeys:
                     self.hotkeys.stop()
                     
-                self.hotkeys = keyboard.GlobalHotKeys({hotkey: self.on_hotkey})
+                self.hotkeys = keyboard.GlobalHotKeys(self._hotkey_map(hotkey))
                 self.hotkeys.start()
                 self.hotkey_registered = True
                 
@@ -198,6 +226,31 @@ class ThreadSafeHotkeyProcessor:
         logger.error("Failed to register any hotkey - manual mode required")
         return False
     
+    def add_mode_hotkey(self, hotkey: str, mode: str) -> bool:
+        """
+        Dodaje skrót uruchamiający przetwarzanie w danym trybie (przed setup).
+
+        Returns:
+            True jeśli kombinacja jest poprawna dla pynput
+        """
+        try:
+            keyboard.HotKey.parse(hotkey)
+        except ValueError as e:
+            logger.warning(f"Invalid hotkey '{hotkey}' for mode {mode}: {e}")
+            return False
+        self.mode_hotkeys[hotkey] = mode
+        return True
+
+    def _hotkey_map(self, primary: str) -> Dict[str, Callable]:
+        """Mapa dla GlobalHotKeys: główny skrót + skróty trybów."""
+        hotkeys = {
+            hotkey: partial(self.on_hotkey, mode)
+            for hotkey, mode in self.mode_hotkeys.items()
+            if hotkey != primary
+        }
+        hotkeys[primary] = self.on_hotkey
+        return hotkeys
+
     def _notify_hotkey_change(self, hotkey_combo: str):
         """
         Notyfikuje o zmianie hotkey (będzie implementowane w main_window).
@@ -206,21 +259,24 @@ class ThreadSafeHotkeyProcessor:
         logger.info(f"Hotkey changed to: {hotkey_combo}")
         # TODO: Implement Qt notification in main window
 
-    def set_clipboard_delay(self, delay_seconds: Optional[float]):
-        """Ustawia opóźnienie przed przetwarzaniem schowka."""
-        if delay_seconds is None:
-            self.clipboard_processing_delay = None
-            logger.info("Clipboard processing delay disabled - processing immediately")
+    def set_hotkey_detected_callback(self, callback: Optional[Callable]):
+        """Ustawia callback wołany od razu po wykryciu hotkeya (musi być nieblokujący)."""
+        self.hotkey_detected_callback = callback
+
+    def set_clipboard_timeout(self, timeout_seconds: Optional[float]):
+        """Ustawia maks. czas oczekiwania na skopiowany tekst (None = domyślny)."""
+        if timeout_seconds is None:
+            self.clipboard_timeout = DEFAULT_TIMEOUT
             return
 
         try:
-            delay_seconds = max(0.0, float(delay_seconds))
+            timeout_seconds = max(0.0, float(timeout_seconds))
         except (TypeError, ValueError):
-            logger.warning("Invalid clipboard delay value: %s", delay_seconds)
+            logger.warning("Invalid clipboard timeout value: %s", timeout_seconds)
             return
 
-        self.clipboard_processing_delay = delay_seconds
-        logger.info("Clipboard processing delay set to %.3fs", self.clipboard_processing_delay)
+        self.clipboard_timeout = timeout_seconds
+        logger.info("Clipboard readiness timeout set to %.3fs", self.clipboard_timeout)
     
     def cleanup(self):
         """Cleanup resources przy zamykaniu aplikacji."""
@@ -0,0 +1,148 @@
+"""Budżet czasu importu punktów wejścia (``python -X importtime``).
+
+Każdy punkt wejścia importujemy w świeżym interpreterze z ``-X importtime`` i
+sprawdzamy dwie rzeczy:
+
+- żaden ciężki moduł z :data:`DEFERRED_MODULES` (SDK providerów, pystray,
+  keyboard) nie ładuje się przy starcie – mają się importować dopiero przy
+  pierwszym użyciu,
+- łączny czas importu nie przekracza budżetu z :data:`BUDGETS_MS`.
+
+Uruchomienie (kod wyjścia 1 = regresja)::
+
+    python -m utils.import_budget
+    python -m utils.import_budget --budget-ms 800 api_clients.registry
+
+Czasy zależą od maszyny i ciepłego cache dysku – budżety mają zapas, a
+każdy punkt wejścia jest mierzony kilka razy (bierzemy najlepszy wynik).
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Punkt wejścia -> budżet łącznego czasu importu (ms)
+BUDGETS_MS: Dict[str, float] = {
+    "main_corrector": 1500.0,
+    "api_clients.registry": 400.0,
+}
+DEFERRED_MODULES = (
+    "openai",
+    "anthropic",
+    "google.genai",
+    "google.generativeai",
+    "pystray",
+    "keyboard",
+)
+DEFAULT_RUNS = 3
+REPORT_SLOWEST = 8
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    total_ms: float = 0.0
+    loaded: List[str] = field(default_factory=list)
+    # Bezpośrednie importy punktu wejścia: (moduł, skumulowany czas ms)
+    direct: List[Tuple[str, float]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def deferred_loaded(self) -> List[str]:
+        loaded = set(self.loaded)
+        return [name for name in DEFERRED_MODULES if name in loaded]
+
+    def slowest(self, count: int = REPORT_SLOWEST) -> List[Tuple[str, float]]:
+        return sorted(self.direct, key=lambda item: -item[1])[:count]
+
+
+def parse_importtime(module: str, stderr: str) -> ImportProfile:
+    """Wynik ``-X importtime`` -> suma czasów, lista modułów, bezpośrednie importy.
+
+    Linie są w kolejności post-order (dzieci przed rodzicem), więc importy
+    drugiego poziomu zbieramy, aż pojawi się ich moduł najwyższego poziomu.
+    """
+    profile = ImportProfile(module)
+    entry_packages = {".".join(module.split(".")[:depth]) for depth in range(1, module.count(".") + 2)}
+    total_us = 0
+    pending: List[Tuple[str, float]] = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        total_us += int(self_us)
+        profile.loaded.append(name)
+        if len(indent) == 3:
+            pending.append((name, int(cumulative_us) / 1000))
+        elif len(indent) == 1:
+            if name in entry_packages:
+                profile.direct.extend(pending)
+            pending = []
+    profile.total_ms = total_us / 1000
+    return profile
+
+
+def profile_import(module: str, python: str = sys.executable) -> ImportProfile:
+    """Importuje ``module`` w świeżym interpreterze i zwraca profil importu."""
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    profile = parse_importtime(module, completed.stderr)
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        profile.error = errors[-1] if errors else f"kod wyjścia {completed.returncode}"
+    return profile
+
+
+def check(modules: Sequence[str], budget_ms: Optional[float] = None, runs: int = DEFAULT_RUNS) -> bool:
+    """Mierzy punkty wejścia i wypisuje raport; False przy regresji."""
+    ok = True
+    for module in modules:
+        budget = budget_ms if budget_ms is not None else BUDGETS_MS.get(module)
+        profiles = [profile_import(module) for _ in range(max(1, runs))]
+        profile = min(profiles, key=lambda p: p.total_ms)
+        if profile.error:
+            print(f"✗ {module}: import nie powiódł się ({profile.error})")
+            ok = False
+            continue
+
+        problems = []
+        deferred = profile.deferred_loaded()
+        if deferred:
+            problems.append(f"ładuje przy starcie: {', '.join(deferred)}")
+        if budget is not None and profile.total_ms > budget:
+            problems.append(f"{profile.total_ms:.0f} ms > budżet {budget:.0f} ms")
+
+        budget_text = f" / {budget:.0f} ms" if budget is not None else ""
+        status = "✗" if problems else "✓"
+        print(f"{status} {module}: {profile.total_ms:.0f} ms{budget_text}, {len(profile.loaded)} modułów")
+        for name, cumulative in profile.slowest():
+            print(f"    {cumulative:>8.1f} ms  {name}")
+        for problem in problems:
+            print(f"    ! {problem}")
+        ok = ok and not problems
+    return ok
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Budżet czasu importu punktów wejścia")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS_MS), help="moduły do sprawdzenia")
+    parser.add_argument("--budget-ms", type=float, default=None, help="budżet dla wszystkich modułów")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="pomiary na moduł (najlepszy wygrywa)")
+    args = parser.parse_args(argv)
+    return 0 if check(args.modules, args.budget_ms, args.runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Pomiary opóźnień zapytań do API (czas do pierwszego tokenu, czas całkowity).
+
+Trzyma ostatnie próbki per (provider, metryka) w pamięci procesu – wystarcza do
+logowania porównań (np. z prewarmem i bez) i do wyliczania percentyli.
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from .logger import logger
+
+# Ile ostatnich próbek trzymamy dla każdej pary (provider, metryka)
+MAX_SAMPLES = 200
+
+
+class LatencyStats:
+    """Bezpieczny wątkowo rejestr próbek opóźnień."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self._max_samples = max_samples
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, metric: str, seconds: float) -> None:
+        """Zapisuje próbkę (w sekundach)."""
+        with self._lock:
+            samples = self._samples.get((provider, metric))
+            if samples is None:
+                samples = deque(maxlen=self._max_samples)
+                self._samples[(provider, metric)] = samples
+            samples.append(float(seconds))
+        logger.debug(f"Latency {provider}/{metric}: {seconds * 1000:.0f} ms")
+
+    def count(self, provider: str, metric: str) -> int:
+        with self._lock:
+            return len(self._samples.get((provider, metric), ()))
+
+    def percentile(self, provider: str, metric: str, pct: float) -> Optional[float]:
+        """Zwraca percentyl ``pct`` (0-100) albo None gdy brak próbek."""
+        with self._lock:
+            samples = sorted(self._samples.get((provider, metric), ()))
+        if not samples:
+            return None
+        rank = (len(samples) - 1) * max(0.0, min(100.0, pct)) / 100.0
+        lower = int(rank)
+        upper = min(lower + 1, len(samples) - 1)
+        return samples[lower] + (samples[upper] - samples[lower]) * (rank - lower)
+
+    def histogram(self, provider: str, metric: str, bounds: Sequence[float]) -> List[int]:
+        """Liczba próbek w przedziałach [..b0), [b0..b1), ..., [bn..) - len(bounds) + 1 liczb."""
+        with self._lock:
+            samples = list(self._samples.get((provider, metric), ()))
+        counts = [0] * (len(bounds) + 1)
+        for sample in samples:
+            counts[bisect.bisect_right(bounds, sample)] += 1
+        return counts
+
+    def summary(self, provider: str, metric: str) -> str:
+        """Krótki opis do logów: liczba próbek, p50 i p95 w ms."""
+        p50 = self.percentile(provider, metric, 50)
+        if p50 is None:
+            return f"{provider}/{metric}: brak próbek"
+        p95 = self.percentile(provider, metric, 95)
+        return (
+            f"{provider}/{metric}: n={self.count(provider, metric)} "
+            f"p50={p50 * 1000:.0f} ms p95={p95 * 1000:.0f} ms"
+        )
+
+
+_stats: Optional[LatencyStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_latency_stats() -> LatencyStats:
+    """Singleton rejestru opóźnień."""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = LatencyStats()
+    return _stats
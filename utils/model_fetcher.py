@@ -1,24 +1,34 @@
 """
 Model fetcher - pobiera listy dostępnych modeli z API providers
+
+SDK providerów (openai, anthropic, google-genai, google.generativeai) są
+importowane dopiero przy pobieraniu listy modeli (okno ustawień), nie przy
+starcie aplikacji.
 """
 import asyncio
 import os
 import time
 import logging
-from typing import List, Dict, Optional
-import openai
-import anthropic
+from typing import Awaitable, Callable, Dict, List, Optional
 import httpx
 
-try:  # Prefer new google-genai SDK for model listing when available
-    from google import genai as modern_genai  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    modern_genai = None
 
-try:
-    import google.generativeai as legacy_genai  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    legacy_genai = None
+def _modern_genai():
+    """Nowe SDK google-genai (preferowane do listy modeli) albo None."""
+    try:
+        from google import genai  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    return genai
+
+
+def _legacy_genai():
+    """Stare SDK google.generativeai albo None."""
+    try:
+        import google.generativeai as genai  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    return genai
 
 
 class ModelCache:
@@ -87,6 +97,8 @@ FALLBACK_MODELS = {
 async def fetch_openai_models(api_key: str) -> List[str]:
     """Pobiera listę modeli OpenAI."""
     try:
+        import openai
+
         client = openai.AsyncOpenAI(api_key=api_key, timeout=5.0)
         response = await client.models.list()
         
@@ -121,6 +133,8 @@ async def fetch_openai_models(api_key: str) -> List[str]:
 async def fetch_anthropic_models(api_key: str) -> List[str]:
     """Pobiera listę modeli Anthropic."""
     try:
+        import anthropic
+
         client = anthropic.AsyncAnthropic(api_key=api_key, timeout=5.0)
         
         # Anthropic nie ma publicznego endpoints dla list models jeszcze
@@ -156,6 +170,7 @@ async def fetch_gemini_models(api_key: str) -> List[str]:
         return sorted_models[:15] if sorted_models else FALLBACK_MODELS["Gemini"]
 
     # Prefer modern google-genai when dostępne
+    modern_genai = _modern_genai()
     if modern_genai is not None:
         try:
             modern_client = modern_genai.Client(api_key=api_key)
@@ -190,6 +205,7 @@ async def fetch_gemini_models(api_key: str) -> List[str]:
         except Exception as modern_error:
             logging.warning(f"Modern Gemini SDK list failed, fallback to legacy: {modern_error}")
 
+    legacy_genai = _legacy_genai()
     if legacy_genai is not None:
         try:
             legacy_genai.configure(api_key=api_key)
@@ -252,16 +268,49 @@ async def fetch_deepseek_models(api_key: str) -> List[str]:
         return FALLBACK_MODELS["DeepSeek"]
 
 
-async def fetch_models_for_provider(provider: str, api_key: str) -> List[str]:
-    """Pobiera modele dla konkretnego providera."""
+async def fetch_openai_compatible_models(base_url: str, api_key: str) -> List[str]:
+    """Pobiera listę modeli z endpointu zgodnego z OpenAI (GET {base_url}/models)."""
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        response = await client.get(f"{base_url.rstrip('/')}/models", headers=headers)
+        response.raise_for_status()
+        data = response.json()
+    return sorted(model["id"] for model in data.get("data", []) if model.get("id"))
+
+
+MODEL_LISTERS = {
+    "OpenAI": fetch_openai_models,
+    "Anthropic": fetch_anthropic_models,
+    "Gemini": fetch_gemini_models,
+    "DeepSeek": fetch_deepseek_models,
+}
+
+
+async def fetch_models_for_provider(
+    provider: str,
+    api_key: str,
+    lister: Optional[Callable[[str], Awaitable[List[str]]]] = None,
+    fallback: Optional[List[str]] = None,
+    requires_key: bool = True,
+) -> List[str]:
+    """Pobiera modele dla konkretnego providera.
+
+    ``lister``/``fallback`` pozwalają podać źródło dla providerów spoza
+    :data:`MODEL_LISTERS` (np. dodatkowych endpointów zgodnych z OpenAI).
+    """
+    if fallback is None:
+        fallback = FALLBACK_MODELS.get(provider, [])
+    if lister is None:
+        lister = MODEL_LISTERS.get(provider)
+
     # Twarde wymuszenie fallbacków przez zmienną środowiskową (np. dla buildów produkcyjnych)
     if os.getenv('USE_FALLBACK_MODELS', '0') == '1':
         logging.info(f"Models source for {provider}: FORCED_FALLBACK via USE_FALLBACK_MODELS=1")
-        return FALLBACK_MODELS.get(provider, [])
+        return list(fallback)
 
-    if not api_key or not api_key.strip():
+    if requires_key and (not api_key or not api_key.strip()):
         logging.info(f"Models source for {provider}: FALLBACK (no API key provided)")
-        return FALLBACK_MODELS.get(provider, [])
+        return list(fallback)
     
     # Sprawdź cache
     cached_models = model_cache.get(provider)
@@ -272,16 +321,7 @@ async def fetch_models_for_provider(provider: str, api_key: str) -> List[str]:
     # Fetch from API
     try:
         logging.info(f"Fetching models from API for provider: {provider}")
-        if provider == "OpenAI":
-            models = await fetch_openai_models(api_key)
-        elif provider == "Anthropic":
-            models = await fetch_anthropic_models(api_key)
-        elif provider == "Gemini":
-            models = await fetch_gemini_models(api_key)
-        elif provider == "DeepSeek":
-            models = await fetch_deepseek_models(api_key)
-        else:
-            models = FALLBACK_MODELS.get(provider, [])
+        models = await lister(api_key) if lister is not None else list(fallback)
         
         # Cache wyniki
         if models:
@@ -292,7 +332,7 @@ async def fetch_models_for_provider(provider: str, api_key: str) -> List[str]:
         
     except Exception as e:
         logging.error(f"Error fetching models for {provider}: {e}")
-        return FALLBACK_MODELS.get(provider, [])
+        return list(fallback)
 
 
 def get_default_model(provider: str) -> str:
@@ -309,9 +349,7 @@ def get_default_model(provider: str) -> str:
 async def fetch_all_models(api_keys: Dict[str, str]) -> Dict[str, List[str]]:
     """Pobiera modele dla wszystkich providerów równocześnie."""
     tasks = []
-    providers = ["OpenAI", "Anthropic", "Gemini", "DeepSeek"]
-    
-    for provider in providers:
+    for provider in MODEL_LISTERS:
         api_key = api_keys.get(provider, "")
         task = fetch_models_for_provider(provider, api_key)
         tasks.append((provider, task))
@@ -65,8 +65,22 @@ def get_logs_dir_path():
                         # W tym momencie logowanie do pliku może nie działać, ale próbujemy zwrócić ścieżkę
     return logs_dir
 
+def get_cache_dir_path():
+    """Zwraca ścieżkę do katalogu cache w katalogu aplikacji (tworzy go w razie potrzeby)."""
+    cache_dir = os.path.join(get_app_dir(), 'cache')
+    if not os.path.exists(cache_dir):
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"OSTRZEŻENIE: Nie można utworzyć katalogu cache w {cache_dir}: {e}")
+            user_data_dir = os.path.join(os.getenv('APPDATA', os.path.expanduser("~")), 'PoprawTekst')
+            cache_dir = os.path.join(user_data_dir, 'cache')
+            os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
 if __name__ == '__main__':
     print(f"Katalog aplikacji: {get_app_dir()}")
     print(f"Ścieżka do config.ini: {get_config_file_path()}")
     print(f"Ścieżka do katalogu assets: {get_assets_dir_path()}")
-    print(f"Ścieżka do katalogu logs: {get_logs_dir_path()}") 
\ No newline at end of file
+    print(f"Ścieżka do katalogu logs: {get_logs_dir_path()}")
+    print(f"Ścieżka do katalogu cache: {get_cache_dir_path()}") 
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""Odczyt zaznaczenia PRIMARY na Linuksie – bez symulowanego Ctrl+C.
+
+Zaznaczony tekst jest na X11 od razu dostępny jako selekcja PRIMARY, więc
+hotkey nie musi naciskać Ctrl+C, czekać na schowek i nadpisywać schowka
+użytkownika. Tk ``selection_get`` działa tylko w wątku UI, a hotkey obsługuje
+worker, dlatego czytamy przez ``xclip``/``xsel`` (albo ``wl-paste`` pod
+Waylandem, który przekazuje PRIMARY aplikacjom XWayland).
+
+PRIMARY zostaje po odznaczeniu tekstu, więc tekst identyczny z poprzednio
+użytym uznajemy za nieaktualny i wracamy do Ctrl+C – w najgorszym razie
+kosztuje to tylko dawne opóźnienie.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from .clipboard_watch import STATS_PROVIDER, CopyResult
+from .latency import get_latency_stats
+from .logger import logger
+
+METRIC_PRIMARY = "primary_ready"
+READ_TIMEOUT = 0.25
+
+# (program, argumenty) w kolejności prób
+_X11_COMMANDS = (
+    ("xclip", ["-o", "-selection", "primary"]),
+    ("xsel", ["--output", "--primary"]),
+)
+_WAYLAND_COMMANDS = (
+    ("wl-paste", ["--primary", "--no-newline"]),
+)
+
+
+def _find_command() -> Optional[List[str]]:
+    commands = _X11_COMMANDS
+    if os.environ.get("WAYLAND_DISPLAY"):
+        commands = _WAYLAND_COMMANDS + _X11_COMMANDS
+    for program, args in commands:
+        path = shutil.which(program)
+        if path:
+            return [path] + args
+    return None
+
+
+class PrimarySelectionReader:
+    """Czyta PRIMARY i odrzuca tekst już raz użyty (nieaktualne zaznaczenie)."""
+
+    def __init__(self, command: Optional[List[str]] = None):
+        self._command = command if command is not None else (
+            _find_command() if sys.platform.startswith("linux") else None
+        )
+        self._last_used: Optional[str] = None
+        self._lock = threading.Lock()
+        if self._command:
+            logger.info(f"Zaznaczenie PRIMARY przez: {os.path.basename(self._command[0])}")
+
+    @property
+    def available(self) -> bool:
+        return bool(self._command)
+
+    def _read(self) -> Tuple[str, float]:
+        start = time.perf_counter()
+        completed = subprocess.run(
+            self._command, capture_output=True, timeout=READ_TIMEOUT, check=False
+        )
+        text = completed.stdout.decode("utf-8", errors="replace") if completed.returncode == 0 else ""
+        return text, time.perf_counter() - start
+
+    def read(self) -> Optional[CopyResult]:
+        """Aktualne zaznaczenie albo None (brak narzędzia, puste lub nieaktualne)."""
+        if not self._command:
+            return None
+        try:
+            text, latency = self._read()
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Odczyt PRIMARY nie powiódł się: {e}")
+            return None
+        with self._lock:
+            if not text.strip() or text == self._last_used:
+                logger.debug("PRIMARY puste lub nieaktualne - fallback do Ctrl+C")
+                return None
+            self._last_used = text
+        get_latency_stats().record(STATS_PROVIDER, METRIC_PRIMARY, latency)
+        return CopyResult(text, latency, True, "primary")
+
+    def remember(self, text: str) -> None:
+        """Zapamiętuje tekst użyty innym sposobem (Ctrl+C) jako nieaktualny dla PRIMARY."""
+        with self._lock:
+            self._last_used = text
+
+
+_reader: Optional[PrimarySelectionReader] = None
+_reader_lock = threading.Lock()
+
+
+def get_primary_selection_reader() -> PrimarySelectionReader:
+    """Singleton czytnika zaznaczenia PRIMARY."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            _reader = PrimarySelectionReader()
+    return _reader
+
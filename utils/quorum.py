@@ -0,0 +1,66 @@
+"""Tryb kworum: wcześniejsze zakończenie sesji, gdy providerzy się zgadzają.
+
+Zgodność dwóch wyników mierzymy znormalizowaną odległością edycyjną na
+wyrazach: (wyrazy usunięte + wstawione) / (suma wyrazów obu tekstów), liczoną
+przez :mod:`utils.word_diff`. 0.0 oznacza identyczne teksty (z dokładnością do
+białych znaków), 1.0 – brak wspólnych wyrazów.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .diff_highlight import tokenize
+from .word_diff import matching_blocks
+
+DEFAULT_QUORUM_SIZE = 2
+DEFAULT_QUORUM_THRESHOLD = 0.05
+
+
+def normalized_edit_distance(a: str, b: str) -> float:
+    """Odległość 0..1 między tekstami na poziomie wyrazów."""
+    a_tokens = tokenize(a)
+    b_tokens = tokenize(b)
+    total = len(a_tokens) + len(b_tokens)
+    if total == 0:
+        return 0.0
+    matched = sum(size for _i, _j, size in matching_blocks(a_tokens, b_tokens))
+    return (total - 2 * matched) / total
+
+
+def find_quorum(
+    results: Dict[int, str],
+    size: int = DEFAULT_QUORUM_SIZE,
+    threshold: float = DEFAULT_QUORUM_THRESHOLD,
+) -> Optional[Tuple[int, List[int]]]:
+    """Szuka ``size`` wyników zgodnych z jednym z nich w granicy ``threshold``.
+
+    Zwraca (indeks wybranego wyniku, indeksy grupy) albo None. Wybierany jest
+    wynik najbliższy pozostałym członkom grupy (medoid). Puste wyniki są
+    pomijane – dwa puste teksty mają odległość 0, ale to nie jest zgoda.
+    """
+    results = {index: text for index, text in results.items() if text and text.strip()}
+    if len(results) < max(2, size):
+        return None
+    indices = list(results)
+    distances: Dict[Tuple[int, int], float] = {}
+
+    def distance(i: int, j: int) -> float:
+        key = (min(i, j), max(i, j))
+        if key not in distances:
+            distances[key] = normalized_edit_distance(results[i], results[j])
+        return distances[key]
+
+    best: Optional[Tuple[float, int, List[int]]] = None
+    for candidate in indices:
+        group = [candidate] + [
+            other for other in indices
+            if other != candidate and distance(candidate, other) <= threshold
+        ]
+        if len(group) < size:
+            continue
+        spread = sum(distance(candidate, other) for other in group if other != candidate)
+        if best is None or spread < best[0]:
+            best = (spread, candidate, sorted(group))
+    if best is None:
+        return None
+    return best[1], best[2]
+
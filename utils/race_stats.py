@@ -0,0 +1,80 @@
+"""Statystyki trybu wyścigu: kto wygrywa i z jaką przewagą.
+
+Wygrana to pierwszy wynik bez błędu w sesji wyścigu. Przewaga (margin) to
+szacowany czas, którego najszybszy z pozostałych providerów potrzebowałby
+jeszcze do końca odpowiedzi w chwili anulowania – liczony z tempa jego
+strumienia (:meth:`RequestProgress.estimated_remaining`). Gdy żaden z
+przegranych nie zaczął jeszcze streamować, przewaga jest nieznana (tylko dolna
+granica) i nie trafia do próbek.
+
+Czasy wygranych i przewagi trafiają do :mod:`utils.latency` (metryki
+``race_win_time`` i ``race_margin``), a tutaj trzymamy liczniki udziałów i
+wygranych – z nich wynika, których providerów warto wyłączyć
+(``DisabledProviders``).
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .latency import get_latency_stats
+
+METRIC_WIN_TIME = "race_win_time"
+METRIC_MARGIN = "race_margin"
+
+
+class RaceStats:
+    """Bezpieczny wątkowo licznik wyścigów per provider."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._races: Dict[str, int] = {}
+        self._wins: Dict[str, int] = {}
+
+    def record_race(
+        self,
+        winner: str,
+        win_time: float,
+        participants: Iterable[str],
+        margin: Optional[float] = None,
+    ) -> None:
+        """Zapisuje wynik wyścigu (czasy w sekundach)."""
+        with self._lock:
+            for name in set(participants) | {winner}:
+                self._races[name] = self._races.get(name, 0) + 1
+            self._wins[winner] = self._wins.get(winner, 0) + 1
+        stats = get_latency_stats()
+        if win_time > 0:
+            stats.record(winner, METRIC_WIN_TIME, win_time)
+        if margin is not None:
+            stats.record(winner, METRIC_MARGIN, margin)
+
+    def standings(self) -> List[Tuple[str, int, int]]:
+        """(provider, wygrane, udziały) posortowane malejąco po odsetku wygranych."""
+        with self._lock:
+            rows = [(name, self._wins.get(name, 0), races) for name, races in self._races.items()]
+        return sorted(rows, key=lambda row: (-row[1] / row[2], -row[2], row[0]))
+
+    def summary(self) -> str:
+        """Krótki opis do logów: odsetek wygranych i mediana przewagi."""
+        stats = get_latency_stats()
+        parts = []
+        for name, wins, races in self.standings():
+            part = f"{name} {wins}/{races}"
+            margin = stats.percentile(name, METRIC_MARGIN, 50)
+            if margin is not None:
+                part += f" (przewaga p50 {margin * 1000:.0f} ms)"
+            parts.append(part)
+        return ", ".join(parts) if parts else "brak wyścigów"
+
+
+_stats: Optional[RaceStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_race_stats() -> RaceStats:
+    """Singleton statystyk wyścigów."""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = RaceStats()
+    return _stats
@@ -0,0 +1,205 @@
+"""Cache odpowiedzi providerów adresowany treścią zapytania.
+
+Dwa poziomy:
+- pamięć: LRU ograniczone liczbą wpisów i łączną długością tekstu,
+- dysk: SQLite w katalogu ``cache`` aplikacji, z TTL i limitem liczby wierszy
+  (przy przekroczeniu usuwane są najdawniej używane wpisy).
+
+Klucz to SHA-256 z (provider, model, system prompt, instruction prompt, tekst,
+istotne AI_SETTINGS, opcje wywołania providera – np. ``base_url`` sekcji
+[PROVIDER:Nazwa]), więc zmiana dowolnego z tych elementów daje nowy wpis.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Mapping, Optional
+
+from .logger import logger
+from .paths import get_cache_dir_path
+
+MEMORY_MAX_ENTRIES = 256
+MEMORY_MAX_CHARS = 4 * 1024 * 1024
+DISK_TTL_SECONDS = 7 * 24 * 3600
+DISK_MAX_ROWS = 5000
+CACHE_FILE_NAME = "responses.sqlite3"
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    system_prompt: str,
+    instruction_prompt: str,
+    text: str,
+    ai_settings: Optional[Mapping[str, str]] = None,
+    options: Optional[Mapping[str, object]] = None,
+) -> str:
+    """Buduje klucz cache (hex SHA-256) z parametrów zapytania.
+
+    ``options`` to stałe argumenty klienta providera (``ProviderSpec.options``).
+    """
+    payload = json.dumps(
+        [
+            provider,
+            model,
+            system_prompt,
+            instruction_prompt,
+            text,
+            sorted((ai_settings or {}).items()),
+            sorted((options or {}).items()),
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Dwupoziomowy (pamięć + SQLite) cache odpowiedzi, bezpieczny wątkowo."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: float = DISK_TTL_SECONDS,
+        max_rows: int = DISK_MAX_ROWS,
+        memory_max_entries: int = MEMORY_MAX_ENTRIES,
+        memory_max_chars: int = MEMORY_MAX_CHARS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.memory_max_entries = memory_max_entries
+        self.memory_max_chars = memory_max_chars
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_chars = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_path = db_path or os.path.join(get_cache_dir_path(), CACHE_FILE_NAME)
+        self._open_db()
+
+    # ------------------------------------------------------------------ dysk
+    def _open_db(self) -> None:
+        try:
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache odpowiedzi na dysku niedostępny ({self._db_path}): {e}")
+            self._db = None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if self._db is None:
+            return None
+        now = time.time()
+        row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if now - created > self.ttl_seconds:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        return value
+
+    def _disk_put(self, key: str, value: str) -> None:
+        if self._db is None:
+            return
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, value, now, now),
+        )
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_rows:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_rows,),
+            )
+        self._db.commit()
+
+    # --------------------------------------------------------------- pamięć
+    def _memory_put(self, key: str, value: str) -> None:
+        if len(value) > self.memory_max_chars:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_chars -= len(previous)
+        self._memory[key] = value
+        self._memory_chars += len(value)
+        while self._memory and (
+            len(self._memory) > self.memory_max_entries or self._memory_chars > self.memory_max_chars
+        ):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_chars -= len(evicted)
+
+    # ------------------------------------------------------------------- API
+    def get(self, key: str) -> Optional[str]:
+        """Zwraca zapisaną odpowiedź albo None (pamięć, potem dysk)."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value
+            try:
+                value = self._disk_get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Błąd odczytu cache odpowiedzi: {e}")
+                return None
+            if value is not None:
+                self._memory_put(key, value)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """Zapisuje odpowiedź w obu poziomach."""
+        if not value:
+            return
+        with self._lock:
+            self._memory_put(key, value)
+            try:
+                self._disk_put(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Błąd zapisu cache odpowiedzi: {e}")
+
+    def clear(self) -> None:
+        """Czyści oba poziomy cache."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_chars = 0
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM responses")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Błąd czyszczenia cache odpowiedzi: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Singleton cache odpowiedzi (otwiera bazę przy pierwszym użyciu)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,151 @@
+"""Pomiar faz startu aplikacji i raport JSON z każdego uruchomienia.
+
+Fazy (czas od utworzenia profilera, czyli od początku importów
+``main_corrector``)::
+
+    imports, logging, version, app_init (config_load, ui_construction,
+    gif_preload, pre_render), hotkey_registration, tray_ready, first_idle
+
+Fazy z wątków w tle (hotkey, tray) są zapisywane z nazwą wątku. Raport trafia
+do ``<katalog logów>/startup/startup_RRRRMMDD_GGMMSS.json`` (zostaje
+:data:`REPORTS_KEPT` najnowszych). Tryb ``--startup-benchmark`` kończy
+aplikację zaraz po zapisaniu raportu – do śledzenia regresji::
+
+    python main_corrector.py --startup-benchmark
+
+Moduł importuje tylko bibliotekę standardową, żeby dało się go załadować
+przed ciężkimi importami.
+"""
+
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+REPORTS_KEPT = 20
+REPORT_PREFIX = "startup_"
+BENCHMARK_FLAG = "--startup-benchmark"
+
+
+class StartupProfiler:
+    """Znaczniki i czasy faz startu (bezpieczne wątkowo)."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        # nazwa -> {start, end, count, thread}; kolejność = kolejność pierwszego wejścia
+        self._phases: Dict[str, dict] = {}
+        self._marks: Dict[str, float] = {}
+
+    def _ms(self, moment: float) -> float:
+        return round((moment - self.origin) * 1000, 1)
+
+    def record(self, name: str, start: float, end: Optional[float] = None) -> None:
+        """Zapisuje fazę (``perf_counter``); powtórzenia sumują czas trwania."""
+        end = time.perf_counter() if end is None else end
+        with self._lock:
+            phase = self._phases.get(name)
+            if phase is None:
+                self._phases[name] = {
+                    "start": start, "end": end, "duration": end - start,
+                    "count": 1, "thread": threading.current_thread().name,
+                }
+            else:
+                phase["end"] = end
+                phase["duration"] += end - start
+                phase["count"] += 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def mark(self, name: str) -> None:
+        """Chwila zdarzenia (np. tray gotowy); zapisywana tylko za pierwszym razem."""
+        moment = time.perf_counter()
+        with self._lock:
+            self._marks.setdefault(name, moment)
+
+    def has(self, name: str) -> bool:
+        with self._lock:
+            return name in self._marks or name in self._phases
+
+    def report(self, **extra) -> dict:
+        with self._lock:
+            phases: List[dict] = [
+                {
+                    "name": name,
+                    "start_ms": self._ms(phase["start"]),
+                    "end_ms": self._ms(phase["end"]),
+                    "duration_ms": round(phase["duration"] * 1000, 1),
+                    "count": phase["count"],
+                    "thread": phase["thread"],
+                }
+                for name, phase in self._phases.items()
+            ]
+            marks = {name: self._ms(moment) for name, moment in self._marks.items()}
+        report = {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "phases": phases,
+            "marks": marks,
+            "first_idle_ms": marks.get("first_idle"),
+        }
+        report.update(extra)
+        return report
+
+    def summary(self) -> str:
+        """Jedna linia do logów."""
+        report = self.report()
+        parts = [f"{phase['name']} {phase['duration_ms']:.0f} ms" for phase in report["phases"]]
+        parts += [f"{name} @ {moment:.0f} ms" for name, moment in report["marks"].items()]
+        return " | ".join(parts)
+
+    def write_report(self, directory: str, keep: int = REPORTS_KEPT, **extra) -> Optional[str]:
+        """Zapisuje raport JSON i usuwa najstarsze ponad ``keep``; zwraca ścieżkę."""
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{REPORT_PREFIX}{self.started_at:%Y%m%d_%H%M%S}.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump(self.report(**extra), handle, ensure_ascii=False, indent=2)
+            reports = sorted(
+                name for name in os.listdir(directory)
+                if name.startswith(REPORT_PREFIX) and name.endswith(".json")
+            )
+            for name in reports[:-keep] if keep > 0 else []:
+                os.remove(os.path.join(directory, name))
+            return path
+        except OSError:
+            return None
+
+
+_profiler: Optional[StartupProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Singleton profilera startu (tworzony przy pierwszym imporcie)."""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = StartupProfiler()
+    return _profiler
+
+
+def is_benchmark_run(argv: Optional[List[str]] = None) -> bool:
+    return BENCHMARK_FLAG in (sys.argv if argv is None else argv)
+
+
+get_startup_profiler()
+
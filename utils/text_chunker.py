@@ -0,0 +1,116 @@
+"""Dzielenie długich tekstów na fragmenty mieszczące się w budżecie tokenów.
+
+Tekst jest cięty wyłącznie na granicach akapitów (puste linie), a gdy akapit
+sam w sobie jest za długi – na granicach linii (np. punkty listy), a w
+ostateczności zdań. Białe znaki między fragmentami są zapamiętywane w
+``TextChunk.separator``, więc po poprawieniu fragmentów formatowanie
+dokumentu da się odtworzyć 1:1 przez :func:`join_chunks`.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+# Przybliżenie dla tekstów polskich/angielskich (tokenizery BPE)
+CHARS_PER_TOKEN = 3.5
+# Wejście fragmentu – z zapasem względem najniższego limitu odpowiedzi (2000 tokenów)
+DEFAULT_CHUNK_TOKENS = 1200
+# Od tej długości tekst jest dzielony (poniżej – jedno zapytanie jak dotąd)
+LONG_TEXT_MIN_TOKENS = 1500
+
+_PARAGRAPH_SPLIT = re.compile(r"(\n[ \t]*\n\s*)")
+_LINE_SPLIT = re.compile(r"(\n)")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])(\s+)")
+
+
+@dataclass(frozen=True)
+class TextChunk:
+    """Fragment tekstu i białe znaki, które po nim następują w oryginale."""
+
+    body: str
+    separator: str = ""
+
+
+def estimate_tokens(text: str) -> int:
+    """Szacunkowa liczba tokenów tekstu."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def is_long_text(text: str, min_tokens: int = LONG_TEXT_MIN_TOKENS) -> bool:
+    return estimate_tokens(text) > min_tokens
+
+
+def _split_keep(pattern: "re.Pattern", text: str) -> List[Tuple[str, str]]:
+    """Dzieli tekst wzorcem z grupą, zwracając pary (treść, separator)."""
+    parts = pattern.split(text)
+    units = []
+    for i in range(0, len(parts), 2):
+        body = parts[i]
+        sep = parts[i + 1] if i + 1 < len(parts) else ""
+        if body or sep:
+            units.append((body, sep))
+    return units
+
+
+def _units(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """Najmniejsze jednostki (treść, separator), każda – o ile się da – <= max_chars."""
+    result = []
+    for paragraph, paragraph_sep in _split_keep(_PARAGRAPH_SPLIT, text):
+        if len(paragraph) <= max_chars:
+            result.append((paragraph, paragraph_sep))
+            continue
+        lines = _split_keep(_LINE_SPLIT, paragraph)
+        for line_index, (line, line_sep) in enumerate(lines):
+            if line_index == len(lines) - 1:
+                line_sep += paragraph_sep
+            if len(line) <= max_chars:
+                result.append((line, line_sep))
+                continue
+            sentences = _split_keep(_SENTENCE_SPLIT, line)
+            for sentence_index, (sentence, sentence_sep) in enumerate(sentences):
+                if sentence_index == len(sentences) - 1:
+                    sentence_sep += line_sep
+                # Pojedyncze zdanie dłuższe niż budżet zostaje w całości
+                result.append((sentence, sentence_sep))
+    return result
+
+
+def split_text(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[TextChunk]:
+    """Dzieli tekst na fragmenty o szacunkowej długości <= ``max_tokens``.
+
+    Sąsiednie akapity/linie są łączone zachłannie, dopóki mieszczą się w budżecie.
+    Wiodące białe znaki dokumentu trafiają do pierwszego fragmentu.
+    """
+    if not text:
+        return []
+    max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+    leading = text[: len(text) - len(text.lstrip())]
+    units = _units(text[len(leading):], max_chars)
+
+    chunks: List[TextChunk] = []
+
+    def emit(chunk_body: str, chunk_separator: str) -> None:
+        # Końcowe białe znaki fragmentu należą do separatora – klienci API
+        # i tak zwracają tekst po strip()
+        stripped = chunk_body.rstrip()
+        chunks.append(TextChunk(stripped, chunk_body[len(stripped):] + chunk_separator))
+
+    body, separator = leading, ""
+    for unit_body, unit_sep in units:
+        candidate_len = len(body) + len(separator) + len(unit_body)
+        if body.strip() and candidate_len > max_chars:
+            emit(body, separator)
+            body, separator = unit_body, unit_sep
+        else:
+            body = body + separator + unit_body
+            separator = unit_sep
+    if body or separator:
+        emit(body, separator)
+    return chunks
+
+
+def join_chunks(chunks: Sequence[TextChunk], bodies: Sequence[str]) -> str:
+    """Skleja poprawione treści fragmentów z oryginalnymi separatorami."""
+    return "".join(body + chunk.separator for chunk, body in zip(chunks, bodies))
+
@@ -0,0 +1,234 @@
+"""Diff sekwencji wyrazów: algorytm Myersa O(ND) z kotwiczeniem patience.
+
+Zastępuje ``difflib.SequenceMatcher`` przy podświetlaniu różnic. SequenceMatcher
+jest w najgorszym razie kwadratowy i źle znosi długie, powtarzalne teksty
+(listy, tabele, fragmenty logów); przy ``autojunk`` (>200 elementów) dodatkowo
+ignoruje częste wyrazy, co psuje dopasowanie.
+
+Przebieg dla każdego zakresu (a[lo:hi], b[lo:hi]):
+1. wspólny prefiks i sufiks są od razu dopasowane,
+2. pre-pass patience: wyrazy występujące w obu zakresach dokładnie raz, ułożone
+   w najdłuższy rosnący podciąg, stają się kotwicami; przedziały między nimi
+   są przetwarzane tak samo,
+3. gdy kotwic brak – Myers (wariant "middle snake", pamięć liniowa); przy koszcie
+   edycji powyżej ``max_cost`` zakres jest traktowany jako zamiana w całości
+   (jak heurystyki xdiff), żeby czas był ograniczony.
+
+Wyrazy są internowane do liczb całkowitych, więc porównania są tanie.
+Wynik ma format ``SequenceMatcher.get_opcodes()`` / ``get_matching_blocks()``.
+"""
+
+import bisect
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+Block = Tuple[int, int, int]
+Opcode = Tuple[str, int, int, int, int]
+
+# Limit kosztu edycji (D) dla jednego wywołania Myersa bez kotwic
+DEFAULT_MAX_COST = 512
+# Głębokość zagnieżdżenia kotwiczenia patience (dalej już tylko Myers)
+MAX_PATIENCE_DEPTH = 32
+
+
+def intern_tokens(a: Sequence[Hashable], b: Sequence[Hashable]) -> Tuple[List[int], List[int]]:
+    """Zamienia wyrazy obu sekwencji na wspólne identyfikatory liczbowe."""
+    table: Dict[Hashable, int] = {}
+    a_ids = [table.setdefault(token, len(table)) for token in a]
+    b_ids = [table.setdefault(token, len(table)) for token in b]
+    return a_ids, b_ids
+
+
+def _patience_anchors(a, b, a_lo, a_hi, b_lo, b_hi) -> List[Tuple[int, int]]:
+    """Pary (i, j) wyrazów unikalnych w obu zakresach, tworzące rosnący ciąg."""
+    a_counts = Counter(a[a_lo:a_hi])
+    b_counts = Counter(b[b_lo:b_hi])
+    b_position = {b[j]: j for j in range(b_lo, b_hi) if b_counts[b[j]] == 1}
+    pairs = [
+        (i, b_position[a[i]])
+        for i in range(a_lo, a_hi)
+        if a_counts[a[i]] == 1 and a[i] in b_position
+    ]
+    if not pairs:
+        return []
+
+    # Najdłuższy rosnący podciąg po pozycjach w b (patience sorting)
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous: List[int] = [-1] * len(pairs)
+    for index, (_i, j) in enumerate(pairs):
+        pile = bisect.bisect_left(tails, j)
+        if pile > 0:
+            previous[index] = tail_index[pile - 1]
+        if pile == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pile] = j
+            tail_index[pile] = index
+    anchors = []
+    index = tail_index[-1]
+    while index != -1:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _middle_snake(a, b, a_lo, a_hi, b_lo, b_hi, max_cost) -> Optional[Tuple[int, int]]:
+    """Punkt podziału (x, y) najkrótszej ścieżki edycji albo None.
+
+    None oznacza brak wspólnych elementów lub przekroczenie ``max_cost``.
+    """
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    length = 2 * max_d + 2
+    forward = [-1] * length
+    backward = [-1] * length
+    forward[offset + 1] = 0
+    backward[offset + 1] = 0
+    delta = n - m
+    odd = delta % 2 != 0
+    k1_start = k1_end = k2_start = k2_end = 0
+
+    for d in range(min(max_d, max_cost) + 1):
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[a_lo + x1] == b[b_lo + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            elif odd:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < length and backward[k2_offset] != -1:
+                    if x1 >= n - backward[k2_offset]:
+                        return x1, y1
+
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and backward[k2_offset - 1] < backward[k2_offset + 1]):
+                x2 = backward[k2_offset + 1]
+            else:
+                x2 = backward[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[a_hi - 1 - x2] == b[b_hi - 1 - y2]:
+                x2 += 1
+                y2 += 1
+            backward[k2_offset] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not odd:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < length and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    y1 = x1 - (k1_offset - offset)
+                    if x1 >= n - x2:
+                        return x1, y1
+    return None
+
+
+def matching_blocks(
+    a: Sequence[Hashable],
+    b: Sequence[Hashable],
+    max_cost: int = DEFAULT_MAX_COST,
+    patience: bool = True,
+) -> List[Block]:
+    """Bloki (i, j, n) takie, że a[i:i+n] == b[j:j+n]; zakończone wartownikiem (len(a), len(b), 0)."""
+    a_ids, b_ids = intern_tokens(a, b)
+    matches: List[Tuple[int, int]] = []
+    # Zakresy do przetworzenia: (a_lo, a_hi, b_lo, b_hi, głębokość patience albo None)
+    stack = [(0, len(a_ids), 0, len(b_ids), 0 if patience else None)]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi, depth = stack.pop()
+        while a_lo < a_hi and b_lo < b_hi and a_ids[a_lo] == b_ids[b_lo]:
+            matches.append((a_lo, b_lo))
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a_ids[a_hi - 1] == b_ids[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            matches.append((a_hi, b_hi))
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+
+        if depth is not None and depth < MAX_PATIENCE_DEPTH:
+            anchors = _patience_anchors(a_ids, b_ids, a_lo, a_hi, b_lo, b_hi)
+            if anchors:
+                prev_i, prev_j = a_lo, b_lo
+                for i, j in anchors:
+                    matches.append((i, j))
+                    stack.append((prev_i, i, prev_j, j, depth + 1))
+                    prev_i, prev_j = i + 1, j + 1
+                stack.append((prev_i, a_hi, prev_j, b_hi, depth + 1))
+                continue
+
+        split = _middle_snake(a_ids, b_ids, a_lo, a_hi, b_lo, b_hi, max_cost)
+        if split is None:
+            continue  # brak wspólnych wyrazów albo limit kosztu – zamiana w całości
+        x, y = split
+        stack.append((a_lo, a_lo + x, b_lo, b_lo + y, None))
+        stack.append((a_lo + x, a_hi, b_lo + y, b_hi, None))
+
+    matches.sort()
+    blocks: List[Block] = []
+    for i, j in matches:
+        if blocks:
+            last_i, last_j, size = blocks[-1]
+            if last_i + size == i and last_j + size == j:
+                blocks[-1] = (last_i, last_j, size + 1)
+                continue
+        blocks.append((i, j, 1))
+    blocks.append((len(a_ids), len(b_ids), 0))
+    return blocks
+
+
+def opcodes_from_blocks(blocks: Sequence[Block]) -> List[Opcode]:
+    """Przekształca bloki w opkody w formacie ``SequenceMatcher.get_opcodes()``."""
+    i = j = 0
+    opcodes: List[Opcode] = []
+    for ai, bj, size in blocks:
+        tag = ""
+        if i < ai and j < bj:
+            tag = "replace"
+        elif i < ai:
+            tag = "delete"
+        elif j < bj:
+            tag = "insert"
+        if tag:
+            opcodes.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            opcodes.append(("equal", ai, i, bj, j))
+    return opcodes
+
+
+class WordMatcher:
+    """Interfejs zgodny z używaną częścią ``difflib.SequenceMatcher``."""
+
+    def __init__(self, a: Sequence[Hashable], b: Sequence[Hashable], max_cost: int = DEFAULT_MAX_COST):
+        self.a = a
+        self.b = b
+        self.max_cost = max_cost
+        self._blocks: Optional[List[Block]] = None
+
+    def get_matching_blocks(self) -> List[Block]:
+        if self._blocks is None:
+            self._blocks = matching_blocks(self.a, self.b, self.max_cost)
+        return self._blocks
+
+    def get_opcodes(self) -> List[Opcode]:
+        return opcodes_from_blocks(self.get_matching_blocks())
+